@@ -0,0 +1,15 @@
+import os
+
+BENCH_PAGES = int(os.getenv("BENCH_PAGES", 200))
+BENCH_PROFILES = int(os.getenv("BENCH_PROFILES", 20))
+BENCH_REPOS = int(os.getenv("BENCH_REPOS", 5))
+BENCH_REPO_FILES = int(os.getenv("BENCH_REPO_FILES", 50))
+# Served pages wait BENCH_LATENCY plus up to BENCH_JITTER seconds, BENCH_ERROR_RATE of them answer 500 instead.
+BENCH_LATENCY = float(os.getenv("BENCH_LATENCY", 0.02))
+BENCH_JITTER = float(os.getenv("BENCH_JITTER", 0.01))
+BENCH_ERROR_RATE = float(os.getenv("BENCH_ERROR_RATE", 0.0))
+BENCH_SEED = int(os.getenv("BENCH_SEED", 0))
+# Recorded pages in tasnim_articles/, tasnim_feeds/, virgool_profiles/ and articles/ subdirectories, synthetic if unset.
+BENCH_FIXTURES_DIR = os.getenv("BENCH_FIXTURES_DIR")
+BENCH_STAGES = [stage for stage in os.getenv("BENCH_STAGES", "").split(",") if stage]
+BENCH_RESOURCE_INTERVAL = float(os.getenv("BENCH_RESOURCE_INTERVAL", 0.05))
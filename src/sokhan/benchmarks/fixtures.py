@@ -0,0 +1,188 @@
+import html
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import git
+import lxml.html
+
+from sokhan.utils.jalali import TEHRAN_TZ, format_jalali, to_jalali
+
+FIXTURE_KINDS = ("tasnim_articles", "tasnim_feeds", "virgool_profiles", "virgool_articles", "articles")
+
+WORDS = ("ایران", "تهران", "دولت", "مجلس", "اقتصاد", "بازار", "گزارش", "خبرگزاری", "نشست", "وزیر", "سیاست",
+         "فرهنگ", "ورزش", "جهان", "مردم", "شهر", "استان", "توسعه", "پروژه", "سرمایه", "آموزش", "دانشگاه",
+         "پژوهش", "فناوری", "اینترنت", "صنعت", "نفت", "انرژی", "قیمت", "امروز", "هفته", "سال", "برنامه",
+         "می‌شود", "خواهد", "است", "بود", "کرد", "برای", "این", "که", "از", "به", "با", "در", "را")
+MONTH_NAMES = ("فروردین", "اردیبهشت", "خرداد", "تیر", "مرداد", "شهریور", "مهر", "آبان", "آذر", "دی", "بهمن",
+               "اسفند")
+SERVICES = ("سیاسی", "اقتصادی", "ورزشی", "فرهنگی", "بین‌الملل", "اجتماعی")
+# Share of synthetic articles reusing an earlier body, so the dedup stage has duplicates to find.
+DUPLICATE_RATE = 0.1
+PROFILE_PAGES = 3
+POSTS_PER_PROFILE_PAGE = 10
+
+
+def sentence(rng: random.Random, size: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(size))
+
+
+def paragraphs(rng: random.Random, count: int) -> list[str]:
+    return [sentence(rng, rng.randint(20, 60)) for _ in range(count)]
+
+
+def written_jalali(value: datetime) -> str:
+    """Date as Tasnim prints it on article pages, e.g. "24 بهمن 1404 - 12:30"."""
+    year, month, day = to_jalali(value.date())
+    return f"{day} {MONTH_NAMES[month - 1]} {year} - {value:%H:%M}"
+
+
+def _published_at(rng: random.Random, i: int) -> datetime:
+    return datetime(2026, 2, 1, 8, 0, tzinfo=TEHRAN_TZ) + timedelta(minutes=17 * i + rng.randint(0, 10))
+
+
+def tasnim_article_html(rng: random.Random, i: int, bodies: list[list[str]]) -> str:
+    if bodies and rng.random() < DUPLICATE_RATE:
+        body = list(rng.choice(bodies))
+        body[-1] = sentence(rng, 8)
+    else:
+        body = paragraphs(rng, rng.randint(4, 12))
+        bodies.append(body)
+
+    services = "".join(f'<li class="service"><a href="/fa/service/{k}">{html.escape(rng.choice(SERVICES))}</a></li>'
+                       for k in range(rng.randint(1, 3)))
+    story = "".join(f"<p>{html.escape(p)}</p>" for p in body)
+    return (
+        f'<!DOCTYPE html><html lang="fa" dir="rtl"><head><meta charset="utf-8"><title>{i}</title>'
+        f'<script>var news = {i};</script></head><body>'
+        f'<header><nav><ul>{"".join(f"<li><a href=/fa/{k}>{rng.choice(WORDS)}</a></li>" for k in range(30))}'
+        f'</ul></nav></header>'
+        f'<main><article class="single-news"><h1 class="title">{html.escape(sentence(rng, 10))}</h1>'
+        f'<ul class="details"><li class="time">{written_jalali(_published_at(rng, i))}</li>{services}</ul>'
+        f'<h3 class="lead">{html.escape(sentence(rng, 30))}</h3>'
+        f'<div class="story">{story}<div class="hideTag"><p>{sentence(rng, 5)}</p></div></div>'
+        f'</article></main><footer><p>{sentence(rng, 20)}</p></footer></body></html>'
+    )
+
+
+def tasnim_feed_html(rng: random.Random, i: int, items: int = 20) -> str:
+    articles = []
+    for k in range(items):
+        published_at = _published_at(rng, i * items + k)
+        date = written_jalali(published_at) if k % 3 else format_jalali(published_at)
+        articles.append(f'<article class="list-item"><h2 class="title"><a href="/fa/news/{i * items + k}">'
+                        f'{html.escape(sentence(rng, 8))}</a></h2><time>{date}</time></article>')
+    return (f'<!DOCTYPE html><html lang="fa"><head><meta charset="utf-8"></head><body>'
+            f'<section class="list">{"".join(articles)}</section><a id="loadMore">more</a></body></html>')
+
+
+def virgool_profile_html(rng: random.Random, i: int, page: int = 1, posts: int = POSTS_PER_PROFILE_PAGE) -> str:
+    """Page `page` of profile `user_{i}`, with links repeated the way cards link a post twice."""
+    cards = []
+    for k in range((page - 1) * posts, page * posts):
+        link = f"/@user_{i}/post-{k}-{i}" if k % 2 else f"https://virgool.io/@user_{i}/post-{k}-{i}"
+        cards.append(f'<article class="post-card"><a href="{link}"><h3>{html.escape(sentence(rng, 6))}</h3></a>'
+                     f'<p>{html.escape(sentence(rng, 25))}</p><a href="{link}">ادامه</a></article>')
+    return (f'<!DOCTYPE html><html lang="fa"><head><meta charset="utf-8"><title>user_{i}</title></head><body>'
+            f'<div class="profile"><h1>user_{i}</h1><a href="/@user_{i}/followers">followers</a></div>'
+            f'<section class="posts">{"".join(cards)}</section>'
+            f'<aside><a href="https://virgool.io/@someone_else/other-post">other</a></aside></body></html>')
+
+
+def virgool_article_html(rng: random.Random, i: int) -> str:
+    body = paragraphs(rng, rng.randint(4, 12))
+    tags = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+    title = sentence(rng, 8)
+    published_at = _published_at(rng, i)
+    json_ld = json.dumps({"@context": "https://schema.org", "@type": "BlogPosting", "headline": title,
+                          "author": {"@type": "Person", "name": f"user_{i % 10}"},
+                          "datePublished": published_at.isoformat(), "keywords": ",".join(tags)},
+                         ensure_ascii=False)
+    return (
+        f'<!DOCTYPE html><html lang="fa"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+        f'<script type="application/ld+json">{json_ld}</script></head><body>'
+        f'<header class="navbar">{sentence(rng, 10)}</header><main><article>'
+        f'<h1>{html.escape(title)}</h1><span class="reading-time">خواندن {rng.randint(2, 9)} دقیقه</span>'
+        f'<div class="post-content">{"".join(f"<p>{html.escape(p)}</p>" for p in body)}</div>'
+        f'<div class="post-tags">{"".join(f"<a>{tag}</a>" for tag in tags)}</div>'
+        f'</article></main><div class="comments"><p>{sentence(rng, 20)}</p></div></body></html>'
+    )
+
+
+def article_html(rng: random.Random, i: int) -> str:
+    story = "".join(f"<p>{html.escape(p)}</p>" for p in paragraphs(rng, rng.randint(3, 10)))
+    return (
+        f'<!DOCTYPE html><html lang="fa"><head><meta charset="utf-8"><title>{html.escape(sentence(rng, 8))}</title>'
+        f'<meta name="description" content="{html.escape(sentence(rng, 20))}"></head><body>'
+        f'<nav class="menu">{sentence(rng, 15)}</nav><div class="sidebar">{sentence(rng, 40)}</div>'
+        f'<article><h1>{html.escape(sentence(rng, 8))}</h1>{story}</article>'
+        f'<div class="comments"><p>{sentence(rng, 30)}</p></div><footer>{sentence(rng, 10)}</footer></body></html>'
+    )
+
+
+def _recorded(directory: str | None, kind: str) -> list[str]:
+    if not directory:
+        return []
+    return [path.read_text(encoding="utf-8") for path in sorted(Path(directory, kind).glob("*.html"))]
+
+
+def load_pages(kind: str, count: int, seed: int = 0, directory: str | None = None) -> list[str]:
+    """`count` pages of `kind`, cycling over recorded ones in `directory/kind/` or generated from `seed`."""
+    if kind not in FIXTURE_KINDS:
+        raise ValueError(f"Unknown fixture kind {kind}")
+
+    recorded = _recorded(directory, kind)
+    if recorded:
+        return [recorded[i % len(recorded)] for i in range(count)]
+
+    rng = random.Random(f"{seed}:{kind}")
+    if kind == "tasnim_articles":
+        bodies = []
+        return [tasnim_article_html(rng, i, bodies) for i in range(count)]
+    if kind == "tasnim_feeds":
+        return [tasnim_feed_html(rng, i) for i in range(count)]
+    if kind == "virgool_profiles":
+        return [virgool_profile_html(rng, i // PROFILE_PAGES, i % PROFILE_PAGES + 1) for i in range(count)]
+    if kind == "virgool_articles":
+        return [virgool_article_html(rng, i) for i in range(count)]
+    return [article_html(rng, i) for i in range(count)]
+
+
+def feed_dates(raw_html: str) -> list[str]:
+    """Date texts of a feed page, as the feed crawler reads them off the `time` tags."""
+    root = lxml.html.document_fromstring(raw_html.encode("utf-8"))
+    return [" ".join(element.text_content().split()) for element in root.iter("time")]
+
+
+def make_git_repos(root: str, count: int, files: int, seed: int = 0) -> list[str]:
+    """Bare repos of small text (and a few binary) files under `root`, returned as file:// URLs."""
+    rng = random.Random(f"{seed}:git")
+    urls = []
+
+    for i in range(count):
+        work_path = os.path.join(root, "work", f"repo_{i}")
+        bare_path = os.path.join(root, "remotes", f"repo_{i}.git")
+        repo = git.Repo.init(work_path, initial_branch="main")
+        for k in range(files):
+            path = os.path.join(work_path, f"pkg_{k % 5}", f"module_{k}.py" if k % 10 else f"asset_{k}.bin")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if k % 10:
+                content = "\n".join(f"# {sentence(rng, 12)}\nvalue_{n} = {rng.random()!r}" for n in range(40))
+                Path(path).write_text(content, encoding="utf-8")
+            else:
+                Path(path).write_bytes(rng.randbytes(4096))
+        repo.git.add(A=True)
+        repo.git.commit("-m", f"Fixture repo {i}", author="bench <bench@localhost>",
+                        env={"GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@localhost"})
+
+        bare = git.Repo.clone_from(work_path, bare_path, bare=True)
+        # Crawls clone with a blob filter, which local remotes refuse unless told otherwise.
+        with bare.config_writer() as config:
+            config.set_value("uploadpack", "allowFilter", "true")
+        bare.close()
+        repo.close()
+        urls.append(Path(bare_path).absolute().as_uri())
+
+    return urls
@@ -0,0 +1,139 @@
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.binary import UuidRepresentation
+from pymongo.errors import DuplicateKeyError
+
+from sokhan.utils.db.mongo_client import MongoDBClient
+from sokhan.utils.metrics.registry import METRICS
+
+CODEC_OPTIONS = CodecOptions(uuid_representation=UuidRepresentation.STANDARD, tz_aware=True)
+
+
+def _matches(data: dict, filter: dict) -> bool:
+    for key, expected in filter.items():
+        value = data.get(key)
+        if isinstance(expected, dict) and "$in" in expected:
+            if value not in expected["$in"]:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class InMemoryMongoClient(MongoDBClient):
+    """Mongo stand-in for offline runs: documents are BSON encoded like on the wire and kept in memory.
+
+    Covers the calls ingestion makes (inserts, id lookups, find_one, GridFS files), not aggregations.
+    """
+
+    def __init__(self):
+        self._collections: dict[str, dict] = {}
+        self._files: dict[tuple[str, object], bytes] = {}
+        self._lock = threading.Lock()
+        self.bytes_written = 0
+
+    def _collection(self, collection_name: str) -> dict:
+        return self._collections.setdefault(collection_name, {})
+
+    def _decoded(self, collection_name: str) -> Iterator[dict]:
+        with self._lock:
+            raws = list(self._collection(collection_name).values())
+        return (bson.decode(raw, codec_options=CODEC_OPTIONS) for raw in raws)
+
+    def bulk_insert(self, collection_name: str, data: list[dict], ignore_duplicates: bool = False) -> None:
+        METRICS.observe_size("mongo_batch_size", len(data), collection=collection_name, op="insert")
+        with METRICS.timer("mongo_write_seconds", collection=collection_name, op="insert"):
+            encoded = [(item["_id"], bson.encode(item, codec_options=CODEC_OPTIONS)) for item in data]
+            with self._lock:
+                collection = self._collection(collection_name)
+                for _id, raw in encoded:
+                    if _id in collection:
+                        if ignore_duplicates:
+                            continue
+                        raise DuplicateKeyError(f"Duplicate _id {_id} in {collection_name}")
+                    collection[_id] = raw
+                    self.bytes_written += len(raw)
+
+    def find(self, collection_name: str, filter: dict, projection: dict | None = None,
+             sort: list[tuple[str, int]] | None = None, batch_size: int = 1000, limit: int = 0) -> Iterator[dict]:
+        rows = [data for data in self._decoded(collection_name) if _matches(data, filter)]
+        for key, direction in reversed(sort or []):
+            rows.sort(key=lambda data: (data.get(key) is not None, data.get(key)), reverse=direction < 0)
+        return iter(rows[:limit] if limit else rows)
+
+    def find_one(self, collection_name: str, filter: dict, sort: list[tuple[str, int]] | None = None,
+                 projection: dict | None = None) -> dict | None:
+        return next(self.find(collection_name, filter, sort=sort, limit=1), None)
+
+    def bulk_update(self, collection_name: str, id_map_fields: dict, unset: tuple[str, ...] = ()) -> None:
+        if not id_map_fields:
+            return
+        with METRICS.timer("mongo_write_seconds", collection=collection_name, op="update"), self._lock:
+            collection = self._collection(collection_name)
+            for _id, fields in id_map_fields.items():
+                if _id in collection:
+                    data = bson.decode(collection[_id], codec_options=CODEC_OPTIONS)
+                    data = {key: value for key, value in data.items() if key not in unset}
+                    collection[_id] = bson.encode({**data, **fields}, codec_options=CODEC_OPTIONS)
+
+    def delete_many(self, collection_name: str, filter: dict) -> int:
+        with self._lock:
+            collection = self._collection(collection_name)
+            ids = [_id for _id, raw in collection.items()
+                   if _matches(bson.decode(raw, codec_options=CODEC_OPTIONS), filter)]
+            for _id in ids:
+                del collection[_id]
+        return len(ids)
+
+    def existing_ids(self, collection_name: str, ids: list) -> set:
+        with self._lock:
+            collection = self._collection(collection_name)
+            return {_id for _id in ids if _id in collection}
+
+    def put_file(self, bucket_name: str, file_id, data: bytes) -> None:
+        with self._lock:
+            self._files.setdefault((bucket_name, file_id), data)
+
+    def get_file(self, bucket_name: str, file_id) -> bytes:
+        return self._files[(bucket_name, file_id)]
+
+    def count(self, collection_name: str) -> int:
+        return len(self._collection(collection_name))
+
+    def sample(self, collection_name: str, size: int, projection: dict | None = None) -> list[dict]:
+        raise NotImplementedError("The in-memory client does not run aggregations")
+
+    def aggregate(self, collection_name: str, pipeline: list[dict]) -> Iterator[dict]:
+        raise NotImplementedError("The in-memory client does not run aggregations")
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def use_mongo_client(client: MongoDBClient) -> Iterator[MongoDBClient]:
+    """Point every imported sokhan module (and the blob store) at `client` instead of MONGO_CLIENT."""
+    from sokhan.utils.db import mongo_client
+
+    original = mongo_client.MONGO_CLIENT
+    patched = [module for name, module in list(sys.modules.items())
+               if name.startswith("sokhan.") and getattr(module, "MONGO_CLIENT", None) is original]
+    storage = sys.modules.get("sokhan.data_entry.domain.git.storage")
+    blob_store_client = storage.GIT_BLOB_STORE._client if storage else None
+
+    for module in patched:
+        module.MONGO_CLIENT = client
+    if storage:
+        storage.GIT_BLOB_STORE._client = client
+    try:
+        yield client
+    finally:
+        for module in patched:
+            module.MONGO_CLIENT = original
+        if storage:
+            storage.GIT_BLOB_STORE._client = blob_store_client
@@ -0,0 +1,90 @@
+import os
+import resource
+import sys
+import threading
+
+from sokhan.benchmarks.configs import BENCH_RESOURCE_INTERVAL
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_HAS_PROC = os.path.isdir("/proc/self")
+
+
+def process_stats(pid: int) -> tuple[float, int] | None:
+    """CPU seconds and resident bytes of `pid` read from /proc, None once it has exited."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may hold spaces, the fields after its closing parenthesis do not.
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError):
+        return None
+    return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS, rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def pool_pids() -> list[int]:
+    parallel = sys.modules.get("sokhan.data_entry.utils.parallel")
+    pool = getattr(parallel, "_PROCESS_POOL", None)
+    return list(getattr(pool, "_processes", None) or {})
+
+
+def _max_rss_fallback() -> int:
+    # ru_maxrss is the peak of the whole run in kilobytes (bytes on macOS), not of one stage.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class ResourceSampler:
+    """Peak RSS and CPU time of this process plus the shared process pool workers over one stage."""
+
+    def __init__(self, interval: float = BENCH_RESOURCE_INTERVAL):
+        self.interval = interval
+        self.peak_rss = 0
+        self._worker_cpu_start: dict[int, float] = {}
+        self._worker_cpu: dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+
+    def _sample(self) -> None:
+        rss = 0
+        for pid in [os.getpid(), *pool_pids()]:
+            stats = process_stats(pid)
+            if stats is None:
+                continue
+            cpu, pid_rss = stats
+            rss += pid_rss
+            if pid != os.getpid():
+                self._worker_cpu_start.setdefault(pid, 0.0)
+                self._worker_cpu[pid] = cpu
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "ResourceSampler":
+        self._times = os.times()
+        if _HAS_PROC:
+            for pid in pool_pids():
+                stats = process_stats(pid)
+                if stats is not None:
+                    self._worker_cpu_start[pid] = self._worker_cpu[pid] = stats[0]
+            self._sample()
+            self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        times = os.times()
+        if _HAS_PROC:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        else:
+            self.peak_rss = _max_rss_fallback()
+
+        worker_cpu = sum(cpu - self._worker_cpu_start[pid] for pid, cpu in self._worker_cpu.items())
+        return {
+            "peak_rss_mb": round(self.peak_rss / 1024 ** 2, 1),
+            "cpu_seconds": round(times.user - self._times.user + times.system - self._times.system, 3),
+            "pool_cpu_seconds": round(worker_cpu, 3),
+        }
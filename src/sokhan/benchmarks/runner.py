@@ -0,0 +1,423 @@
+import os
+import platform
+import re
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+from loguru import logger
+
+from sokhan.benchmarks.configs import (BENCH_ERROR_RATE, BENCH_FIXTURES_DIR, BENCH_JITTER, BENCH_LATENCY, BENCH_PAGES,
+                                       BENCH_PROFILES, BENCH_REPO_FILES, BENCH_REPOS, BENCH_SEED)
+from sokhan.benchmarks.fixtures import PROFILE_PAGES, feed_dates, load_pages, make_git_repos
+from sokhan.benchmarks.mongo import InMemoryMongoClient, use_mongo_client
+from sokhan.benchmarks.resources import ResourceSampler
+from sokhan.benchmarks.server import FixtureServer
+from sokhan.utils.metrics.registry import METRICS
+
+BATCH_SIZE = 50
+PROFILE_USER_PATTERN = re.compile(r"virgool\.io/@([A-Za-z0-9_.]+)/|href=\"/@([A-Za-z0-9_.]+)/")
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile, None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+@dataclass
+class StageResult:
+    name: str
+    # "item" when every latency is one page/repo, "batch" for stages that only work in batches.
+    latency_of: str = "item"
+    items: int = 0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def timed(self, func: Callable, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+class BenchmarkRun:
+    """Runs the ingestion stages against local fixture servers and an in-memory Mongo, one result per stage."""
+
+    def __init__(self, workdir: str, pages: int = BENCH_PAGES, profiles: int = BENCH_PROFILES,
+                 repos: int = BENCH_REPOS, repo_files: int = BENCH_REPO_FILES, seed: int = BENCH_SEED,
+                 fixtures_dir: str | None = BENCH_FIXTURES_DIR):
+        self.workdir = workdir
+        self.pages = pages
+        self.profiles = profiles
+        self.repos = repos
+        self.repo_files = repo_files
+        self.seed = seed
+        self.fixtures_dir = fixtures_dir
+
+        self.mongo = InMemoryMongoClient()
+        self.results: list[dict] = []
+        self.docs = []
+        self.servers: dict[str, FixtureServer] = {}
+        self.urls: dict[str, list[str]] = {}
+        self.fixtures: dict[str, list[str]] = {}
+
+    def _load(self, kind: str, count: int) -> list[str]:
+        return load_pages(kind, count, seed=self.seed, directory=self.fixtures_dir)
+
+    def _serve(self, name: str, paths: list[str], pages: list[str]) -> None:
+        server = FixtureServer(dict(zip(paths, pages)), seed=self.seed).start()
+        self.servers[name] = server
+        self.urls[name] = [server.url(path) for path in paths]
+
+    def setup(self) -> None:
+        self.fixtures = {
+            "tasnim_articles": self._load("tasnim_articles", self.pages),
+            "tasnim_feeds": self._load("tasnim_feeds", max(1, self.pages // 20)),
+            "virgool_profiles": self._load("virgool_profiles", self.profiles * PROFILE_PAGES),
+            "virgool_articles": self._load("virgool_articles", self.pages),
+            "articles": self._load("articles", self.pages),
+        }
+        self._serve("tasnim", [f"/fa/news/{i}" for i in range(self.pages)], self.fixtures["tasnim_articles"])
+        self._serve("articles", [f"/articles/{i}" for i in range(self.pages)], self.fixtures["articles"])
+        self._serve("virgool", [*self._profile_paths(), *(f"/@user_{i % 10}/post-{i}" for i in range(self.pages))],
+                    [*self.fixtures["virgool_profiles"], *self.fixtures["virgool_articles"]])
+        self.urls["virgool_profiles"] = [url for url in self.urls["virgool"][:len(self.fixtures["virgool_profiles"])]
+                                         if "?" not in url]
+        self.urls["virgool_articles"] = self.urls["virgool"][len(self.fixtures["virgool_profiles"]):]
+        self.urls["git"] = make_git_repos(os.path.join(self.workdir, "git"), self.repos, self.repo_files, self.seed)
+
+    def _profile_paths(self) -> list[str]:
+        # Pages are served under the profile their post links belong to, numbered in the order they come.
+        paths, pages = [], {}
+        for i, raw_html in enumerate(self.fixtures["virgool_profiles"]):
+            match = PROFILE_USER_PATTERN.search(raw_html)
+            username = next(filter(None, match.groups())) if match else f"user_{i}"
+            page = pages[username] = pages.get(username, 0) + 1
+            paths.append(f"/@{username}" if page == 1 else f"/@{username}?page={page}")
+        return paths
+
+    def teardown(self) -> None:
+        for server in self.servers.values():
+            server.stop()
+
+    def article_dispatcher(self):
+        from sokhan.data_entry.crawlers import CUSTOM, TASNIM, VIRGOOL, CrawlerDispatcher
+
+        return (
+            CrawlerDispatcher.builder()
+            .register(self.servers["tasnim"].base_url, f"{TASNIM}.TasnimArticleCrawler")
+            .register(self.servers["virgool"].base_url, f"{VIRGOOL}.VirgoolArticleCrawler")
+            .set_default(f"{CUSTOM}.CustomArticleCrawler")
+            .build()
+        )
+
+    def links(self) -> list[str]:
+        # Interleaved, the way feeds and link lists mix sites.
+        return [url for pair in zip(self.urls["tasnim"], self.urls["articles"]) for url in pair]
+
+    @contextmanager
+    def stage(self, name: str, latency_of: str = "item") -> Iterator[StageResult]:
+        result = StageResult(name, latency_of)
+        requests = {server_name: server.requests for server_name, server in self.servers.items()}
+        errors = {server_name: server.errors for server_name, server in self.servers.items()}
+        since = METRICS.snapshot()
+
+        with use_mongo_client(self.mongo):
+            sampler = ResourceSampler().start()
+            started = time.perf_counter()
+            try:
+                yield result
+            finally:
+                seconds = time.perf_counter() - started
+                resources = sampler.stop()
+
+        self.results.append({
+            "name": name,
+            "items": result.items,
+            "errors": result.errors,
+            "seconds": round(seconds, 4),
+            "items_per_sec": round(result.items / seconds, 2) if seconds else None,
+            "latency_of": latency_of,
+            "p50_ms": _ms(percentile(result.latencies, 0.5)),
+            "p99_ms": _ms(percentile(result.latencies, 0.99)),
+            **resources,
+            "http_requests": sum(server.requests - requests[n] for n, server in self.servers.items()),
+            "http_errors_injected": sum(server.errors - errors[n] for n, server in self.servers.items()),
+            "metrics": METRICS.summary(since),
+        })
+        logger.info(f"{name}: {result.items} items in {seconds:.2f}s, {result.errors} errors")
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def parse_tasnim(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.domain.tasnim.crawlers import TasnimArticleCrawler
+
+    crawler = TasnimArticleCrawler()
+    with run.stage("parse_tasnim") as result:
+        for raw_html, url in zip(run.fixtures["tasnim_articles"], run.urls["tasnim"]):
+            result.timed(crawler._extract_from_html, raw_html, url)
+            result.items += 1
+
+
+def parse_articles(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.utils.extraction import extract_article
+
+    with run.stage("parse_articles") as result:
+        for raw_html in run.fixtures["articles"]:
+            result.timed(extract_article, raw_html)
+            result.items += 1
+
+
+def parse_virgool(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.domain.virgool.crawlers import parse_article
+
+    with run.stage("parse_virgool") as result:
+        for raw_html in run.fixtures["virgool_articles"]:
+            result.timed(parse_article, raw_html)
+            result.items += 1
+
+
+def parse_feed_dates(run: BenchmarkRun) -> None:
+    from sokhan.utils.jalali import parse_jalali_many
+
+    pages = [feed_dates(raw_html) for raw_html in run.fixtures["tasnim_feeds"]]
+    with run.stage("parse_feed_dates", latency_of="batch") as result:
+        for dates in pages:
+            parsed = result.timed(parse_jalali_many, dates)
+            result.items += len(dates)
+            result.errors += parsed.count(None)
+
+
+def crawl_links(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.ingest import crawl_links_one_by_one
+
+    dispatcher = run.article_dispatcher()
+    with run.stage("crawl_links") as result:
+        for link in run.links():
+            docs, _ = result.timed(crawl_links_one_by_one, [link], dispatcher)
+            result.items += len(docs)
+            result.errors += not docs
+
+
+def crawl_links_async(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.ingest import crawl_links_by_domain
+
+    dispatcher = run.article_dispatcher()
+    links = run.links()
+    run.docs = []
+    with run.stage("crawl_links_async", latency_of="batch") as result:
+        for i in range(0, len(links), BATCH_SIZE):
+            batch = links[i:i + BATCH_SIZE]
+            docs, _ = result.timed(crawl_links_by_domain, batch, dispatcher)
+            run.docs.extend(docs)
+            result.items += len(docs)
+            result.errors += len(batch) - len(docs)
+
+
+def crawl_virgool(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.ingest import crawl_links_by_domain
+
+    dispatcher = run.article_dispatcher()
+    links = run.urls["virgool_articles"]
+    with run.stage("crawl_virgool", latency_of="batch") as result:
+        for i in range(0, len(links), BATCH_SIZE):
+            batch = links[i:i + BATCH_SIZE]
+            docs, _ = result.timed(crawl_links_by_domain, batch, dispatcher)
+            run.docs.extend(docs)
+            result.items += len(docs)
+            result.errors += len(batch) - len(docs)
+
+
+def crawl_profiles(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.domain.virgool.crawlers import VirgoolProfileCrawler
+
+    crawler = VirgoolProfileCrawler()
+    with run.stage("crawl_profiles") as result:
+        for url in run.urls["virgool_profiles"]:
+            try:
+                links = result.timed(crawler.extract, url)
+                result.items += 1
+                result.errors += not links
+            except Exception as e:
+                logger.warning(f"Failed to crawl profile {url}: {e}")
+                result.errors += 1
+
+
+def normalize(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.normalization import normalize_documents
+
+    with run.stage("normalize", latency_of="batch") as result:
+        normalized = []
+        for i in range(0, len(run.docs), BATCH_SIZE):
+            normalized.extend(result.timed(normalize_documents, run.docs[i:i + BATCH_SIZE]))
+        run.docs = normalized
+        result.items = len(normalized)
+
+
+def deduplicate(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.dedup import LSHIndex, deduplicate_documents, index_documents
+
+    index = LSHIndex(os.path.join(run.workdir, "dedup.sqlite"))
+    with run.stage("deduplicate", latency_of="batch") as result:
+        kept = []
+        for i in range(0, len(run.docs), BATCH_SIZE):
+            batch_kept, duplicates = result.timed(deduplicate_documents, run.docs[i:i + BATCH_SIZE], "drop", index)
+            # Stands in for the insert committing the batch, so later batches are matched against it.
+            index_documents(batch_kept, index)
+            kept.extend(batch_kept)
+            result.items += len(batch_kept) + len(duplicates)
+        run.docs = kept
+    index.close()
+
+
+def chunk(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.chunking import insert_chunks
+    from sokhan.data_entry.domain.git.storage import GitBlobStore
+
+    blob_store = GitBlobStore(client=run.mongo)
+    with run.stage("chunk", latency_of="batch") as result:
+        for i in range(0, len(run.docs), BATCH_SIZE):
+            result.timed(insert_chunks, run.docs[i:i + BATCH_SIZE], run.mongo, blob_store)
+            result.items += min(BATCH_SIZE, len(run.docs) - i)
+
+
+def insert(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.ingest import insert_docs
+
+    with run.stage("insert", latency_of="batch") as result:
+        for i in range(0, len(run.docs), BATCH_SIZE):
+            result.items += sum(result.timed(insert_docs, run.docs[i:i + BATCH_SIZE]).values())
+
+
+def crawl_git(run: BenchmarkRun) -> None:
+    from sokhan.data_entry.domain.git.cache import RepoMirrorCache
+    from sokhan.data_entry.domain.git.crawlers import GitCrawler
+    from sokhan.data_entry.domain.git.storage import GitBlobStore
+    from sokhan.data_entry.ingest import insert_docs
+
+    crawler = GitCrawler(cache=RepoMirrorCache(os.path.join(run.workdir, "git_cache")),
+                         blob_store=GitBlobStore(client=run.mongo))
+    # The second pass finds every repo unchanged in the mirror cache, the cost of a routine re-crawl.
+    for name in ("crawl_git", "recrawl_git"):
+        with run.stage(name) as result:
+            for url in run.urls["git"]:
+                try:
+                    doc = result.timed(crawler.extract, url)
+                    if name == "crawl_git":
+                        insert_docs([doc])
+                    result.items += 1
+                except Exception as e:
+                    logger.warning(f"Failed to crawl repo {url}: {e}")
+                    result.errors += 1
+
+
+STAGES: dict[str, Callable[[BenchmarkRun], None]] = {
+    "parse_tasnim": parse_tasnim,
+    "parse_articles": parse_articles,
+    "parse_virgool": parse_virgool,
+    "parse_feed_dates": parse_feed_dates,
+    "crawl_links": crawl_links,
+    "crawl_links_async": crawl_links_async,
+    "crawl_virgool": crawl_virgool,
+    "crawl_profiles": crawl_profiles,
+    "normalize": normalize,
+    "deduplicate": deduplicate,
+    "insert": insert,
+    "chunk": chunk,
+    "crawl_git": crawl_git,
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        import git
+        return git.Repo(os.path.dirname(__file__), search_parent_directories=True).head.commit.hexsha
+    except Exception:
+        return None
+
+
+def _warm_up_process_pool() -> None:
+    # Workers start on first use, their start-up would otherwise be billed to whichever stage comes first.
+    from sokhan.data_entry.configs import PROCESS_POOL_WORKERS
+    from sokhan.data_entry.utils.parallel import get_process_pool
+
+    if PROCESS_POOL_WORKERS > 1:
+        list(get_process_pool().map(abs, range(PROCESS_POOL_WORKERS * 4)))
+
+
+def run_benchmarks(stages: list[str] | None = None, **options) -> dict:
+    """Run the named stages (all by default) in order and return the report, a failing stage is reported as such."""
+    stages = stages or list(STAGES)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages {sorted(unknown)}, choose from {list(STAGES)}")
+
+    with ExitStack() as stack:
+        workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix="sokhan-bench-"))
+        run = BenchmarkRun(workdir, **options)
+        run.setup()
+        stack.callback(run.teardown)
+        _warm_up_process_pool()
+
+        started_at = datetime.now(timezone.utc)
+        for name in stages:
+            try:
+                STAGES[name](run)
+            except Exception as e:
+                logger.error(f"Stage {name} failed: {e}")
+                run.results.append({"name": name, "error": f"{type(e).__name__}: {e}"})
+
+        return {
+            "meta": {
+                "started_at": started_at.isoformat(),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "pages": run.pages,
+                "profiles": run.profiles,
+                "repos": run.repos,
+                "repo_files": run.repo_files,
+                "seed": run.seed,
+                "fixtures": run.fixtures_dir or "synthetic",
+                "latency": BENCH_LATENCY,
+                "jitter": BENCH_JITTER,
+                "error_rate": BENCH_ERROR_RATE,
+                "mongo_bytes_written": run.mongo.bytes_written,
+            },
+            "stages": run.results,
+        }
+
+
+def _change(before, after) -> float | None:
+    if before is None or after is None or not before:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def compare(before: dict, after: dict) -> list[dict]:
+    """Per stage before/after of throughput, latency and resources, with the change in percent."""
+    before_stages = {stage["name"]: stage for stage in before["stages"]}
+    rows = []
+    for stage in after["stages"]:
+        previous = before_stages.get(stage["name"])
+        if previous is None or "error" in previous or "error" in stage:
+            rows.append({"name": stage["name"], "comparable": False})
+            continue
+
+        row = {"name": stage["name"], "comparable": True}
+        for key in ("items_per_sec", "p50_ms", "p99_ms", "peak_rss_mb", "cpu_seconds", "pool_cpu_seconds"):
+            row[key] = {"before": previous.get(key), "after": stage.get(key),
+                        "change_pct": _change(previous.get(key), stage.get(key))}
+        rows.append(row)
+    return rows
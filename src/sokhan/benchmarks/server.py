@@ -0,0 +1,84 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from sokhan.benchmarks.configs import BENCH_ERROR_RATE, BENCH_JITTER, BENCH_LATENCY, BENCH_SEED
+
+
+class FixtureServer:
+    """Serves fixed pages on 127.0.0.1 with injected latency and 500s, one instance stands in for one site."""
+
+    def __init__(self, pages: dict[str, str], latency: float = BENCH_LATENCY, jitter: float = BENCH_JITTER,
+                 error_rate: float = BENCH_ERROR_RATE, seed: int = BENCH_SEED):
+        self.pages = {path: body.encode("utf-8") for path, body in pages.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def _draw(self) -> tuple[float, bool]:
+        # One shared seeded generator, so a run's total delay and error count repeat across runs.
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.error_rate
+            self.errors += failed
+        return delay, failed
+
+    def start(self) -> "FixtureServer":
+        server = self
+
+        class FixtureHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                delay, failed = server._draw()
+                if delay > 0:
+                    time.sleep(delay)
+
+                path = unquote(self.path)
+                body = server.pages.get(path) or server.pages.get(path.split("?", 1)[0])
+                if failed or body is None:
+                    self.send_error(500 if failed else 404)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,7 @@
+import os
+
+QUERY_PAGE_SIZE = int(os.getenv("QUERY_PAGE_SIZE", 50))
+QUERY_MAX_PAGE_SIZE = int(os.getenv("QUERY_MAX_PAGE_SIZE", 500))
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH",
+                              os.path.join(os.path.expanduser("~"), ".cache", "sokhan", "search.sqlite"))
+SEARCH_INDEX_BATCH_SIZE = int(os.getenv("SEARCH_INDEX_BATCH_SIZE", 500))
@@ -0,0 +1,60 @@
+from loguru import logger
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, MongoDBClient
+
+# Every index the read side and the batch jobs (exporter, search indexer) rely on, by collection.
+# Date indexes end with _id so keyset pagination on (date, _id) is served by the index alone.
+INDEXES: dict[str, list[IndexModel]] = {
+    "tasnim_news": [
+        IndexModel([("published_at", DESCENDING), ("_id", DESCENDING)], name="published_at_id"),
+        IndexModel([("keywords", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)],
+                   name="keywords_published_at_id"),
+        IndexModel([("url", ASCENDING)], name="url"),
+        IndexModel([("created_date", ASCENDING)], name="created_date"),
+    ],
+    "custom_articles": [
+        IndexModel([("created_date", DESCENDING), ("_id", DESCENDING)], name="created_date_id"),
+        IndexModel([("url", ASCENDING)], name="url"),
+    ],
+    "virgool_articles": [
+        IndexModel([("published_at", DESCENDING), ("_id", DESCENDING)], name="published_at_id"),
+        IndexModel([("keywords", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)],
+                   name="keywords_published_at_id"),
+        IndexModel([("author", ASCENDING), ("published_at", DESCENDING)], name="author_published_at"),
+        IndexModel([("url", ASCENDING)], name="url"),
+        IndexModel([("created_date", ASCENDING)], name="created_date"),
+    ],
+    "document_chunks": [
+        IndexModel([("parent_id", ASCENDING), ("index", ASCENDING)], name="parent_id_index"),
+        # Token budget sampling filters on the tokenizer and a token_count range without reading any text.
+        IndexModel([("tokenizer", ASCENDING), ("token_count", ASCENDING)], name="tokenizer_token_count"),
+    ],
+    "repository": [
+        IndexModel([("repo_name", ASCENDING)], name="repo_name"),
+        IndexModel([("created_date", ASCENDING)], name="created_date"),
+    ],
+}
+
+
+def ensure_indexes(client: MongoDBClient = MONGO_CLIENT, drop_unknown: bool = False) -> dict[str, list[str]]:
+    """Create the missing indexes of INDEXES, optionally dropping the ones it no longer lists.
+
+    Returns the names of the created (and dropped) indexes by collection.
+    """
+    changes = {}
+    for collection_name, indexes in INDEXES.items():
+        existing = set(client.index_information(collection_name))
+        missing = [index for index in indexes if index.document["name"] not in existing]
+        changed = client.create_indexes(collection_name, missing) if missing else []
+
+        if drop_unknown:
+            wanted = {index.document["name"] for index in indexes} | {"_id_"}
+            for name in sorted(existing - wanted):
+                client.drop_index(collection_name, name)
+                changed.append(f"-{name}")
+
+        if changed:
+            logger.info(f"{collection_name}: {', '.join(changed)}")
+        changes[collection_name] = changed
+    return changes
@@ -0,0 +1,132 @@
+import base64
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, TypeVar
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.binary import UuidRepresentation
+
+from sokhan.data_access.configs import QUERY_MAX_PAGE_SIZE, QUERY_PAGE_SIZE
+from sokhan.data_access.search import SearchIndex, get_search_index
+from sokhan.data_entry.base.documents import Document
+from sokhan.utils.compression.codec import decompress_text
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, MongoDBClient
+
+D = TypeVar("D", bound=Document)
+
+_CURSOR_CODEC = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+
+@dataclass
+class Page:
+    items: list[dict]
+    # Opaque token for the next page, None on the last one.
+    next_cursor: str | None
+
+
+def encode_cursor(date: datetime | None, _id) -> str:
+    return base64.urlsafe_b64encode(bson.encode({"date": date, "id": _id}, codec_options=_CURSOR_CODEC)).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, object]:
+    data = bson.decode(base64.urlsafe_b64decode(cursor), codec_options=_CURSOR_CODEC)
+    return data["date"], data["id"]
+
+
+def _stored_id(doc_id: str):
+    try:
+        return uuid.UUID(doc_id)
+    except ValueError:
+        return doc_id
+
+
+class DocumentQuery(Generic[D]):
+    """Read side of one document collection: keyset paginated date/keyword ranges with projection.
+
+    Pages are walked newest first on (`date_field`, _id), which the indexes in `sokhan.data_access.indexes` cover,
+    so a page costs the same however deep it is. By default every field but the large `content` is returned.
+    """
+
+    def __init__(self, document_class: type[D], client: MongoDBClient = MONGO_CLIENT):
+        self.document_class = document_class
+        self.collection_name = document_class.model_construct().collection_name
+        self.date_field = document_class.date_field
+        self._client = client
+        self._compressed_fields = document_class._field_plan()[1]
+
+    def by_date(self, start: datetime | None = None, end: datetime | None = None, fields: list[str] | None = None,
+                page_size: int = QUERY_PAGE_SIZE, cursor: str | None = None) -> Page:
+        """Documents with `start <= date < end`, newest first."""
+        return self._page(self._date_filter(start, end), fields, page_size, cursor)
+
+    def by_keyword(self, keyword: str, start: datetime | None = None, end: datetime | None = None,
+                   fields: list[str] | None = None, page_size: int = QUERY_PAGE_SIZE,
+                   cursor: str | None = None) -> Page:
+        return self._page({"keywords": keyword, **self._date_filter(start, end)}, fields, page_size, cursor)
+
+    def by_url(self, url: str, fields: list[str] | None = None) -> dict | None:
+        data = self._client.find_one(self.collection_name, {"url": url}, projection=self._projection(fields))
+        return self._to_item(data) if data else None
+
+    def by_ids(self, ids: list, fields: list[str] | None = None) -> list[dict]:
+        """Documents in the order of `ids`, missing ones are left out."""
+        rows = self._client.find(self.collection_name, {"_id": {"$in": ids}}, projection=self._projection(fields))
+        items = {str(row["_id"]): self._to_item(row) for row in rows}
+        return [items[str(_id)] for _id in ids if str(_id) in items]
+
+    def search(self, text: str, fields: list[str] | None = None, limit: int = 20, offset: int = 0,
+               index: SearchIndex | None = None) -> list[dict]:
+        """Full-text search over the Persian tokens of the `normalized_fields`, best match first."""
+        hits = (index or get_search_index()).search(text, self.collection_name, limit=limit, offset=offset)
+        items = self.by_ids([_stored_id(doc_id) for _, doc_id, _ in hits], fields)
+        scores = {str(doc_id): score for _, doc_id, score in hits}
+        for item in items:
+            item["score"] = scores[str(item["id"])]
+        return items
+
+    def _date_filter(self, start: datetime | None, end: datetime | None) -> dict:
+        bounds = {}
+        if start is not None:
+            bounds["$gte"] = start
+        if end is not None:
+            bounds["$lt"] = end
+        return {self.date_field: bounds} if bounds else {}
+
+    def _projection(self, fields: list[str] | None) -> dict:
+        if fields is None:
+            return {"content": 0}
+        return {name: 1 for name in fields if name != "id"}
+
+    def _page(self, filter: dict, fields: list[str] | None, page_size: int, cursor: str | None) -> Page:
+        page_size = min(max(page_size, 1), QUERY_MAX_PAGE_SIZE)
+        if cursor is not None:
+            date, _id = decode_cursor(cursor)
+            after = [{self.date_field: date, "_id": {"$lt": _id}}]
+            if date is not None:
+                # Undated rows sort last newest first, and `$lt` on a date never matches null.
+                after += [{self.date_field: {"$lt": date}}, {self.date_field: None}]
+            filter = {"$and": [filter, {"$or": after}]}
+
+        projection = self._projection(fields)
+        if fields is not None:
+            # The next cursor is built from the date of the last row.
+            projection[self.date_field] = 1
+
+        rows = list(self._client.find(self.collection_name, filter, projection=projection,
+                                      sort=[(self.date_field, -1), ("_id", -1)], limit=page_size + 1))
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(rows[-1].get(self.date_field), rows[-1]["_id"])
+
+        return Page(items=[self._to_item(row) for row in rows], next_cursor=next_cursor)
+
+    def _to_item(self, data: dict) -> dict:
+        item = dict(data)
+        item["id"] = item.pop("_id")
+        for name in self._compressed_fields & item.keys():
+            item[name] = decompress_text(item[name])
+        return item
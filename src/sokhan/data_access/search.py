@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from sokhan.data_access.configs import SEARCH_INDEX_PATH
+from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.utils.parallel import map_in_process_pool
+from sokhan.utils.persian import tokenize, tokenize_many
+
+
+def document_text(doc: Document) -> str:
+    """The text a document is found by: its `normalized_fields`, lists flattened."""
+    parts = []
+    for name in doc.normalized_fields:
+        value = getattr(doc, name)
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(value)
+    return "\n".join(parts)
+
+
+class SearchIndex:
+    """Inverted index over Persian tokens in a sqlite FTS5 file, ranked by bm25.
+
+    Mongo's text index has no Persian stemming or folding and can not see compressed content, so documents are
+    tokenized here (see `sokhan.utils.persian.tokenize`) and only their ids are kept next to the postings.
+    """
+
+    def __init__(self, path: str = SEARCH_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._setup()
+
+    def _setup(self) -> None:
+        with self._connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS documents (rowid INTEGER PRIMARY KEY, "
+                               "collection TEXT NOT NULL, doc_id TEXT NOT NULL, UNIQUE (collection, doc_id))")
+            # Contentless: the text stays in Mongo, the index only keeps the postings.
+            connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS postings USING fts5(body, content='')")
+            connection.execute("CREATE TABLE IF NOT EXISTS watermarks (collection TEXT PRIMARY KEY, "
+                               "indexed_until TEXT NOT NULL)")
+
+    def add_many(self, collection_name: str, docs: list[Document]) -> int:
+        """Index docs not indexed yet, returns how many were added."""
+        with self._lock:
+            indexed = {doc_id for doc_id, in self._connection.execute(
+                f"SELECT doc_id FROM documents WHERE collection = ? AND doc_id IN ({','.join('?' * len(docs))})",
+                (collection_name, *(str(doc.id) for doc in docs))
+            )} if docs else set()
+        docs = [doc for doc in docs if str(doc.id) not in indexed]
+        if not docs:
+            return 0
+
+        texts = [document_text(doc) for doc in docs]
+        batches = [texts[i:i + 64] for i in range(0, len(texts), 64)]
+        bodies = [body for batch in map_in_process_pool(tokenize_many, batches, min_batch=2) for body in batch]
+
+        with self._lock, self._connection as connection:
+            for doc, body in zip(docs, bodies):
+                rowid = connection.execute("INSERT INTO documents (collection, doc_id) VALUES (?, ?)",
+                                           (collection_name, str(doc.id))).lastrowid
+                connection.execute("INSERT INTO postings (rowid, body) VALUES (?, ?)", (rowid, body))
+        return len(docs)
+
+    def search(self, query: str, collection_name: str | None = None, limit: int = 20,
+               offset: int = 0) -> list[tuple[str, str, float]]:
+        """(collection, doc id, score) of the documents holding every token of `query`, best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        match = " ".join(f'"{token}"' for token in tokens)
+        sql = ("SELECT documents.collection, documents.doc_id, bm25(postings) AS score FROM postings "
+               "JOIN documents ON documents.rowid = postings.rowid WHERE postings MATCH ?")
+        params = [match]
+        if collection_name is not None:
+            sql += " AND documents.collection = ?"
+            params.append(collection_name)
+        sql += " ORDER BY score LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        # bm25 is lower for better matches, flip it so higher scores rank first.
+        return [(collection, doc_id, -score) for collection, doc_id, score in rows]
+
+    def watermark(self, collection_name: str) -> datetime | None:
+        with self._lock:
+            row = self._connection.execute("SELECT indexed_until FROM watermarks WHERE collection = ?",
+                                           (collection_name,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def set_watermark(self, collection_name: str, indexed_until: datetime) -> None:
+        with self._lock, self._connection as connection:
+            connection.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?)",
+                               (collection_name, indexed_until.isoformat()))
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_SEARCH_INDEX: SearchIndex | None = None
+
+
+def get_search_index() -> SearchIndex:
+    global _SEARCH_INDEX
+    if _SEARCH_INDEX is None:
+        _SEARCH_INDEX = SearchIndex()
+    return _SEARCH_INDEX
@@ -1,14 +1,34 @@
 from abc import ABC, abstractmethod
-from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Iterator
 
+from loguru import logger
 from pydantic import AnyUrl
 
 from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.utils.parallel import submit_to_process_pool
+from sokhan.utils.curl.fetch import fetch_text
+from sokhan.utils.metrics.registry import METRICS, timed_call
+from sokhan.utils.profiling.configs import PROFILING_ENABLED
+from sokhan.utils.profiling.profiler import profiled
+
+
+def _profile_methods(cls: type, names: tuple[str, ...]) -> None:
+    # Only runs with PROFILING_ENABLED, otherwise the methods are left exactly as written.
+    for name in names:
+        if name in cls.__dict__:
+            setattr(cls, name, profiled(f"{cls.__name__}.{name}")(cls.__dict__[name]))
 
 
 class BaseCrawler(ABC):
     model: type[Document]
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if PROFILING_ENABLED:
+            _profile_methods(cls, ("extract", "extract_urls"))
+
     @abstractmethod
     def extract(self, url: AnyUrl) -> Document:
         pass
@@ -17,8 +37,43 @@ class BaseCrawler(ABC):
     def extract_urls(self, url: list[AnyUrl]) -> list[Document]:
         pass
 
+    def _fetch_and_parse(self, urls: list[AnyUrl], parse: Callable[[str], dict], model: type[Document],
+                         fetch_workers: int, thread_name_prefix: str) -> list[Document]:
+        """Fetch `urls` with curl and build a `model` from the fields `parse` gets out of each page, in url order.
+
+        Pages are handed to the parse pool as soon as they arrive, so parsing overlaps the slowest fetches.
+        Urls that fail to fetch or parse are logged and left out.
+        """
+        parses = {}
+        with ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix=thread_name_prefix) as fetch_pool:
+            fetches = {fetch_pool.submit(fetch_text, str(url)): i for i, url in enumerate(urls)}
+
+            for fetch in as_completed(fetches):
+                i = fetches[fetch]
+                try:
+                    parses[submit_to_process_pool(timed_call, parse, fetch.result())] = i
+                except Exception as e:
+                    logger.warning(f"Failed to fetch {urls[i]}: {e}")
+
+        out = {}
+        for parse_future in as_completed(parses):
+            i = parses[parse_future]
+            try:
+                fields, seconds = parse_future.result()
+                METRICS.observe("parse_seconds", seconds, crawler=type(self).__name__)
+                out[i] = model(url=urls[i], **fields)
+            except Exception as e:
+                logger.warning(f"Failed to extract {urls[i]}: {e}")
+
+        return [out[i] for i in sorted(out)]
+
 
 class BaseProfileCrawler(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if PROFILING_ENABLED:
+            _profile_methods(cls, ("extract",))
+
     @abstractmethod
     def extract(self, profile_url: AnyUrl) -> list[AnyUrl]:
         pass
@@ -26,5 +81,5 @@ class BaseProfileCrawler(ABC):
 
 class BaseFeedCrawler(ABC):
     @abstractmethod
-    def extract(self, home_page: AnyUrl, min_date: str) -> Iterator[list[AnyUrl]]:
+    def extract(self, home_page: AnyUrl, min_date: str | datetime) -> Iterator[list[AnyUrl]]:
         pass
@@ -1,18 +1,74 @@
-from datetime import datetime
-from typing import TypeVar, Generic
+from datetime import datetime, timezone
+from functools import partial
+from types import UnionType
+from typing import Annotated, ClassVar, TypeVar, Generic, Union, get_args, get_origin
 from abc import ABC, abstractmethod
 import uuid
 
-from pydantic import BaseModel, UUID4, Field, AnyUrl
+from pydantic import BaseModel, BeforeValidator, UUID4, Field, AnyUrl
 
+from sokhan.utils.compression.codec import compress_text, decompress_text
 from sokhan.utils.db.mongo_client import MONGO_CLIENT
 
 T = TypeVar("T", bound="Document")
 
 
+class Compressed:
+    """Field marker: the value is zstd compressed on write, opt-in with COMPRESSION_ENABLED.
+
+    Decompression is eager, on validation when the document is built from a row. Projecting the field out skips it.
+    """
+
+
+CompressedText = Annotated[str, BeforeValidator(decompress_text), Compressed()]
+
+_FIELD_PLANS_CACHE: dict[type, tuple[frozenset[str], frozenset[str]]] = {}
+
+
+def _needs_conversion(annotation) -> bool:
+    """Whether values of `annotation` can hold URLs or models, which BSON cannot encode as they are."""
+    if isinstance(annotation, type) and issubclass(annotation, (AnyUrl, BaseModel)):
+        return True
+    return any(_needs_conversion(arg) for arg in get_args(annotation))
+
+
+def _to_bson(value):
+    if isinstance(value, AnyUrl):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return _to_bson(value.model_dump())
+    if isinstance(value, dict):
+        return {key: _to_bson(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_bson(item) for item in value]
+    return value
+
+
+def _is_compressed_type(annotation, metadata: list) -> bool:
+    if any(isinstance(item, Compressed) for item in metadata):
+        return True
+    if get_origin(annotation) is Annotated:
+        return _is_compressed_type(get_args(annotation)[0], list(annotation.__metadata__))
+    if get_origin(annotation) in (Union, UnionType):
+        return any(_is_compressed_type(arg, []) for arg in get_args(annotation))
+    return False
+
+
 class Document(BaseModel, Generic[T], ABC):
     id: UUID4 = Field(default_factory=uuid.uuid4)
-    created_date: datetime = Field(default_factory=datetime.now)
+    created_date: datetime = Field(default_factory=partial(datetime.now, timezone.utc))
+    normalization_version: int = 0
+    chunking_version: int = 0
+    duplicate_of: str | None = None
+
+    # Text fields (str or list[str]) rewritten by the Persian normalization stage.
+    normalized_fields: ClassVar[tuple[str, ...]] = ()
+    # Text field fingerprinted by the near-duplicate stage.
+    dedup_field: ClassVar[str | None] = None
+    # Text field split into training chunks by the chunking stage.
+    chunk_field: ClassVar[str | None] = None
+    # Datetime field date range queries and pagination run on.
+    date_field: ClassVar[str] = "created_date"
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Document):
@@ -31,30 +87,77 @@ class Document(BaseModel, Generic[T], ABC):
     def from_dict(cls, data: dict) -> T:
         return cls(**data)
 
-    @staticmethod
-    def fix_data_types(data: dict) -> dict:
-        out = {}
-        for key, value in data.items():
-            if isinstance(value, AnyUrl):
-                out[key] = str(value)
-            elif isinstance(value, uuid.UUID):
-                out[key] = str(value)
-            elif isinstance(value, datetime):
-                out[key] = value.isoformat()
-            else:
-                out[key] = value
-        return out
+    @classmethod
+    def from_mongo_dict(cls, data: dict) -> T:
+        data = dict(data)
+        data["id"] = data.pop("_id")
+        return cls.from_dict(data)
+
+    @classmethod
+    def find_one(cls, sort: list[tuple[str, int]] | None = None, **filters) -> T | None:
+        collection_name = cls.model_construct().collection_name
+        data = MONGO_CLIENT.find_one(collection_name, filters, sort=sort)
+        return cls.from_mongo_dict(data) if data else None
+
+    @classmethod
+    def _field_plan(cls) -> tuple[frozenset[str], frozenset[str]]:
+        """Names of the fields holding URLs or models and of the compressed fields, found once per class."""
+        plan = _FIELD_PLANS_CACHE.get(cls)
+        if plan is None:
+            fields = cls.model_fields.items()
+            plan = (
+                frozenset(name for name, field in fields if _needs_conversion(field.annotation)),
+                frozenset(name for name, field in fields if _is_compressed_type(field.annotation, field.metadata)),
+            )
+            _FIELD_PLANS_CACHE[cls] = plan
+        return plan
 
     def to_mongo_dict(self) -> dict:
-        data = self.model_dump()
-        data = self.fix_data_types(data)
+        return self.to_mongo_dicts([self])[0]
+
+    @staticmethod
+    def to_mongo_dicts(docs: list["Document"]) -> list[dict]:
+        """Serialize to BSON native values, datetimes stay datetimes and the client encodes UUIDs as binary."""
+        plans = {}
+        out = []
+
+        for doc in docs:
+            cls = type(doc)
+            plan = plans.get(cls)
+            if plan is None:
+                plan = plans[cls] = (tuple(cls.model_fields), *cls._field_plan())
+            field_names, converted_fields, compressed_fields = plan
+
+            values = doc.__dict__
+            data = {name: values[name] for name in field_names}
 
-        data["_id"] = str(data["id"])
+            for name in converted_fields:
+                data[name] = _to_bson(data[name])
 
-        if "id" in data:
-            data.pop("id")
+            for name in compressed_fields:
+                data[name] = compress_text(data[name])
 
-        return data
+            data["_id"] = data.pop("id")
+            out.append(data)
+
+        return out
 
     def save(self):
         MONGO_CLIENT.bulk_insert(self.collection_name, [self.to_mongo_dict()])
+
+
+class DocumentChunk(Document):
+    """Size-bounded piece of a document's text, with its token count precomputed for training jobs."""
+    # The parent's _id: a document UUID, or the blob sha for files of crawled repos.
+    parent_id: UUID4 | str
+    parent_collection: str
+    path: str | None = None
+    index: int
+    text: CompressedText
+    char_count: int
+    token_count: int
+    tokenizer: str
+
+    @property
+    def collection_name(self):
+        return "document_chunks"
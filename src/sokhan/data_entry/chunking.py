@@ -0,0 +1,227 @@
+import itertools
+import os
+import re
+from collections import defaultdict
+from typing import Iterator
+
+from sokhan.data_entry.base.documents import Document, DocumentChunk
+from sokhan.data_entry.configs import (CHUNK_BATCH_SIZE, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, CHUNK_TOKENIZER_PATH,
+                                       GIT_BLOB_BATCH_SIZE)
+from sokhan.data_entry.domain.git.documents import GitRepositoryDocument
+from sokhan.data_entry.domain.git.storage import GIT_BLOB_STORE, GitBlobStore
+from sokhan.data_entry.utils.parallel import map_in_process_pool
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, MongoDBClient
+
+# Bump whenever the chunks `chunk_text` produces change, stored documents below it are chunked again.
+CHUNKING_VERSION = 1
+CHUNKS_COLLECTION = DocumentChunk.model_construct().collection_name
+
+PROSE, CODE = "prose", "code"
+# Files of crawled repos chunked like articles, everything else is chunked as code.
+PROSE_EXTENSIONS = {"", ".md", ".markdown", ".rst", ".txt", ".adoc", ".org"}
+
+# Cuts go right after the match: sentence ends (Persian ones too) and line breaks for prose,
+# blank lines and top-level definitions for code.
+_PROSE_BOUNDARY = re.compile(r"(?<=[.!?؟؛…])\s+|\s*\n\s*")
+_CODE_BOUNDARY = re.compile(r"\n[ \t]*\n\s*|\n(?=(?:async def|def|class|function|func|fn|impl|struct|interface|"
+                            r"export|public|private|protected|module|package)\b)")
+_LINE = re.compile(r"[^\n]*\n|[^\n]+")
+_WORD = re.compile(r"\s*\S+\s*")
+
+
+class TokenCounter:
+    """Token counts of the `tokenizers` tokenizer file at `path`, or of whitespace separated words without one."""
+
+    def __init__(self, path: str | None = CHUNK_TOKENIZER_PATH):
+        self._tokenizer = None
+        self.name = "words"
+        if path:
+            # Optional dependency, installed with the `chunking` extra.
+            from tokenizers import Tokenizer
+
+            self._tokenizer = Tokenizer.from_file(path)
+            self.name = os.path.abspath(path)
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        if self._tokenizer is None:
+            return [len(text.split()) for text in texts]
+        return [len(encoding.ids) for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+
+_TOKEN_COUNTER: TokenCounter | None = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Return the process-wide token counter, loading the tokenizer on first use (once per pool worker)."""
+    global _TOKEN_COUNTER
+    if _TOKEN_COUNTER is None:
+        _TOKEN_COUNTER = TokenCounter()
+    return _TOKEN_COUNTER
+
+
+def _split(text: str, pattern: re.Pattern) -> list[str]:
+    cuts = [0, *(match.end() for match in pattern.finditer(text)), len(text)]
+    return [text[start:end] for start, end in zip(cuts, cuts[1:]) if text[start:end].strip()]
+
+
+def _split_long(unit: str, count: int, counter: TokenCounter, max_tokens: int) -> list[tuple[str, int]]:
+    """Pieces of a sentence or block over `max_tokens`, cut at lines, then words, then characters."""
+    pieces = _LINE.findall(unit) if "\n" in unit.strip() else _WORD.findall(unit)
+    if len(pieces) <= 1:
+        size = max(1, len(unit) * max_tokens // count)
+        pieces = [unit[i:i + size] for i in range(0, len(unit), size)]
+
+    # Group pieces on their share of the unit's tokens, then check the groups with exact counts.
+    groups, group, group_tokens = [], [], 0.0
+    for piece in pieces:
+        tokens = len(piece) * count / len(unit)
+        if group and group_tokens + tokens > max_tokens:
+            groups.append("".join(group))
+            group, group_tokens = [], 0.0
+        group.append(piece)
+        group_tokens += tokens
+    groups.append("".join(group))
+
+    out = []
+    for group, group_count in zip(groups, counter.count_many(groups)):
+        if group_count > max_tokens and len(group) < len(unit):
+            out.extend(_split_long(group, group_count, counter, max_tokens))
+        else:
+            out.append((group, group_count))
+    return out
+
+
+def _units(text: str, kind: str, counter: TokenCounter, max_tokens: int) -> list[tuple[str, int]]:
+    units = _split(text, _CODE_BOUNDARY if kind == CODE else _PROSE_BOUNDARY)
+    out = []
+    for unit, count in zip(units, counter.count_many(units)):
+        if count > max_tokens:
+            out.extend(_split_long(unit, count, counter, max_tokens))
+        else:
+            out.append((unit, count))
+    return out
+
+
+def chunk_text(text: str, kind: str = PROSE, max_tokens: int = CHUNK_MAX_TOKENS,
+               overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> list[tuple[str, int, int]]:
+    """Split `text` into (chunk, char count, token count) of at most about `max_tokens` tokens.
+
+    Chunks are packed from whole sentences (prose) or blocks (code), and start with the last units of
+    the previous chunk up to `overlap_tokens`. Token counts are exact, from encoding each chunk whole.
+    """
+    counter = get_token_counter()
+    chunks = []
+    current: list[tuple[str, int]] = []
+    current_tokens = 0
+    fresh = False
+
+    for unit, count in _units(text, kind, counter, max_tokens):
+        if fresh and current_tokens + count > max_tokens:
+            chunks.append("".join(unit for unit, _ in current).strip())
+            # Carry whole units over from the end of the finished chunk.
+            tail, tail_tokens = [], 0
+            for previous, previous_count in reversed(current):
+                if tail_tokens + previous_count > overlap_tokens:
+                    break
+                tail.insert(0, (previous, previous_count))
+                tail_tokens += previous_count
+            current, current_tokens, fresh = tail, tail_tokens, False
+
+        while current and current_tokens + count > max_tokens:
+            current_tokens -= current.pop(0)[1]
+        current.append((unit, count))
+        current_tokens += count
+        fresh = True
+
+    if fresh:
+        chunks.append("".join(unit for unit, _ in current).strip())
+
+    return [(chunk, len(chunk), tokens) for chunk, tokens in zip(chunks, counter.count_many(chunks))]
+
+
+def chunk_texts(items: list[tuple[str, str]]) -> list[list[tuple[str, int, int]]]:
+    """`chunk_text` over (text, kind) pairs, the unit of work sent to the process pool."""
+    return [chunk_text(text, kind) for text, kind in items]
+
+
+def _chunk_sources(sources: list[tuple]) -> list[DocumentChunk]:
+    """Chunks of (parent id, parent collection, path, text, kind) sources, in batches over the pool."""
+    items = [(text, kind) for *_, text, kind in sources]
+    batches = [items[i:i + CHUNK_BATCH_SIZE] for i in range(0, len(items), CHUNK_BATCH_SIZE)]
+    results = itertools.chain.from_iterable(map_in_process_pool(chunk_texts, batches, min_batch=2))
+    tokenizer = get_token_counter().name
+
+    return [
+        DocumentChunk(parent_id=parent_id, parent_collection=parent_collection, path=path, index=index, text=chunk,
+                      char_count=char_count, token_count=token_count, tokenizer=tokenizer,
+                      chunking_version=CHUNKING_VERSION)
+        for (parent_id, parent_collection, path, *_), chunks in zip(sources, results)
+        for index, (chunk, char_count, token_count) in enumerate(chunks)
+    ]
+
+
+def _blob_sources(repos: list[GitRepositoryDocument], blob_store: GitBlobStore,
+                  client: MongoDBClient) -> Iterator[list[tuple]]:
+    """Sources of the repos' files not chunked at CHUNKING_VERSION yet, a blob batch at a time.
+
+    Files are chunked per blob, so a file shared by many repos (or commits) is chunked once.
+    """
+    sha_map_path = {}
+    for repo in repos:
+        for path, sha in repo.path_map_blob.items():
+            sha_map_path.setdefault(sha, path)
+
+    shas = list(sha_map_path)
+    for i in range(0, len(shas), GIT_BLOB_BATCH_SIZE):
+        batch = shas[i:i + GIT_BLOB_BATCH_SIZE]
+        chunked = {data["parent_id"] for data in client.find(
+            CHUNKS_COLLECTION, {"parent_id": {"$in": batch}, "chunking_version": CHUNKING_VERSION},
+            projection={"parent_id": 1})}
+        contents = blob_store.get_many(set(batch) - chunked)
+
+        sources = []
+        for sha, content in contents.items():
+            path = sha_map_path[sha]
+            kind = PROSE if os.path.splitext(path)[1].lower() in PROSE_EXTENSIONS else CODE
+            sources.append((sha, blob_store.collection_name, path, content, kind))
+        yield sources
+
+
+def insert_chunks(docs: list[Document], client: MongoDBClient = MONGO_CLIENT,
+                  blob_store: GitBlobStore = GIT_BLOB_STORE, stored_ids: list | None = None) -> int:
+    """Chunk the stored docs below CHUNKING_VERSION into the chunks collection and mark them chunked.
+
+    Call it once the docs are inserted: chunks link to `stored_ids` (the parents' `_id`s as stored, which for
+    older rows are string UUIDs, `doc.id` by default) and the parents' `chunking_version` is updated last, so
+    a failure anywhere leaves them for scripts/chunk_documents.py instead of with orphan chunks.
+    The `chunk_field` of articles is chunked per document, the files of repos per blob. Chunks left by an
+    older version are replaced. Duplicates marked by the dedup stage are marked chunked without chunks.
+    Returns the number of chunks inserted.
+    """
+    stored_ids = stored_ids if stored_ids is not None else [doc.id for doc in docs]
+    targets = [(doc, stored_id) for doc, stored_id in zip(docs, stored_ids) if doc.chunking_version < CHUNKING_VERSION
+               and (doc.chunk_field or isinstance(doc, GitRepositoryDocument))]
+    repos = [doc for doc, _ in targets if isinstance(doc, GitRepositoryDocument) and not doc.duplicate_of]
+    sources = [
+        (stored_id, doc.collection_name, None, getattr(doc, doc.chunk_field), PROSE)
+        for doc, stored_id in targets if doc.chunk_field and not doc.duplicate_of and getattr(doc, doc.chunk_field)
+    ]
+
+    inserted = 0
+    for batch in itertools.chain([sources], _blob_sources(repos, blob_store, client)):
+        if not batch:
+            continue
+        chunks = _chunk_sources(batch)
+        client.delete_many(CHUNKS_COLLECTION, {"parent_id": {"$in": [source[0] for source in batch]}})
+        if chunks:
+            client.bulk_insert(CHUNKS_COLLECTION, DocumentChunk.to_mongo_dicts(chunks))
+        inserted += len(chunks)
+
+    coll_map_ids = defaultdict(dict)
+    for doc, stored_id in targets:
+        doc.chunking_version = CHUNKING_VERSION
+        coll_map_ids[doc.collection_name][stored_id] = {"chunking_version": CHUNKING_VERSION}
+    for collection_name, id_map_fields in coll_map_ids.items():
+        client.bulk_update(collection_name, id_map_fields)
+
+    return inserted
@@ -0,0 +1,62 @@
+import os
+
+FEED_WATCHER_FEEDS = [url for url in os.getenv("FEED_WATCHER_FEEDS", "https://tasnimnews.ir/fa/top-stories").split(",")
+                      if url]
+FEED_WATCHER_MIN_INTERVAL = float(os.getenv("FEED_WATCHER_MIN_INTERVAL", 60))
+FEED_WATCHER_MAX_INTERVAL = float(os.getenv("FEED_WATCHER_MAX_INTERVAL", 60 * 30))
+FEED_WATCHER_INITIAL_INTERVAL = float(os.getenv("FEED_WATCHER_INITIAL_INTERVAL", 60 * 5))
+FEED_WATCHER_TARGET_ITEMS_PER_POLL = float(os.getenv("FEED_WATCHER_TARGET_ITEMS_PER_POLL", 5))
+FEED_WATCHER_RATE_SMOOTHING = float(os.getenv("FEED_WATCHER_RATE_SMOOTHING", 0.3))
+FEED_WATCHER_IDLE_BACKOFF = float(os.getenv("FEED_WATCHER_IDLE_BACKOFF", 1.5))
+FEED_WATCHER_LOOKBACK_MINUTES = int(os.getenv("FEED_WATCHER_LOOKBACK_MINUTES", 60))
+FEED_WATCHER_SEEN_URLS_LIMIT = int(os.getenv("FEED_WATCHER_SEEN_URLS_LIMIT", 50_000))
+FEED_WATCHER_CRAWL_WORKERS = int(os.getenv("FEED_WATCHER_CRAWL_WORKERS", 2))
+FEED_WATCHER_HEALTH_HOST = os.getenv("FEED_WATCHER_HEALTH_HOST", "0.0.0.0")
+FEED_WATCHER_HEALTH_PORT = int(os.getenv("FEED_WATCHER_HEALTH_PORT", 8090))
+
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", os.cpu_count() or 1))
+PROCESS_POOL_MIN_BATCH = int(os.getenv("PROCESS_POOL_MIN_BATCH", 8))
+
+GIT_CLONE_DEPTH = int(os.getenv("GIT_CLONE_DEPTH", 1))
+GIT_MAX_FILE_SIZE = int(os.getenv("GIT_MAX_FILE_SIZE", 1024 * 1024))
+GIT_BINARY_SNIFF_SIZE = int(os.getenv("GIT_BINARY_SNIFF_SIZE", 8000))
+GIT_READ_CHUNK_SIZE = int(os.getenv("GIT_READ_CHUNK_SIZE", 64 * 1024))
+GIT_CRAWLER_WORKERS = int(os.getenv("GIT_CRAWLER_WORKERS", 8))
+GIT_CACHE_ENABLED = os.getenv("GIT_CACHE_ENABLED", "true").lower() == "true"
+GIT_CACHE_DIR = os.getenv("GIT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sokhan", "git"))
+GIT_CACHE_MAX_SIZE = int(os.getenv("GIT_CACHE_MAX_SIZE", 20 * 1024 ** 3))
+GIT_INCREMENTAL = os.getenv("GIT_INCREMENTAL", "true").lower() == "true"
+GIT_BLOB_INLINE_MAX_SIZE = int(os.getenv("GIT_BLOB_INLINE_MAX_SIZE", 4 * 1024 * 1024))
+GIT_BLOB_BATCH_SIZE = int(os.getenv("GIT_BLOB_BATCH_SIZE", 500))
+
+CUSTOM_FETCH_WORKERS = int(os.getenv("CUSTOM_FETCH_WORKERS", 16))
+
+PROFILE_CRAWL_WORKERS = int(os.getenv("PROFILE_CRAWL_WORKERS", 8))
+PROFILE_INGEST_WORKERS = int(os.getenv("PROFILE_INGEST_WORKERS", 2))
+PROFILE_LINK_BATCH_SIZE = int(os.getenv("PROFILE_LINK_BATCH_SIZE", 200))
+
+VIRGOOL_FETCH_WORKERS = int(os.getenv("VIRGOOL_FETCH_WORKERS", 8))
+# Profile pages are fetched this many at a time until one of them has no new posts.
+VIRGOOL_PROFILE_PAGE_WINDOW = int(os.getenv("VIRGOOL_PROFILE_PAGE_WINDOW", 4))
+VIRGOOL_PROFILE_MAX_PAGES = int(os.getenv("VIRGOOL_PROFILE_MAX_PAGES", 200))
+VIRGOOL_WORDS_PER_MINUTE = int(os.getenv("VIRGOOL_WORDS_PER_MINUTE", 200))
+
+NORMALIZATION_BATCH_SIZE = int(os.getenv("NORMALIZATION_BATCH_SIZE", 256))
+
+CHUNKING_ENABLED = os.getenv("CHUNKING_ENABLED", "false").lower() == "true"
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", 512))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 64))
+# A tokenizer.json of the `tokenizers` library; without one tokens are counted as words.
+CHUNK_TOKENIZER_PATH = os.getenv("CHUNK_TOKENIZER_PATH")
+CHUNK_BATCH_SIZE = int(os.getenv("CHUNK_BATCH_SIZE", 64))
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_MODE = os.getenv("DEDUP_MODE", "drop")
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH",
+                             os.path.join(os.path.expanduser("~"), ".cache", "sokhan", "dedup.sqlite"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", 128))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", 16))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", 5))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+DEDUP_MAX_CANDIDATES = int(os.getenv("DEDUP_MAX_CANDIDATES", 32))
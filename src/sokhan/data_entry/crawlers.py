@@ -1,9 +1,11 @@
 from sokhan.data_entry.base.crawlers import BaseCrawler, BaseProfileCrawler, BaseFeedCrawler
-from sokhan.data_entry.domain.custom.crawlers import CustomArticleCrawler, CustomProfileCrawler, CustomFeedCrawler
-from sokhan.data_entry.domain.git.crawlers import GitCrawler
 from sokhan.data_entry.dispatcher import BaseDispatcher
-from sokhan.data_entry.domain.tasnim.crawlers import TasnimHomePageCrawler, TasnimArticleCrawler
-from sokhan.data_entry.domain.virgool.crawlers import VirgoolProfileCrawler
+
+# Registered by dotted path: selenium, langchain and GitPython are only imported by the crawlers that need them.
+CUSTOM = "sokhan.data_entry.domain.custom.crawlers"
+GIT = "sokhan.data_entry.domain.git.crawlers"
+TASNIM = "sokhan.data_entry.domain.tasnim.crawlers"
+VIRGOOL = "sokhan.data_entry.domain.virgool.crawlers"
 
 
 class CrawlerDispatcher(BaseDispatcher[BaseCrawler]):
@@ -12,9 +14,10 @@ class CrawlerDispatcher(BaseDispatcher[BaseCrawler]):
     def create_default(cls) -> "CrawlerDispatcher":
         return (
             cls.builder()
-            .register("https://github.com", GitCrawler)
-            .register("https://tasnimnews.ir", TasnimArticleCrawler)
-            .set_default(CustomArticleCrawler)
+            .register("https://github.com", f"{GIT}.GitCrawler")
+            .register("https://tasnimnews.ir", f"{TASNIM}.TasnimArticleCrawler")
+            .register("https://virgool.io", f"{VIRGOOL}.VirgoolArticleCrawler")
+            .set_default(f"{CUSTOM}.CustomArticleCrawler")
             .build()
         )
 
@@ -25,8 +28,8 @@ class ProfileCrawlerDispatcher(BaseDispatcher[BaseProfileCrawler]):
     def create_default(cls) -> "ProfileCrawlerDispatcher":
         return (
             cls.builder()
-            .register("https://virgool.io", VirgoolProfileCrawler)
-            .set_default(CustomProfileCrawler)
+            .register("https://virgool.io", f"{VIRGOOL}.VirgoolProfileCrawler")
+            .set_default(f"{CUSTOM}.CustomProfileCrawler")
             .build()
         )
 
@@ -37,7 +40,7 @@ class FeedCrawlerDispatcher(BaseDispatcher[BaseFeedCrawler]):
     def create_default(cls) -> "ProfileCrawlerDispatcher":
         return (
             cls.builder()
-            .register("https://tasnimnews.ir", TasnimHomePageCrawler)
-            .set_default(CustomFeedCrawler)
+            .register("https://tasnimnews.ir", f"{TASNIM}.TasnimHomePageCrawler")
+            .set_default(f"{CUSTOM}.CustomFeedCrawler")
             .build()
         )
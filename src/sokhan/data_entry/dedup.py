@@ -0,0 +1,226 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+from loguru import logger
+
+from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.configs import (DEDUP_BANDS, DEDUP_INDEX_PATH, DEDUP_MAX_CANDIDATES, DEDUP_MODE, DEDUP_NUM_PERM,
+                                       DEDUP_SHINGLE_SIZE, DEDUP_THRESHOLD)
+from sokhan.data_entry.utils.parallel import map_in_process_pool
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, reproducible across processes and runs."""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, shingle_size: int = DEDUP_SHINGLE_SIZE, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set[str]:
+        words = text.split()
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray | None:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        permuted = ((np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts: list[str]) -> list[np.ndarray | None]:
+        return [self.signature(text) for text in texts]
+
+
+def similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.mean(signature == other))
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures in a sqlite file, so lookups stay B-tree cheap at any corpus size."""
+
+    def __init__(self, path: str = DEDUP_INDEX_PATH, num_perm: int = DEDUP_NUM_PERM, bands: int = DEDUP_BANDS,
+                 threshold: float = DEDUP_THRESHOLD, max_candidates: int = DEDUP_MAX_CANDIDATES):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._setup()
+
+    def _setup(self) -> None:
+        with self._connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, doc_id TEXT NOT NULL, "
+                               "PRIMARY KEY (key, doc_id)) WITHOUT ROWID")
+            connection.execute("CREATE TABLE IF NOT EXISTS signatures (doc_id TEXT PRIMARY KEY, "
+                               "signature BLOB NOT NULL) WITHOUT ROWID")
+
+            params = f"{self.num_perm}/{self.bands}"
+            stored = connection.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+            if stored is None:
+                connection.execute("INSERT INTO meta VALUES ('params', ?)", (params,))
+            elif stored[0] != params:
+                raise ValueError(f"Index {self.path} was built with num_perm/bands {stored[0]}, not {params}; "
+                                 f"rebuild it with scripts/rebuild_dedup_index.py")
+
+    def _band_keys(self, signature: np.ndarray) -> list[int]:
+        keys = []
+        for band, values in enumerate(signature.reshape(self.bands, self.rows)):
+            digest = hashlib.blake2b(band.to_bytes(2, "little") + values.tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    def query(self, signature: np.ndarray) -> tuple[str, float] | None:
+        """Return the most similar indexed document above the threshold, if any."""
+        keys = self._band_keys(signature)
+        with self._lock:
+            candidates = self._connection.execute(
+                f"SELECT DISTINCT doc_id FROM bands WHERE key IN ({','.join('?' * len(keys))}) LIMIT ?",
+                (*keys, self.max_candidates)
+            ).fetchall()
+            if not candidates:
+                return None
+
+            doc_ids = [doc_id for doc_id, in candidates]
+            rows = self._connection.execute(
+                f"SELECT doc_id, signature FROM signatures WHERE doc_id IN ({','.join('?' * len(doc_ids))})",
+                doc_ids
+            ).fetchall()
+
+        best = None
+        for doc_id, blob in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (doc_id, score)
+        return best
+
+    def add(self, doc_id: str, signature: np.ndarray) -> None:
+        self.add_many([(doc_id, signature)])
+
+    def add_many(self, items: list[tuple[str, np.ndarray]]) -> None:
+        with self._lock, self._connection as connection:
+            connection.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?)",
+                                   [(key, doc_id) for doc_id, signature in items
+                                    for key in self._band_keys(signature)])
+            connection.executemany("INSERT OR REPLACE INTO signatures VALUES (?, ?)",
+                                   [(doc_id, signature.tobytes()) for doc_id, signature in items])
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_MIN_HASHER: MinHasher | None = None
+_LSH_INDEX: LSHIndex | None = None
+
+
+def get_min_hasher() -> MinHasher:
+    global _MIN_HASHER
+    if _MIN_HASHER is None:
+        _MIN_HASHER = MinHasher()
+    return _MIN_HASHER
+
+
+def get_lsh_index() -> LSHIndex:
+    global _LSH_INDEX
+    if _LSH_INDEX is None:
+        _LSH_INDEX = LSHIndex()
+    return _LSH_INDEX
+
+
+def compute_signatures(texts: list[str]) -> list[np.ndarray | None]:
+    return get_min_hasher().signatures(texts)
+
+
+def document_signatures(docs: list[Document]) -> list[np.ndarray | None]:
+    """MinHash signatures of the docs' `dedup_field`, None for docs without one, computed over the pool."""
+    texts = [(getattr(doc, doc.dedup_field) or "") if doc.dedup_field else "" for doc in docs]
+    batches = [texts[i:i + 64] for i in range(0, len(texts), 64)]
+    return [signature for batch in map_in_process_pool(compute_signatures, batches, min_batch=2)
+            for signature in batch]
+
+
+def deduplicate_documents(docs: list[Document], mode: str = DEDUP_MODE, index: LSHIndex | None = None,
+                          signatures: list[np.ndarray | None] | None = None) -> tuple[list[Document], dict[str, str]]:
+    """Drop (or, in "link" mode, mark with `duplicate_of`) near-duplicates of indexed docs and of each other.
+
+    The index is only read here, kept docs are added to it by `index_documents` once they are stored, so a
+    failed insert never leaves signatures behind that would drop the same docs on the next run.
+    Returns the kept docs and the id of each duplicate mapped to the id of its original.
+    """
+    if mode not in ("drop", "link"):
+        raise ValueError(f"Unknown dedup mode {mode}")
+
+    index = index or get_lsh_index()
+    # Docs of the same batch are matched against each other in a throwaway in-memory index.
+    batch_index = LSHIndex(":memory:", index.num_perm, index.bands, index.threshold, index.max_candidates)
+    kept, duplicates = [], {}
+
+    if signatures is None:
+        signatures = document_signatures(docs)
+
+    for doc, signature in zip(docs, signatures):
+        if signature is None:
+            kept.append(doc)
+            continue
+
+        match = index.query(signature) or batch_index.query(signature)
+        if match is None:
+            batch_index.add(str(doc.id), signature)
+            kept.append(doc)
+            continue
+
+        original_id, score = match
+        duplicates[str(doc.id)] = original_id
+        logger.debug(f"{doc.id} is a near-duplicate of {original_id} ({score:.2f})")
+        if mode == "link":
+            doc.duplicate_of = original_id
+            kept.append(doc)
+
+    batch_index.close()
+    if duplicates:
+        logger.info(f"Found {len(duplicates)} near-duplicates in {len(docs)} docs")
+    return kept, duplicates
+
+
+def index_documents(docs: list[Document], index: LSHIndex | None = None,
+                    signatures: list[np.ndarray | None] | None = None) -> int:
+    """Add the signatures of stored docs to the index, call it only after they are inserted.
+
+    Linked duplicates are left out like in scripts/rebuild_dedup_index.py. Returns the number of indexed docs.
+    """
+    index = index or get_lsh_index()
+    if signatures is None:
+        signatures = document_signatures(docs)
+
+    items = [(str(doc.id), signature) for doc, signature in zip(docs, signatures)
+             if signature is not None and not doc.duplicate_of]
+    if items:
+        index.add_many(items)
+    return len(items)
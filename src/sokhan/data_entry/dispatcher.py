@@ -1,3 +1,4 @@
+import importlib
 import re
 from typing import Type, TypeVar, Generic
 
@@ -10,20 +11,36 @@ T = TypeVar('T')
 TCrawler = TypeVar('TCrawler')
 TProfileCrawler = TypeVar('TProfileCrawler')
 
+# A crawler class, or its dotted path ("package.module.Class") so its module is only imported once routed to.
+CrawlerRef = Type[T] | str
+
+_RESOLVED: dict[str, type] = {}
+
+
+def resolve_crawler(crawler: CrawlerRef) -> type:
+    if not isinstance(crawler, str):
+        return crawler
+
+    cls = _RESOLVED.get(crawler)
+    if cls is None:
+        module_name, _, class_name = crawler.rpartition(".")
+        cls = _RESOLVED[crawler] = getattr(importlib.import_module(module_name), class_name)
+    return cls
+
 
 class DispatcherBuilder(Generic[T]):
     def __init__(self):
-        self._patterns: list[tuple[str, Type[T]]] = []
-        self._default_crawler: Type[T] = None
+        self._patterns: list[tuple[str, CrawlerRef]] = []
+        self._default_crawler: CrawlerRef = None
 
-    def register(self, domain: AnyUrl, crawler: Type[T]) -> "DispatcherBuilder[T]":
+    def register(self, domain: AnyUrl, crawler: CrawlerRef) -> "DispatcherBuilder[T]":
         """Register a crawler for a specific domain pattern."""
         domain_str = get_domain(domain)
-        pattern = r"https://(www\.)?{}/*".format(re.escape(domain_str))  # TODO: Enhance Pattern
+        pattern = r"https?://(www\.)?{}/*".format(re.escape(domain_str))  # TODO: Enhance Pattern
         self._patterns.append((pattern, crawler))
         return self
 
-    def set_default(self, default_crawler: Type[T]) -> "DispatcherBuilder[T]":
+    def set_default(self, default_crawler: CrawlerRef) -> "DispatcherBuilder[T]":
         """Set the default crawler for unmatched URLs."""
         self._default_crawler = default_crawler
         return self
@@ -41,16 +58,16 @@ class DispatcherBuilder(Generic[T]):
 
 class BaseDispatcher(Generic[T]):
     def __init__(self):
-        self._crawlers: dict[str, Type[T]] = {}
-        self._default_crawler: Type[T] = None
+        self._crawlers: dict[str, CrawlerRef] = {}
+        self._default_crawler: CrawlerRef = None
 
     def get_crawler(self, url: AnyUrl) -> T:
         for pattern, crawler in self._crawlers.items():
             if re.match(pattern, url):
-                return crawler()
+                return resolve_crawler(crawler)()
 
         logger.warning("No crawler found for {}".format(url))
-        return self._default_crawler()
+        return resolve_crawler(self._default_crawler)()
 
     @classmethod
     def builder(cls) -> DispatcherBuilder[T]:
@@ -1,40 +1,28 @@
 from typing import Iterator
 
-from langchain_community.document_loaders import AsyncHtmlLoader
-from langchain_community.document_transformers.html2text import Html2TextTransformer
 from pydantic import AnyUrl
 
-from sokhan.data_entry.base.crawlers import BaseCrawler, BaseFeedCrawler
+from sokhan.data_entry.base.crawlers import BaseCrawler, BaseFeedCrawler, BaseProfileCrawler
+from sokhan.data_entry.configs import CUSTOM_FETCH_WORKERS
 from sokhan.data_entry.domain.custom.documents import CustomArticleDocument
+from sokhan.data_entry.utils.extraction import extract_article
 
 
 class CustomArticleCrawler(BaseCrawler):
-    def __init__(self):
-        self._html2text_model = Html2TextTransformer()
+    def __init__(self, fetch_workers: int = CUSTOM_FETCH_WORKERS):
+        self.fetch_workers = fetch_workers
 
-    def extract(self, url: AnyUrl) -> list[CustomArticleDocument]:
-        return self.extract_urls([url])[0]
+    def extract(self, url: AnyUrl) -> CustomArticleDocument:
+        docs = self.extract_urls([url])
+        if not docs:
+            raise ValueError(f"Failed to crawl {url}")
+        return docs[0]
 
     def extract_urls(self, urls: list[AnyUrl]) -> list[CustomArticleDocument]:
-        out = []
-        loader = AsyncHtmlLoader(urls)
-        docs = loader.load()
+        return self._fetch_and_parse(urls, extract_article, CustomArticleDocument, self.fetch_workers, "custom-fetch")
 
-        docs_transformed = self._html2text_model.transform_documents(docs)
 
-        for i in range(len(docs_transformed)):
-            doc_transformed = docs_transformed[0]
-
-            out.append(CustomArticleDocument(url=urls[i],
-                                             title=doc_transformed.metadata["title"],
-                                             description=doc_transformed.metadata["description"],
-                                             language=doc_transformed.metadata["language"],
-                                             content=doc_transformed.page_content
-                                             )
-                       )
-
-
-class CustomProfileCrawler(BaseCrawler):
+class CustomProfileCrawler(BaseProfileCrawler):
     def extract(self, url: AnyUrl) -> list[AnyUrl]:
         raise NotImplementedError()
 
@@ -1,6 +1,8 @@
+from typing import ClassVar
+
 from pydantic import AnyUrl
 
-from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.base.documents import CompressedText, Document
 
 
 class CustomArticleDocument(Document):
@@ -8,7 +10,11 @@ class CustomArticleDocument(Document):
     title: str
     description: str
     language: str
-    content: str
+    content: CompressedText
+
+    normalized_fields: ClassVar[tuple[str, ...]] = ("title", "description", "content")
+    dedup_field: ClassVar[str | None] = "content"
+    chunk_field: ClassVar[str | None] = "content"
 
     @property
     def collection_name(self):
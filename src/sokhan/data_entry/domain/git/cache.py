@@ -0,0 +1,125 @@
+import hashlib
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import git
+from pydantic import AnyUrl
+from loguru import logger
+
+from sokhan.data_entry.configs import GIT_CACHE_DIR, GIT_CACHE_MAX_SIZE, GIT_CLONE_DEPTH, GIT_MAX_FILE_SIZE
+
+CRAWLED_REFS = "refs/sokhan/crawled"
+
+
+def clone_repo(url: AnyUrl, local_path: str, max_file_size: int = GIT_MAX_FILE_SIZE) -> git.Repo:
+    # Bare, shallow and blob-filtered: no checkout is written and blobs above the size limit never leave the remote.
+    return git.Repo.clone_from(
+        str(url), local_path,
+        bare=True,
+        depth=GIT_CLONE_DEPTH,
+        single_branch=True,
+        no_tags=True,
+        filter=f"blob:limit={max_file_size}",
+    )
+
+
+def fetch_repo(repo: git.Repo, max_file_size: int = GIT_MAX_FILE_SIZE) -> None:
+    # Bare clones have no fetch refspec, so fetch the remote HEAD and move the local branch onto it.
+    repo.git.fetch("origin", "HEAD", depth=GIT_CLONE_DEPTH, no_tags=True, filter=f"blob:limit={max_file_size}")
+    repo.git.update_ref("HEAD", "FETCH_HEAD")
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return total
+
+
+class RepoMirrorCache:
+    """Bare mirrors kept on disk between crawls, keyed by repo URL and evicted least recently used first."""
+
+    def __init__(self, root: str = GIT_CACHE_DIR, max_size: int = GIT_CACHE_MAX_SIZE,
+                 max_file_size: int = GIT_MAX_FILE_SIZE):
+        self.root = root
+        self.max_size = max_size
+        self.max_file_size = max_file_size
+        os.makedirs(self.root, exist_ok=True)
+
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def path_for(self, url: AnyUrl) -> str:
+        key = hashlib.sha1(str(url).rstrip("/").encode("utf-8")).hexdigest()
+        return os.path.join(self.root, f"{key}.git")
+
+    def _lock_for(self, path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    @contextmanager
+    def open(self, url: AnyUrl) -> Iterator[git.Repo]:
+        """Yield an up to date mirror of `url`, cloning it on first use and fetching it afterwards."""
+        path = self.path_for(url)
+
+        with self._lock_for(path):
+            repo = self._update(url, path)
+            try:
+                yield repo
+            finally:
+                repo.close()
+                os.utime(path)
+
+        self.evict()
+
+    def _update(self, url: AnyUrl, path: str) -> git.Repo:
+        if os.path.isdir(path):
+            try:
+                repo = git.Repo(path)
+                fetch_repo(repo, self.max_file_size)
+                return repo
+            except Exception as e:
+                logger.warning(f"Mirror of {url} is unusable, cloning again: {e}")
+                shutil.rmtree(path, ignore_errors=True)
+
+        return clone_repo(url, path, self.max_file_size)
+
+    @staticmethod
+    def keep_commits(repo: git.Repo, commit_shas: set[str]) -> None:
+        """Keep exactly `commit_shas` reachable under CRAWLED_REFS, so the next fetch can still diff against them."""
+        for ref in repo.git.for_each_ref("--format=%(refname)", CRAWLED_REFS).split():
+            if ref.rsplit("/", 1)[1] not in commit_shas:
+                repo.git.update_ref("-d", ref)
+        for commit_sha in commit_shas:
+            repo.git.update_ref(f"{CRAWLED_REFS}/{commit_sha}", commit_sha)
+
+    def evict(self) -> None:
+        mirrors = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                mirrors.append((os.path.getmtime(path), path, dir_size(path)))
+
+        total = sum(size for _, _, size in mirrors)
+
+        for _, path, size in sorted(mirrors):
+            if total <= self.max_size:
+                break
+
+            lock = self._lock_for(path)
+            if not lock.acquire(blocking=False):
+                continue
+
+            try:
+                logger.info(f"Evicting git mirror {path} ({size} bytes)")
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+            finally:
+                lock.release()
@@ -1,14 +1,27 @@
+import codecs
 import tempfile
-import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from urllib.parse import urlparse
 
 import git
 from pydantic import AnyUrl
 from loguru import logger
 
+from sokhan.data_entry.configs import (GIT_BINARY_SNIFF_SIZE, GIT_BLOB_BATCH_SIZE, GIT_CACHE_ENABLED,
+                                       GIT_CRAWLER_WORKERS, GIT_INCREMENTAL, GIT_MAX_FILE_SIZE, GIT_READ_CHUNK_SIZE)
+from sokhan.data_entry.domain.git.cache import RepoMirrorCache, clone_repo
 from sokhan.data_entry.domain.git.documents import GitRepositoryDocument
+from sokhan.data_entry.domain.git.storage import GIT_BLOB_STORE, GitBlobStore
 from sokhan.data_entry.base.crawlers import BaseCrawler
 
+DEFAULT_IGNORES = [".git", ".toml", ".lock", ".png", ".jpg"]
+
+
+class BinaryContentException(Exception):
+    pass
+
 
 def is_ignore(filename: str, ignores: list[str]) -> bool:
     for name in filename.split("/"):
@@ -18,46 +31,220 @@ def is_ignore(filename: str, ignores: list[str]) -> bool:
     return False
 
 
-def read_content(filename: str) -> str:
-    with open(filename, "r") as f:
-        return f.read()
+def get_repo_name(url: AnyUrl) -> str:
+    name = urlparse(str(url)).path.rstrip("/").rsplit("/", 1)[-1]
+    return name.removesuffix(".git")
 
 
-class GitCrawler(BaseCrawler):
-    def extract(self, url: AnyUrl) -> GitRepositoryDocument:
-        local_tmp = tempfile.mkdtemp()
+def read_content(stream, sniff_size: int = GIT_BINARY_SNIFF_SIZE, chunk_size: int = GIT_READ_CHUNK_SIZE) -> str:
+    """Decode a blob stream chunk by chunk, failing fast on binary (null byte in the head or non utf-8) data."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+
+    head = stream.read(sniff_size)
+    if b"\0" in head:
+        raise BinaryContentException("Null byte found")
+
+    chunk = head
+    try:
+        while chunk:
+            parts.append(decoder.decode(chunk))
+            chunk = stream.read(chunk_size)
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        raise BinaryContentException(str(e))
 
+    return "".join(parts)
+
+
+def drain(stream, chunk_size: int = GIT_READ_CHUNK_SIZE) -> None:
+    # The object database shares one `git cat-file --batch` process, unread bytes would corrupt the next read.
+    while stream.read(chunk_size):
+        pass
+
+
+class GitCrawler(BaseCrawler):
+    def __init__(self, ignores: list[str] | None = None, max_file_size: int = GIT_MAX_FILE_SIZE,
+                 max_workers: int = GIT_CRAWLER_WORKERS, cache: RepoMirrorCache | None = None,
+                 incremental: bool = GIT_INCREMENTAL, blob_store: GitBlobStore | None = None):
+        self.ignores = DEFAULT_IGNORES if ignores is None else ignores
+        self.max_file_size = max_file_size
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None or not GIT_CACHE_ENABLED else _get_default_cache()
+        self.incremental = incremental and self.cache is not None
+        self.blob_store = blob_store or GIT_BLOB_STORE
+
+    @staticmethod
+    def _present_blob_sizes(repo: git.Repo) -> dict[str, int]:
+        # Only lists objects that are really in the clone, so filtered-out blobs are not lazily fetched.
+        output = repo.git.cat_file("--batch-check=%(objectname) %(objecttype) %(objectsize)", "--batch-all-objects")
+        sizes = {}
+        for line in output.splitlines():
+            sha, object_type, size = line.split()
+            if object_type == "blob":
+                sizes[sha] = int(size)
+        return sizes
+
+    @staticmethod
+    def _changed_paths(repo: git.Repo, base_sha: str, head_sha: str) -> tuple[set[str], set[str]]:
+        """Return the (added or modified, deleted) paths between two commits, comparing trees only."""
+        output = repo.git.diff("--name-status", "--no-renames", "-z", base_sha, head_sha)
+        fields = output.split("\0")
+        changed, deleted = set(), set()
+        for status, path in zip(fields[0::2], fields[1::2]):
+            (deleted if status == "D" else changed).add(path)
+        return changed, deleted
+
+    def _iter_blobs(self, repo: git.Repo, paths: set[str] | None) -> Iterator[git.Blob]:
+        tree = repo.head.commit.tree
+        if paths is None:
+            yield from tree.traverse()
+            return
+
+        for path in paths:
+            try:
+                yield tree[path]
+            except KeyError:
+                pass
+
+    def _read_blob(self, repo: git.Repo, item: git.Blob, url: AnyUrl) -> str | None:
+        stream = repo.odb.stream(item.binsha)
         try:
-            git.Git(local_tmp).clone(url)
+            return read_content(stream)
+        except BinaryContentException:
+            logger.debug(f"Skipping binary file {item.path} from repo {url}")
+        except Exception as e:
+            logger.warning(f"Cant Read file {item.path} from repo {url}: {e}")
+        finally:
+            drain(stream)
+        return None
 
-            repo_name = os.listdir(local_tmp)[0]
+    def _store_files(self, repo: git.Repo, url: AnyUrl, paths: set[str] | None = None) -> dict[str, str]:
+        """Map paths to blob shas of the text files, reading and writing only blobs the store does not have yet."""
+        blob_sizes = self._present_blob_sizes(repo)
+        candidates = {}
 
-            path_map_content = {}
+        for item in self._iter_blobs(repo, paths):
+            if item.type != "blob" or item.mode == item.link_mode or is_ignore(item.path, self.ignores):
+                continue
 
-            for root, dirs, files in os.walk(local_tmp):
-                relative_root = root.replace(os.path.join(local_tmp, repo_name), '')
+            size = blob_sizes.get(item.hexsha)
+            if size is None or size > self.max_file_size:
+                logger.debug(f"Skipping large file {item.path} from repo {url}")
+                continue
 
-                for file in files:
-                    relative_path = os.path.join(relative_root, file)
-                    real_path = os.path.join(root, file)
+            candidates[item.path] = item
 
-                    if not is_ignore(relative_path, ignore):
-                        try:
-                            path_map_content[relative_path] = read_content(real_path)
-                        except Exception as e:
-                            logger.warning(f"Cant Read file {relative_path} from repo {url}", e)
+        missing = self.blob_store.missing({item.hexsha for item in candidates.values()})
+        logger.info(f"{url}: {len(missing)} of {len(candidates)} files are new blobs")
 
-            doc = GitRepositoryDocument(repo_path=url, repo_name=repo_name, path_map_content=path_map_content)
+        path_map_blob = {}
+        pending, skipped = {}, set()
 
-        finally:
-            shutil.rmtree(local_tmp)
+        for path, item in candidates.items():
+            sha = item.hexsha
+            if sha in missing and sha not in pending and sha not in skipped:
+                content = self._read_blob(repo, item, url)
+                if content is None:
+                    skipped.add(sha)
+                else:
+                    pending[sha] = content
 
+                if len(pending) >= GIT_BLOB_BATCH_SIZE:
+                    self.blob_store.put_many(pending)
+                    missing -= pending.keys()
+                    pending = {}
+
+            if sha not in skipped:
+                path_map_blob[path] = sha
+
+        self.blob_store.put_many(pending)
+        return path_map_blob
+
+    def _store_incremental(self, repo: git.Repo, url: AnyUrl,
+                           previous: GitRepositoryDocument | None) -> dict[str, str]:
+        head_sha = repo.head.commit.hexsha
+        if previous is None or not previous.commit_sha:
+            return self._store_files(repo, url)
+
+        try:
+            changed, deleted = self._changed_paths(repo, previous.commit_sha, head_sha)
+        except git.GitCommandError:
+            logger.info(f"Last crawled commit of {url} is not in the mirror, crawling it fully")
+            return self._store_files(repo, url)
+
+        logger.info(f"{url}: {len(changed)} changed and {len(deleted)} deleted files since {previous.commit_sha[:8]}")
+        path_map_blob = {path: sha for path, sha in previous.path_map_blob.items()
+                         if path not in changed and path not in deleted}
+        path_map_blob.update(self._store_files(repo, url, changed))
+        return path_map_blob
+
+    def _crawl(self, url: AnyUrl) -> tuple[GitRepositoryDocument, bool]:
+        """Crawl `url`, also telling whether it changed since the last crawled document."""
+        if self.cache is None:
+            local_tmp = tempfile.mkdtemp()
+            try:
+                repo = clone_repo(url, local_tmp, self.max_file_size)
+                try:
+                    doc = self._build_document(url, repo.head.commit.hexsha, self._store_files(repo, url))
+                finally:
+                    repo.close()
+            finally:
+                shutil.rmtree(local_tmp)
+            return doc, True
+
+        previous = GitRepositoryDocument.find_one(sort=[("created_date", -1)], repo_path=str(url)) \
+            if self.incremental else None
+
+        with self.cache.open(url) as repo:
+            head_sha = repo.head.commit.hexsha
+            if previous is not None and previous.commit_sha == head_sha:
+                return previous, False
+
+            if self.incremental:
+                path_map_blob = self._store_incremental(repo, url, previous)
+            else:
+                path_map_blob = self._store_files(repo, url)
+
+            # The new head is not stored yet, so the stored commit stays reachable too until a later crawl
+            # finds the new one in Mongo.
+            stored = {previous.commit_sha} if previous is not None and previous.commit_sha else set()
+            self.cache.keep_commits(repo, stored | {head_sha})
+
+        return self._build_document(url, head_sha, path_map_blob), True
+
+    @staticmethod
+    def _build_document(url: AnyUrl, commit_sha: str, path_map_blob: dict[str, str]) -> GitRepositoryDocument:
+        return GitRepositoryDocument(repo_path=url, repo_name=get_repo_name(url), commit_sha=commit_sha,
+                                     path_map_blob=path_map_blob)
+
+    def extract(self, url: AnyUrl) -> GitRepositoryDocument:
+        doc, _ = self._crawl(url)
         return doc
 
-    def extract_urls(self, urls: list[AnyUrl], ignore=[".git", ".toml", ".lock", ".png", ".jpg"]) -> list[
-        GitRepositoryDocument]:
-        out = []
-        for url in urls:
-            doc = self.extract(url)
-            out.append(doc)
-        return out
+    def _safe_crawl(self, url: AnyUrl) -> GitRepositoryDocument | None:
+        try:
+            doc, changed = self._crawl(url)
+        except Exception as e:
+            logger.error(f"Failed to crawl repo {url}: {e}")
+            return None
+
+        if not changed:
+            logger.info(f"Repo {url} has not changed since {doc.commit_sha[:8]}, skipping")
+            return None
+        return doc
+
+    def extract_urls(self, urls: list[AnyUrl]) -> list[GitRepositoryDocument]:
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="git-crawler") as executor:
+            docs = executor.map(self._safe_crawl, urls)
+            return [doc for doc in docs if doc is not None]
+
+
+_DEFAULT_CACHE: RepoMirrorCache | None = None
+
+
+def _get_default_cache() -> RepoMirrorCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = RepoMirrorCache()
+    return _DEFAULT_CACHE
@@ -1,18 +1,61 @@
+from collections.abc import Iterator, Mapping
+from functools import cached_property
 from typing import Annotated
 
 from pydantic import AnyUrl, Field
 
-from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.base.documents import CompressedText, Document
 
 FilePath = Annotated[str, "filesystem path"]
 CodeContent = Annotated[str, "code content"]
+BlobSha = Annotated[str, "git blob sha"]
+
+
+class GitBlobDocument(Document):
+    """Content of one file, keyed by its git blob sha so identical files are stored once across repos."""
+    id: BlobSha
+    size: int
+    content: CompressedText | None = None
+    in_gridfs: bool = False
+
+    @property
+    def collection_name(self):
+        return "repository_blobs"
+
+
+class LazyBlobContents(Mapping[FilePath, CodeContent]):
+    """Read-only path to content view of a manifest, blobs are loaded on first access."""
+
+    def __init__(self, path_map_blob: dict[FilePath, BlobSha]):
+        self._path_map_blob = path_map_blob
+        self._cache: dict[BlobSha, CodeContent] = {}
+
+    def __getitem__(self, path: FilePath) -> CodeContent:
+        from sokhan.data_entry.domain.git.storage import GIT_BLOB_STORE
+
+        sha = self._path_map_blob[path]
+        if sha not in self._cache:
+            self._cache[sha] = GIT_BLOB_STORE.get(sha)
+        return self._cache[sha]
+
+    def __iter__(self) -> Iterator[FilePath]:
+        return iter(self._path_map_blob)
+
+    def __len__(self) -> int:
+        return len(self._path_map_blob)
 
 
 class GitRepositoryDocument(Document):
-    path_map_content: dict[FilePath, CodeContent] = Field(default_factory=dict)
+    """Manifest of a crawled repo, file contents live in `GitBlobDocument`s referenced by sha."""
+    path_map_blob: dict[FilePath, BlobSha] = Field(default_factory=dict)
     repo_path: AnyUrl
     repo_name: str
+    commit_sha: str | None = None
 
     @property
     def collection_name(self):
         return "repository"
+
+    @cached_property
+    def path_map_content(self) -> LazyBlobContents:
+        return LazyBlobContents(self.path_map_blob)
@@ -0,0 +1,57 @@
+from sokhan.data_entry.configs import GIT_BLOB_BATCH_SIZE, GIT_BLOB_INLINE_MAX_SIZE
+from sokhan.data_entry.domain.git.documents import BlobSha, CodeContent, GitBlobDocument
+from sokhan.utils.compression.codec import compress_bytes, decompress_bytes, decompress_text
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, MongoDBClient
+
+
+class GitBlobStore:
+    """Content-addressed file storage: small blobs inline in `repository_blobs`, large ones in GridFS."""
+
+    def __init__(self, client: MongoDBClient = MONGO_CLIENT, inline_max_size: int = GIT_BLOB_INLINE_MAX_SIZE):
+        self._client = client
+        self.inline_max_size = inline_max_size
+        self.collection_name = GitBlobDocument.model_construct().collection_name
+
+    def missing(self, shas: set[BlobSha]) -> set[BlobSha]:
+        shas = list(shas)
+        found = set()
+        for i in range(0, len(shas), GIT_BLOB_BATCH_SIZE):
+            found |= self._client.existing_ids(self.collection_name, shas[i:i + GIT_BLOB_BATCH_SIZE])
+        return set(shas) - found
+
+    def put_many(self, sha_map_content: dict[BlobSha, CodeContent]) -> None:
+        docs = []
+        for sha, content in sha_map_content.items():
+            data = content.encode("utf-8")
+            if len(data) > self.inline_max_size:
+                self._client.put_file(self.collection_name, sha, compress_bytes(data))
+                docs.append(GitBlobDocument(id=sha, size=len(data), in_gridfs=True))
+            else:
+                docs.append(GitBlobDocument(id=sha, size=len(data), content=content))
+
+        if docs:
+            # Concurrent crawls may race on the same vendored file; the first writer wins.
+            self._client.bulk_insert(self.collection_name, GitBlobDocument.to_mongo_dicts(docs),
+                                     ignore_duplicates=True)
+
+    def get(self, sha: BlobSha) -> CodeContent:
+        data = self._client.find_one(self.collection_name, {"_id": sha})
+        if data is None:
+            raise KeyError(sha)
+
+        if data.get("in_gridfs"):
+            return decompress_bytes(self._client.get_file(self.collection_name, sha)).decode("utf-8")
+        return decompress_text(data["content"])
+
+    def get_many(self, shas: set[BlobSha]) -> dict[BlobSha, CodeContent]:
+        contents = {}
+        for data in self._client.find(self.collection_name, {"_id": {"$in": list(shas)}}):
+            if data.get("in_gridfs"):
+                compressed = self._client.get_file(self.collection_name, data["_id"])
+                contents[data["_id"]] = decompress_bytes(compressed).decode("utf-8")
+            else:
+                contents[data["_id"]] = decompress_text(data["content"])
+        return contents
+
+
+GIT_BLOB_STORE = GitBlobStore()
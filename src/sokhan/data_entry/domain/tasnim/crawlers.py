@@ -1,8 +1,9 @@
 import random
 import time
+from datetime import datetime, timezone
+from functools import partial
 from typing import Iterator
 
-import jdatetime
 from bs4 import BeautifulSoup
 from langchain_community.document_loaders import AsyncHtmlLoader
 from pydantic import AnyUrl
@@ -14,42 +15,14 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from sokhan.data_entry.base.crawlers import BaseCrawler, BaseFeedCrawler
 from sokhan.data_entry.utils.selenium_crawler import BaseSeleniumCrawler
+from sokhan.data_entry.utils.parallel import map_in_process_pool
+from sokhan.data_entry.utils.parsing import class_strainer, make_soup
 from sokhan.data_entry.base.documents import Document
 from sokhan.data_entry.domain.tasnim.documents import TasnimNews
-from sokhan.utils.general import from_jalali_to_gregorian
+from sokhan.utils.metrics.registry import METRICS, timed_call
+from sokhan.utils.jalali import as_datetime, format_gregorian, format_jalali, parse_jalali, parse_jalali_many
 
-PERSIAN_MONTHS = {
-    "فروردین": "01", "اردیبهشت": "02", "خرداد": "03",
-    "تیر": "04", "مرداد": "05", "شهریور": "06",
-    "مهر": "07", "آبان": "08", "آذر": "09",
-    "دی": "10", "بهمن": "11", "اسفند": "12"
-}
-
-
-def _fix_time_field(time_field: str) -> str:
-    if "ساعت پیش" in time_field:
-        hour = int(time_field.split()[0])
-        today = jdatetime.date.today() - jdatetime.timedelta(hours=hour)
-    elif "دقیقه پیش" in time_field:
-        minute = int(time_field.split()[0])
-        today = jdatetime.date.today() - jdatetime.timedelta(minutes=minute)
-    else:
-        return _fix_shamsi_date(time_field)
-
-    return today.strftime("%Y-%m-%d %H:%M")
-
-
-def _fix_shamsi_date(shamsi_date: str) -> str:
-    parts = shamsi_date.split(" ")
-    return f"{parts[2]}-{PERSIAN_MONTHS[parts[1]]}-{parts[0]} {parts[4]}"
-
-
-def _get_corresponding_gregorian_date(shamsi_cleaned_date: str) -> str:
-    year, month, day_hour = shamsi_cleaned_date.split("-")
-    day, hour = day_hour.split()
-    gre_date = from_jalali_to_gregorian(int(year), int(month), int(day))
-
-    return f"{gre_date.year}-{gre_date.month}-{gre_date.day} {hour}"
+TASNIM_ARTICLE_STRAINER = class_strainer(["h1", "ul", "h3", "div"], ["title", "details", "lead", "story"])
 
 
 class TasnimArticleCrawler(BaseCrawler):
@@ -96,29 +69,31 @@ class TasnimArticleCrawler(BaseCrawler):
         return full_content
 
     def _extract_from_html(self, raw_html: str, url: AnyUrl) -> TasnimNews:
-        soup = BeautifulSoup(raw_html, 'html.parser')
+        return self._extract_from_soup(make_soup(raw_html, parse_only=TASNIM_ARTICLE_STRAINER), url)
 
-        shamsi_date_str = _fix_time_field(self.__extract_date(soup))
-        gre_date_str = _get_corresponding_gregorian_date(shamsi_date_str)
+    def _extract_from_soup(self, soup: BeautifulSoup, url: AnyUrl) -> TasnimNews:
+        published_at = parse_jalali(self.__extract_date(soup))
 
         return TasnimNews(
             url=url,
             title=self.__extract_title(soup),
             content=self.__extract_content(soup),
-            shamsi_date=shamsi_date_str,
-            date=gre_date_str,
+            shamsi_date=format_jalali(published_at),
+            date=format_gregorian(published_at),
+            published_at=published_at.astimezone(timezone.utc),
             keywords=self.__extract_keywords(soup)
         )
 
     def extract_urls(self, urls: list[AnyUrl]) -> list[TasnimNews]:
-        out = []
         loader = AsyncHtmlLoader(urls)
-        docs = loader.load()
+        with METRICS.timer("fetch_batch_seconds", crawler=type(self).__name__):
+            docs = loader.load()
 
-        for i in range(len(docs)):
-            raw_html = docs[i].page_content
-            out.append(self._extract_from_html(raw_html, urls[i]))
-        return out
+        raw_htmls = [doc.page_content for doc in docs]
+        results = map_in_process_pool(partial(timed_call, self._extract_from_html), raw_htmls, urls)
+        for _, seconds in results:
+            METRICS.observe("parse_seconds", seconds, crawler=type(self).__name__)
+        return [doc for doc, _ in results]
 
     def extract(self, url: AnyUrl) -> Document:
         return self.extract_urls([url])[0]
@@ -131,8 +106,9 @@ class TasnimHomePageCrawler(BaseFeedCrawler, BaseSeleniumCrawler):
         self.feed_container_selector = "article.list-item "
 
     def extract(self, url: str,
-                min_date: str = "1404-11-24 00:00",
+                min_date: str | datetime = "1404-11-24 00:00",
                 max_clicks: int = 5) -> Iterator[list[str]]:
+        min_date = as_datetime(min_date)
 
         self.load_page(url, wait_element_selector=self.feed_container_selector)
 
@@ -152,20 +128,20 @@ class TasnimHomePageCrawler(BaseFeedCrawler, BaseSeleniumCrawler):
             current_batch = []
             all_visible_new = True
 
-            for link, raw_date_text in parsed_data:
-                try:
-                    comparable_date = _fix_time_field(raw_date_text)
-
-                    if comparable_date >= min_date:
-                        if link not in seen_links:
-                            seen_links.add(link)
-                            current_batch.append(link)
-                    else:
-                        all_visible_new = False
-                except Exception as e:
-                    logger.warning(f"Failed to parse date '{raw_date_text}': {e}")
+            published_dates = parse_jalali_many([raw_date_text for _, raw_date_text in parsed_data])
+
+            for (link, raw_date_text), published_at in zip(parsed_data, published_dates):
+                if published_at is None:
+                    logger.warning(f"Failed to parse date '{raw_date_text}'")
                     continue
 
+                if published_at >= min_date:
+                    if link not in seen_links:
+                        seen_links.add(link)
+                        current_batch.append(link)
+                else:
+                    all_visible_new = False
+
             if current_batch:
                 yield current_batch
 
@@ -218,9 +194,10 @@ class TasnimHomePageCrawler(BaseFeedCrawler, BaseSeleniumCrawler):
 
                 self.click_element(self.load_more_selector, By.ID)
 
-                WebDriverWait(self.driver, self.timeout).until(
-                    lambda d: len(d.find_elements(By.CSS_SELECTOR, self.feed_container_selector)) > previous_count
-                )
+                with METRICS.timer("selenium_seconds", action="load_more_wait"):
+                    WebDriverWait(self.driver, self.timeout).until(
+                        lambda d: len(d.find_elements(By.CSS_SELECTOR, self.feed_container_selector)) > previous_count
+                    )
                 return True
             except TimeoutException as e:
                 logger.error(f"Load more failed or timed out: {e}")
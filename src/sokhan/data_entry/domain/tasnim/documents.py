@@ -1,16 +1,25 @@
+from datetime import datetime
+from typing import ClassVar
+
 from pydantic import AnyUrl
 
-from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.base.documents import CompressedText, Document
 
 
 class TasnimNews(Document):
     url: AnyUrl
     title: str
-    content: str
+    content: CompressedText
     shamsi_date: str
     date: str
+    published_at: datetime | None = None
     keywords: list[str]
 
+    normalized_fields: ClassVar[tuple[str, ...]] = ("title", "content", "keywords")
+    dedup_field: ClassVar[str | None] = "content"
+    chunk_field: ClassVar[str | None] = "content"
+    date_field: ClassVar[str] = "published_at"
+
     @property
     def collection_name(self):
         return "tasnim_news"
@@ -1,20 +1,205 @@
+import json
+import math
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
 
-from langchain_community.document_loaders import AsyncHtmlLoader
+from loguru import logger
 from pydantic import AnyUrl
 
-from sokhan.data_entry.base.crawlers import BaseProfileCrawler
+from sokhan.data_entry.base.crawlers import BaseCrawler, BaseProfileCrawler
+from sokhan.data_entry.configs import (VIRGOOL_FETCH_WORKERS, VIRGOOL_PROFILE_MAX_PAGES, VIRGOOL_PROFILE_PAGE_WINDOW,
+                                       VIRGOOL_WORDS_PER_MINUTE)
+from sokhan.data_entry.domain.virgool.documents import VirgoolArticleDocument
+from sokhan.data_entry.utils.extraction import element_text, meta_content, parse_html
+from sokhan.utils.curl.configs import FETCH_RETRY_COUNT, FETCH_RETRY_DELAY
+from sokhan.utils.curl.exceptions import HTTPStatusException
+from sokhan.utils.curl.fetch import fetch_text
+
+VIRGOOL_URL = "https://virgool.io"
+# Absolute or site-relative post links; profile tabs share the /@user/<name> shape and are not posts.
+POST_LINK_PATTERN = re.compile(r'(?:https://virgool\.io)?/@([A-Za-z0-9_.]+)/([A-Za-z0-9%_\-]+)')
+PROFILE_TABS = {"followers", "following", "lists", "likes", "bookmarks", "about", "posts"}
+ARTICLE_TYPES = {"Article", "BlogPosting", "NewsArticle"}
+READING_TIME_PATTERN = re.compile(r"(\d+)\s*دقیقه")
+ISO_MINUTES_PATTERN = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?")
+
+
+def profile_username(profile_url: str) -> str:
+    return urlparse(str(profile_url)).path.strip("/").split("/")[0].removeprefix("@")
+
+
+def post_links(raw_html: str, username: str) -> list[str]:
+    """Canonical links of `username`'s posts on a profile page, in page order without repeats."""
+    links = {}
+    for user, slug in POST_LINK_PATTERN.findall(raw_html):
+        if user == username and slug not in PROFILE_TABS:
+            links.setdefault(f"{VIRGOOL_URL}/@{user}/{slug}", None)
+    return list(links)
 
 
 class VirgoolProfileCrawler(BaseProfileCrawler):
+    """Every post link of a profile, walking its `?page=N` pages a window at a time."""
+
+    def __init__(self, fetch_workers: int = VIRGOOL_FETCH_WORKERS, page_window: int = VIRGOOL_PROFILE_PAGE_WINDOW,
+                 max_pages: int = VIRGOOL_PROFILE_MAX_PAGES, retry_count: int = FETCH_RETRY_COUNT,
+                 retry_delay: float = FETCH_RETRY_DELAY):
+        self.fetch_workers = fetch_workers
+        self.page_window = page_window
+        self.max_pages = max_pages
+        self.retry_count = max(retry_count, 1)
+        self.retry_delay = retry_delay
+
+    @staticmethod
+    def page_url(profile_url: str, page: int) -> str:
+        profile_url = str(profile_url).split("?", 1)[0].rstrip("/")
+        return profile_url if page == 1 else f"{profile_url}?page={page}"
+
+    def _fetch_page(self, profile_url: str, page: int) -> str | None:
+        """The page, or None past the last one; server errors are retried and then raised, not taken as the end."""
+        url = self.page_url(profile_url, page)
+        for attempt in range(self.retry_count):
+            try:
+                return fetch_text(url)
+            except HTTPStatusException as e:
+                if e.status_code == 404 and page > 1:
+                    # Past the last page the site answers 404, which is where the walk ends anyway.
+                    logger.debug(f"Stopped at page {page} of {profile_url}: {e}")
+                    return None
+                if e.status_code is None or e.status_code < 500 or attempt == self.retry_count - 1:
+                    raise
+                logger.warning(f"Retrying page {page} of {profile_url}: {e}")
+                time.sleep(self.retry_delay)
+
     def extract(self, profile_url: AnyUrl) -> list[AnyUrl]:
-        loader = AsyncHtmlLoader([profile_url])
-        docs = loader.load()
-        doc = docs[0]
+        username = profile_username(profile_url)
+        links: dict[str, None] = {}
+
+        with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="virgool-profile") as pool:
+            first = 1
+            while first <= self.max_pages:
+                pages = range(first, min(first + self.page_window, self.max_pages + 1))
+                fetches = [pool.submit(self._fetch_page, profile_url, page) for page in pages]
+
+                exhausted = False
+                for fetch in fetches:
+                    # Raises a page's error only if the walk gets that far, pages past the end may fail too.
+                    content = fetch.result()
+                    new_links = [link for link in post_links(content or "", username) if link not in links]
+                    if not new_links:
+                        # Pages past the end repeat the last one or come back empty, later ones are no different.
+                        exhausted = True
+                        break
+                    links.update(dict.fromkeys(new_links))
+
+                if exhausted:
+                    break
+                first += self.page_window
+            else:
+                logger.warning(f"Stopped @{username} at VIRGOOL_PROFILE_MAX_PAGES ({self.max_pages}) while pages still "
+                               f"had new posts, the profile may be truncated")
+
+        logger.info(f"Found {len(links)} posts of @{username}")
+        return list(links)
+
+
+def _json_ld_article(root) -> dict:
+    for text in root.xpath("//script[@type='application/ld+json']/text()"):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            continue
+        items = data.get("@graph", [data]) if isinstance(data, dict) else data
+        for item in items:
+            if isinstance(item, dict) and set(_as_list(item.get("@type"))) & ARTICLE_TYPES:
+                return item
+    return {}
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _author(article: dict, root) -> str:
+    for author in _as_list(article.get("author")):
+        name = author.get("name") if isinstance(author, dict) else author
+        if name:
+            return " ".join(str(name).split())
+    return meta_content(root, "//meta[@name='author']/@content", "//a[@rel='author']//text()")
+
+
+def _published_at(article: dict, root) -> datetime | None:
+    value = article.get("datePublished") or meta_content(root, "//meta[@property='article:published_time']/@content",
+                                                         "//time/@datetime")
+    try:
+        published_at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return published_at.astimezone(timezone.utc) if published_at.tzinfo else published_at.replace(tzinfo=timezone.utc)
+
+
+def _keywords(article: dict, root) -> list[str]:
+    keywords = article.get("keywords") or root.xpath("//meta[@property='article:tag']/@content")
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    return list(dict.fromkeys(keyword.strip() for keyword in keywords if keyword.strip()))
+
+
+def _reading_time(article: dict, root, content: str) -> int | None:
+    match = ISO_MINUTES_PATTERN.fullmatch(article.get("timeRequired") or "")
+    if match and any(match.groups()):
+        hours, minutes = match.groups()
+        return int(hours or 0) * 60 + int(minutes or 0)
+
+    for text in root.xpath("//*[contains(@class, 'read')]//text()"):
+        match = READING_TIME_PATTERN.search(text)
+        if match:
+            return int(match.group(1))
+
+    return math.ceil(len(content.split()) / VIRGOOL_WORDS_PER_MINUTE) if content else None
+
+
+def parse_article(raw_html: str) -> dict:
+    """Title, author, date, tags, reading time and body of a post page, from one lxml parse.
+
+    The page's JSON-LD is preferred, meta tags and the visible page fill in what it lacks.
+    """
+    root = parse_html(raw_html)
+    if root is None:
+        raise ValueError("Empty page")
+
+    article = _json_ld_article(root)
+    body = root.find("body")
+    content_root = None
+    if body is not None:
+        candidates = body.xpath("//*[contains(@class, 'post-content')]") or body.xpath("//article")
+        content_root = max(candidates, key=lambda e: len(e.text_content())) if candidates else body
+    content = element_text(content_root) if content_root is not None else ""
+
+    return {
+        "title": article.get("headline") or meta_content(root, "//meta[@property='og:title']/@content",
+                                                         "//h1//text()", "//title/text()"),
+        "author": _author(article, root),
+        "published_at": _published_at(article, root),
+        "keywords": _keywords(article, root),
+        "reading_time": _reading_time(article, root, content),
+        "content": content,
+    }
+
 
-        content = doc.page_content
+class VirgoolArticleCrawler(BaseCrawler):
+    def __init__(self, fetch_workers: int = VIRGOOL_FETCH_WORKERS):
+        self.fetch_workers = fetch_workers
 
-        pattern = r'https://virgool\.io/@[a-zA-Z0-9_]+/[a-zA-Z0-9%_\-]+'
+    def extract(self, url: AnyUrl) -> VirgoolArticleDocument:
+        docs = self.extract_urls([url])
+        if not docs:
+            raise ValueError(f"Failed to crawl {url}")
+        return docs[0]
 
-        matches = re.findall(pattern, content)
-        return matches
+    def extract_urls(self, urls: list[AnyUrl]) -> list[VirgoolArticleDocument]:
+        return self._fetch_and_parse(urls, parse_article, VirgoolArticleDocument, self.fetch_workers, "virgool-fetch")
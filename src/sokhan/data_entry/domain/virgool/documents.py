@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import ClassVar
+
+from pydantic import AnyUrl
+
+from sokhan.data_entry.base.documents import CompressedText, Document
+
+
+class VirgoolArticleDocument(Document):
+    url: AnyUrl
+    title: str
+    author: str
+    content: CompressedText
+    published_at: datetime | None = None
+    # The post's tags, named like TasnimNews.keywords so keyword queries work on both.
+    keywords: list[str]
+    reading_time: int | None = None
+
+    normalized_fields: ClassVar[tuple[str, ...]] = ("title", "content", "keywords")
+    dedup_field: ClassVar[str | None] = "content"
+    chunk_field: ClassVar[str | None] = "content"
+    date_field: ClassVar[str] = "published_at"
+
+    @property
+    def collection_name(self):
+        return "virgool_articles"
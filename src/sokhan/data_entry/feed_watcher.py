@@ -0,0 +1,287 @@
+import json
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loguru import logger
+
+from sokhan.data_entry.base.crawlers import BaseFeedCrawler
+from sokhan.data_entry.configs import (FEED_WATCHER_CRAWL_WORKERS, FEED_WATCHER_HEALTH_HOST,
+                                       FEED_WATCHER_HEALTH_PORT, FEED_WATCHER_IDLE_BACKOFF,
+                                       FEED_WATCHER_INITIAL_INTERVAL, FEED_WATCHER_LOOKBACK_MINUTES,
+                                       FEED_WATCHER_MAX_INTERVAL, FEED_WATCHER_MIN_INTERVAL,
+                                       FEED_WATCHER_RATE_SMOOTHING, FEED_WATCHER_SEEN_URLS_LIMIT,
+                                       FEED_WATCHER_TARGET_ITEMS_PER_POLL)
+from sokhan.data_entry.crawlers import CrawlerDispatcher, FeedCrawlerDispatcher
+from sokhan.data_entry.ingest import ingest_links
+from sokhan.utils.db.mongo_client import MONGO_CLIENT
+from sokhan.utils.metrics.server import write_prometheus
+
+
+@dataclass
+class FeedState:
+    url: str
+    interval: float
+    next_poll_at: float = 0.0
+    last_poll_at: float | None = None
+    rate: float = 0.0
+    polls: int = 0
+    new_urls: int = 0
+    last_error: str | None = None
+    crawler: BaseFeedCrawler | None = field(default=None, repr=False)
+
+    def as_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "interval": round(self.interval, 1),
+            "next_poll_in": round(max(self.next_poll_at - time.monotonic(), 0.0), 1),
+            "rate_per_hour": round(self.rate * 3600, 2),
+            "polls": self.polls,
+            "new_urls": self.new_urls,
+            "last_error": self.last_error,
+        }
+
+
+class SeenUrls:
+    """Bounded set of already dispatched URLs, oldest entries are dropped first."""
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._urls: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, url: str) -> bool:
+        with self._lock:
+            if url in self._urls:
+                self._urls.move_to_end(url)
+                return False
+
+            self._urls[url] = None
+            if len(self._urls) > self._limit:
+                self._urls.popitem(last=False)
+            return True
+
+    def discard(self, urls: list[str]) -> None:
+        """Forget URLs that failed, so a later poll still listing them dispatches them again."""
+        with self._lock:
+            for url in urls:
+                self._urls.pop(url, None)
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+class FeedWatcher:
+    def __init__(
+            self,
+            feed_urls: list[str],
+            min_interval: float = FEED_WATCHER_MIN_INTERVAL,
+            max_interval: float = FEED_WATCHER_MAX_INTERVAL,
+            initial_interval: float = FEED_WATCHER_INITIAL_INTERVAL,
+            target_items_per_poll: float = FEED_WATCHER_TARGET_ITEMS_PER_POLL,
+            crawl_workers: int = FEED_WATCHER_CRAWL_WORKERS,
+            health_host: str = FEED_WATCHER_HEALTH_HOST,
+            health_port: int | None = FEED_WATCHER_HEALTH_PORT,
+    ):
+        if not feed_urls:
+            raise ValueError("At least one feed url must be given")
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_items_per_poll = target_items_per_poll
+
+        self._feeds = [FeedState(url=url, interval=initial_interval) for url in feed_urls]
+        self._feed_dispatcher = FeedCrawlerDispatcher.create_default()
+        self._article_dispatcher = CrawlerDispatcher.create_default()
+        self._seen_urls = SeenUrls(FEED_WATCHER_SEEN_URLS_LIMIT)
+
+        self._crawl_workers = crawl_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight: set[Future] = set()
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {"crawled_docs": 0, "failed_urls": 0, "inserted_docs": 0}
+        self._heartbeat = time.monotonic()
+
+        self._health_address = (health_host, health_port) if health_port is not None else None
+        self._health_server: ThreadingHTTPServer | None = None
+
+    def run(self) -> None:
+        self._install_signal_handlers()
+        self._start_health_server()
+        self._executor = ThreadPoolExecutor(max_workers=self._crawl_workers, thread_name_prefix="feed-watcher")
+
+        logger.info(f"Watching {len(self._feeds)} feeds")
+
+        try:
+            while not self._stop_event.is_set():
+                self._heartbeat = time.monotonic()
+                feed = min(self._feeds, key=lambda f: f.next_poll_at)
+                wait = feed.next_poll_at - time.monotonic()
+
+                if wait > 0:
+                    self._stop_event.wait(wait)
+                    continue
+
+                self._poll(feed)
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def health(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        stale_after = 2 * self.max_interval
+        healthy = not self._stop_event.is_set() and time.monotonic() - self._heartbeat < stale_after
+
+        return {
+            "status": "ok" if healthy else "unhealthy",
+            "seen_urls": len(self._seen_urls),
+            **stats,
+            "feeds": [feed.as_dict() for feed in self._feeds],
+        }
+
+    def _poll(self, feed: FeedState) -> None:
+        started_at = time.monotonic()
+        new_count = 0
+
+        try:
+            if feed.crawler is None:
+                feed.crawler = self._feed_dispatcher.get_crawler(feed.url)
+
+            for batch in feed.crawler.extract(feed.url, min_date=self._min_date(feed)):
+                # Marked seen on dispatch so the next poll does not send in-flight URLs again, failed ones are
+                # forgotten by `_process`.
+                new_urls = [url for url in batch if self._seen_urls.add(url)]
+                if new_urls:
+                    new_count += len(new_urls)
+                    self._submit(new_urls)
+
+                if self._stop_event.is_set():
+                    break
+
+            feed.last_error = None
+        except Exception as e:
+            logger.error(f"Polling {feed.url} failed: {e}")
+            feed.last_error = str(e)
+            self._close_crawler(feed)
+
+        self._update_interval(feed, new_count, started_at)
+        logger.info(f"{feed.url}: {new_count} new urls, next poll in {feed.interval:.0f}s")
+
+    def _min_date(self, feed: FeedState) -> datetime:
+        lookback = max(FEED_WATCHER_LOOKBACK_MINUTES * 60, 2 * feed.interval)
+        return datetime.now(timezone.utc) - timedelta(seconds=lookback)
+
+    def _update_interval(self, feed: FeedState, new_count: int, polled_at: float) -> None:
+        if feed.last_poll_at is not None and feed.last_error is None:
+            # The first poll also returns the lookback backlog, so it says nothing about the publish rate.
+            elapsed = max(polled_at - feed.last_poll_at, 1.0)
+            observed_rate = new_count / elapsed
+            feed.rate = FEED_WATCHER_RATE_SMOOTHING * observed_rate + (1 - FEED_WATCHER_RATE_SMOOTHING) * feed.rate
+
+        if feed.last_error is not None or new_count == 0 or feed.rate <= 0:
+            interval = feed.interval * FEED_WATCHER_IDLE_BACKOFF
+        else:
+            interval = self.target_items_per_poll / feed.rate
+
+        feed.interval = min(max(interval, self.min_interval), self.max_interval)
+        feed.last_poll_at = polled_at
+        feed.next_poll_at = time.monotonic() + feed.interval
+        feed.polls += 1
+        feed.new_urls += new_count
+
+    def _submit(self, urls: list[str]) -> None:
+        # Wait for a slot, otherwise a slow crawl or Mongo would let queued batches grow without limit.
+        while len(self._in_flight) >= 2 * self._crawl_workers:
+            done, _ = wait(self._in_flight, return_when=FIRST_COMPLETED)
+            self._in_flight.difference_update(done)
+        self._in_flight.add(self._executor.submit(self._process, urls))
+
+    def _process(self, urls: list[str]) -> None:
+        try:
+            batch_stats = ingest_links(urls, self._article_dispatcher)
+        except Exception as e:
+            logger.error(f"Failed to ingest {len(urls)} urls: {e}")
+            self._seen_urls.discard(urls)
+            with self._stats_lock:
+                self._stats["failed_urls"] += len(urls)
+            return
+
+        self._seen_urls.discard(batch_stats["failed_links"])
+
+        with self._stats_lock:
+            for name in self._stats:
+                self._stats[name] += batch_stats[name]
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def handle(signum, frame):
+            logger.info(f"Received signal {signum}, shutting down")
+            self.stop()
+
+        signal.signal(signal.SIGINT, handle)
+        signal.signal(signal.SIGTERM, handle)
+
+    def _start_health_server(self) -> None:
+        if self._health_address is None:
+            return
+
+        watcher = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") == "/metrics":
+                    write_prometheus(self)
+                    return
+                if self.path.rstrip("/") != "/health":
+                    self.send_error(404)
+                    return
+
+                health = watcher.health()
+                body = json.dumps(health).encode("utf-8")
+                self.send_response(200 if health["status"] == "ok" else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._health_server = ThreadingHTTPServer(self._health_address, HealthHandler)
+        threading.Thread(target=self._health_server.serve_forever, name="feed-watcher-health", daemon=True).start()
+        logger.info(f"Health and metrics endpoints listening on {self._health_address[0]}:{self._health_address[1]}")
+
+    def _close_crawler(self, feed: FeedState) -> None:
+        if feed.crawler is not None and hasattr(feed.crawler, "close"):
+            try:
+                feed.crawler.close()
+            except Exception as e:
+                logger.warning(f"Failed to close crawler of {feed.url}: {e}")
+        feed.crawler = None
+
+    def _shutdown(self) -> None:
+        logger.info("Waiting for in-flight crawls to finish")
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+        for feed in self._feeds:
+            self._close_crawler(feed)
+
+        if self._health_server is not None:
+            self._health_server.shutdown()
+            self._health_server.server_close()
+
+        MONGO_CLIENT.close()
+        logger.info("Feed watcher stopped")
@@ -0,0 +1,216 @@
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+
+from loguru import logger
+from pydantic import AnyUrl
+
+from sokhan.utils.db.mongo_client import MONGO_CLIENT
+from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.chunking import insert_chunks
+from sokhan.data_entry.configs import (CHUNKING_ENABLED, DEDUP_ENABLED, PROFILE_CRAWL_WORKERS, PROFILE_INGEST_WORKERS,
+                                       PROFILE_LINK_BATCH_SIZE)
+from sokhan.data_entry.crawlers import CrawlerDispatcher, ProfileCrawlerDispatcher
+from sokhan.data_entry.dedup import deduplicate_documents, document_signatures, index_documents
+from sokhan.data_entry.normalization import normalize_documents
+from sokhan.utils.general import get_domain
+from sokhan.utils.metrics.registry import METRICS
+
+
+def group_links_by_domain(links: list[str]) -> dict[str, list[str]]:
+    domain_map_links = defaultdict(list)
+    for link in links:
+        domain_map_links[get_domain(link)].append(link)
+    return domain_map_links
+
+
+def crawl_links_one_by_one(links: list[str],
+                           dispatcher: CrawlerDispatcher | None = None) -> tuple[list[Document], dict]:
+    """Crawl links with one `extract` call each, returning the docs and per link success/failure metadata."""
+    dispatcher = dispatcher or CrawlerDispatcher.create_default()
+    metadata = defaultdict(lambda: {"success": [], "failure": []})
+
+    docs = []
+
+    for link in links:
+        domain = get_domain(link)
+        try:
+            docs.append(dispatcher.get_crawler(link).extract(link))
+            metadata[domain]["success"].append(link)
+
+        except Exception as e:
+            metadata[domain]["failure"].append({'url': link, "error": str(e)})
+
+    return docs, dict(metadata)
+
+
+def _doc_url(doc: Document) -> str | None:
+    url = getattr(doc, "url", None) or getattr(doc, "repo_path", None)
+    return str(url) if url is not None else None
+
+
+def _stored_url(link: str) -> str:
+    # As the documents store it, AnyUrl adds a trailing slash to bare hosts.
+    try:
+        return str(AnyUrl(link))
+    except ValueError:
+        return link
+
+
+def crawl_links_by_domain(links: list[str],
+                          dispatcher: CrawlerDispatcher | None = None) -> tuple[list[Document], dict]:
+    """Crawl links with one `extract_urls` call per domain, returning the docs and per link success/failure metadata.
+
+    `extract_urls` leaves out the links it failed on, so a link without a returned document counts as failed.
+    """
+    dispatcher = dispatcher or CrawlerDispatcher.create_default()
+    metadata = defaultdict(lambda: {"success": [], "failure": []})
+
+    docs = []
+
+    for domain, domain_links in group_links_by_domain(links).items():
+        try:
+            domain_docs = dispatcher.get_crawler(domain_links[0]).extract_urls(domain_links)
+        except Exception as e:
+            logger.warning(f"Failed to crawl {len(domain_links)} links of {domain}: {e}")
+            metadata[domain]["failure"] = [{"url": link, "error": str(e)} for link in domain_links]
+            continue
+
+        docs.extend(domain_docs)
+        returned = {_doc_url(doc) for doc in domain_docs}
+        for link in domain_links:
+            if link in returned or _stored_url(link) in returned:
+                metadata[domain]["success"].append(link)
+            else:
+                metadata[domain]["failure"].append({"url": link, "error": "not extracted"})
+
+    return docs, dict(metadata)
+
+
+def insert_docs(docs: list[Document]) -> dict[str, int]:
+    """Write docs to their collections, one bulk insert per collection."""
+    coll_map_docs = defaultdict(list)
+
+    for doc in docs:
+        coll_map_docs[doc.collection_name].append(doc)
+
+    for collection_name, grouped_docs in coll_map_docs.items():
+        # A re-crawl of an unchanged repo hands back its stored document, which is already there.
+        MONGO_CLIENT.bulk_insert(collection_name, Document.to_mongo_dicts(grouped_docs), ignore_duplicates=True)
+
+    return {collection_name: len(grouped_docs) for collection_name, grouped_docs in coll_map_docs.items()}
+
+
+def ingest_links(links: list[str], dispatcher: CrawlerDispatcher | None = None) -> dict:
+    """Crawl, normalize, deduplicate, insert and chunk one batch of links, the way every streaming ingestion does it."""
+    with METRICS.timer("stage_seconds", stage="crawl"):
+        docs, metadata = crawl_links_by_domain(links, dispatcher)
+    crawled = len(docs)
+    with METRICS.timer("stage_seconds", stage="normalize"):
+        docs = normalize_documents(docs)
+
+    duplicates, signatures = {}, None
+    if DEDUP_ENABLED:
+        with METRICS.timer("stage_seconds", stage="deduplicate"):
+            signatures = dict(zip(docs, document_signatures(docs)))
+            docs, duplicates = deduplicate_documents(docs, signatures=list(signatures.values()))
+
+    with METRICS.timer("stage_seconds", stage="insert"):
+        inserted = sum(insert_docs(docs).values())
+    if DEDUP_ENABLED:
+        index_documents(docs, signatures=[signatures[doc] for doc in docs])
+
+    chunks = 0
+    if CHUNKING_ENABLED:
+        # After the insert, so chunks never outlive a failed one; unchunked parents are left to the backfill.
+        with METRICS.timer("stage_seconds", stage="chunk"):
+            chunks = insert_chunks(docs)
+
+    failed_links = [failure["url"] for domain_metadata in metadata.values() for failure in domain_metadata["failure"]]
+    return {
+        "crawled_docs": crawled,
+        "duplicate_docs": len(duplicates),
+        "inserted_docs": inserted,
+        "inserted_chunks": chunks,
+        "failed_urls": len(failed_links),
+        "failed_links": failed_links,
+    }
+
+
+def ingest_profiles(profile_urls: list[str], batch_size: int = PROFILE_LINK_BATCH_SIZE,
+                    profile_workers: int = PROFILE_CRAWL_WORKERS, ingest_workers: int = PROFILE_INGEST_WORKERS,
+                    profile_dispatcher: ProfileCrawlerDispatcher | None = None,
+                    dispatcher: CrawlerDispatcher | None = None) -> dict:
+    """Crawl many profiles concurrently and ingest their article links in batches as they are found.
+
+    Links are deduplicated across profiles, and each full batch is handed to `ingest_links` while the
+    remaining profiles are still being crawled, so memory stays bounded by the batches in flight.
+    """
+    profile_dispatcher = profile_dispatcher or ProfileCrawlerDispatcher.create_default()
+    dispatcher = dispatcher or CrawlerDispatcher.create_default()
+    profile_urls = list(dict.fromkeys(profile_urls))
+
+    stats = defaultdict(int, profiles=len(profile_urls))
+    failed_profiles, failed_links = [], []
+    seen_links: set[str] = set()
+    pending: list[str] = []
+    in_flight: set[Future] = set()
+    in_flight_links: dict[Future, list[str]] = {}
+
+    def collect(done: set[Future]) -> None:
+        for future in done:
+            try:
+                batch_stats = future.result()
+            except Exception as e:
+                batch_links = in_flight_links[future]
+                logger.error(f"Failed to ingest a batch of {len(batch_links)} links: {e}")
+                batch_stats = {"failed_urls": len(batch_links), "failed_links": batch_links}
+            finally:
+                del in_flight_links[future]
+
+            failed_links.extend(batch_stats.pop("failed_links"))
+            for name, value in batch_stats.items():
+                stats[name] += value
+
+    def submit(links: list[str]) -> None:
+        # Wait for a slot, otherwise fast profile crawls would queue every discovered link in memory.
+        while len(in_flight) >= 2 * ingest_workers:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            in_flight.difference_update(done)
+            collect(done)
+        future = ingest_pool.submit(ingest_links, links, dispatcher)
+        in_flight.add(future)
+        in_flight_links[future] = links
+        stats["batches"] += 1
+
+    with ThreadPoolExecutor(max_workers=ingest_workers, thread_name_prefix="profile-ingest") as ingest_pool, \
+            ThreadPoolExecutor(max_workers=profile_workers, thread_name_prefix="profile-crawl") as profile_pool:
+        crawls = {profile_pool.submit(lambda url: profile_dispatcher.get_crawler(url).extract(url), url): url
+                  for url in profile_urls}
+
+        for crawl in as_completed(crawls):
+            profile_url = crawls[crawl]
+            try:
+                links = [str(link) for link in crawl.result()]
+            except Exception as e:
+                logger.warning(f"Failed to crawl profile {profile_url}: {e}")
+                failed_profiles.append({"url": profile_url, "error": str(e) or type(e).__name__})
+                continue
+
+            new_links = [link for link in dict.fromkeys(links) if link not in seen_links]
+            seen_links.update(new_links)
+            stats["duplicate_links"] += len(links) - len(new_links)
+            pending.extend(new_links)
+
+            while len(pending) >= batch_size:
+                submit(pending[:batch_size])
+                pending = pending[batch_size:]
+
+        if pending:
+            submit(pending)
+
+        done, _ = wait(in_flight)
+        collect(done)
+
+    logger.info(f"Ingested {len(seen_links)} links of {len(profile_urls) - len(failed_profiles)} profiles "
+                f"in {stats['batches']} batches")
+    return {**stats, "links": len(seen_links), "failed_profiles": failed_profiles, "failed_links": failed_links}
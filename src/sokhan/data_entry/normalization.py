@@ -0,0 +1,37 @@
+import itertools
+
+from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.configs import NORMALIZATION_BATCH_SIZE
+from sokhan.data_entry.utils.parallel import map_in_process_pool
+from sokhan.utils.persian import NORMALIZATION_VERSION, normalize_many
+
+
+def normalize_documents(docs: list[Document]) -> list[Document]:
+    """Normalize the `normalized_fields` of docs below the current version in place, in batches over the pool."""
+    targets = [doc for doc in docs if doc.normalized_fields and doc.normalization_version < NORMALIZATION_VERSION]
+
+    texts, slots = [], []
+    for doc in targets:
+        for name in doc.normalized_fields:
+            value = getattr(doc, name)
+            if isinstance(value, str):
+                texts.append(value)
+                slots.append((doc, name, None))
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    texts.append(item)
+                    slots.append((doc, name, i))
+
+    batches = [texts[i:i + NORMALIZATION_BATCH_SIZE] for i in range(0, len(texts), NORMALIZATION_BATCH_SIZE)]
+    normalized = itertools.chain.from_iterable(map_in_process_pool(normalize_many, batches, min_batch=2))
+
+    for (doc, name, i), text in zip(slots, normalized):
+        if i is None:
+            setattr(doc, name, text)
+        else:
+            getattr(doc, name)[i] = text
+
+    for doc in targets:
+        doc.normalization_version = NORMALIZATION_VERSION
+
+    return docs
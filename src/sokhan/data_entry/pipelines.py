@@ -1,103 +1,155 @@
 import itertools
-from collections import defaultdict
+from contextlib import contextmanager, nullcontext
 
 from typing import Annotated
-from zenml import get_step_context, step, pipeline
+from zenml import get_step_context, log_metadata, save_artifact, step, pipeline
 
-from sokhan.utils.db.mongo_client import MONGO_CLIENT
 from sokhan.data_entry.base.documents import Document
-from sokhan.data_entry.crawlers import CrawlerDispatcher, ProfileCrawlerDispatcher, FeedCrawlerDispatcher
-from sokhan.utils.general import get_domain
+from sokhan.data_entry.chunking import insert_chunks
+from sokhan.data_entry.configs import CHUNKING_ENABLED, DEDUP_ENABLED
+from sokhan.data_entry.crawlers import ProfileCrawlerDispatcher, FeedCrawlerDispatcher
+from sokhan.data_entry.dedup import deduplicate_documents, index_documents
+from sokhan.data_entry.ingest import crawl_links_by_domain, crawl_links_one_by_one, ingest_profiles, insert_docs
+from sokhan.data_entry.normalization import normalize_documents
+from sokhan.utils.metrics.registry import METRICS
+from sokhan.utils.metrics.server import start_metrics_server
+from sokhan.utils.profiling.configs import PROFILING_ENABLED
+from sokhan.utils.profiling.profiler import Profiler
+
+
+@contextmanager
+def instrumented_step(step_name: str):
+    """Time the step and attach the histograms observed while it ran (fetch, parse, Mongo...) to its metadata.
+
+    With PROFILING_ENABLED the step is profiled too, its reports are saved as artifacts of the step.
+    """
+    start_metrics_server()
+    before = METRICS.snapshot()
+    profiler = Profiler(step_name) if PROFILING_ENABLED else None
+    try:
+        with METRICS.timer("stage_seconds", stage=step_name), profiler or nullcontext():
+            yield
+    finally:
+        metadata = {"metrics": METRICS.summary(since=before)}
+        if profiler is not None:
+            metadata["profile"] = profiler.outputs
+            save_profile_artifacts(step_name, profiler.outputs)
+        log_metadata(metadata=metadata)
+
+
+def save_profile_artifacts(step_name: str, outputs: dict[str, str]) -> None:
+    for kind, path in outputs.items():
+        # pstats dumps are binary, they stay on disk and only their path goes to the metadata.
+        if path.endswith((".collapsed", ".txt")):
+            with open(path, encoding="utf-8") as f:
+                save_artifact(f.read(), name=f"{step_name}_profile_{kind}")
 
 
 @step(enable_cache=False)
 def crawl_profile(profile_url: str) -> Annotated[list[str], "links"]:
-    dispatcher = ProfileCrawlerDispatcher().create_default()
-    links = dispatcher.get_crawler(profile_url).extract(profile_url)
+    with instrumented_step("crawl_profile"):
+        dispatcher = ProfileCrawlerDispatcher().create_default()
+        links = dispatcher.get_crawler(profile_url).extract(profile_url)
 
-    step_context = get_step_context()
-    step_context.add_output_metadata(output_name="links", metadata={"links": links})
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="links", metadata={"links": links})
 
     return links
 
 
+@step(enable_cache=False)
+def ingest_profiles_to_db(profile_urls: list[str]) -> Annotated[dict, "ingestion_stats"]:
+    with instrumented_step("ingest_profiles_to_db"):
+        stats = ingest_profiles(profile_urls)
+
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="ingestion_stats", metadata=stats)
+
+    return stats
+
+
 @step(enable_cache=False)
 def crawl_links_async(links: list[str]) -> Annotated[list[Document], "docs"]:
-    dispatcher = CrawlerDispatcher.create_default()
-    metadata = defaultdict(lambda: {"success": [], "failure": []})
+    with instrumented_step("crawl_links_async"):
+        docs, metadata = crawl_links_by_domain(links)
 
-    docs = []
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="docs", metadata=metadata)
 
-    domain_map_links = defaultdict(list)
+    return docs
 
-    for link in links:
-        domain = get_domain(link)
-        domain_map_links[domain].append(link)
 
-    for domain, links in domain_map_links.items():
-        # TODO: Fix success/failure per link
-        try:
-            domain_docs = dispatcher.get_crawler(links[0]).extract_urls(links)
-            docs.extend(domain_docs)
-            metadata[domain]["success"] = links
+@step(enable_cache=False)
+def crawl_links(links: list[str]) -> Annotated[list[Document], "docs"]:
+    with instrumented_step("crawl_links"):
+        docs, metadata = crawl_links_one_by_one(links)
 
-        except:
-            metadata[domain]["failure"] = links
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="docs", metadata=metadata)
 
-    step_context = get_step_context()
-    step_context.add_output_metadata(output_name="docs", metadata=metadata)
+    return docs
+
+
+@step(enable_cache=False)
+def normalize_docs(docs: list[Document]) -> Annotated[list[Document], "normalized_docs"]:
+    with instrumented_step("normalize_docs"):
+        docs = normalize_documents(docs)
 
     return docs
 
 
 @step(enable_cache=False)
-def crawl_links(links: list[str]) -> Annotated[list[Document], "docs"]:
-    dispatcher = CrawlerDispatcher.create_default()
-    metadata = defaultdict(lambda: {"success": [], "failure": []})
+def deduplicate_docs(docs: list[Document]) -> Annotated[list[Document], "unique_docs"]:
+    with instrumented_step("deduplicate_docs"):
+        if not DEDUP_ENABLED:
+            return docs
+
+        unique_docs, duplicates = deduplicate_documents(docs)
 
-    docs = []
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="unique_docs",
+                                         metadata={"duplicates_count": len(duplicates), "duplicates": duplicates})
 
-    for link in links:
-        domain = get_domain(link)
-        try:
-            doc = dispatcher.get_crawler(link).extract(link)
-            metadata[domain]["success"].append(link)
+    return unique_docs
 
-        except Exception as e:
-            metadata[domain]["failure"].append({'url': link, "error": str(e)})
 
-        docs.append(doc)
+@step(enable_cache=False)
+def chunk_docs(docs: list[Document]) -> Annotated[list[Document], "chunked_docs"]:
+    with instrumented_step("chunk_docs"):
+        if not CHUNKING_ENABLED:
+            return docs
+
+        chunks_count = insert_chunks(docs)
 
-    step_context = get_step_context()
-    step_context.add_output_metadata(output_name="docs", metadata=metadata)
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="chunked_docs", metadata={"chunks_count": chunks_count})
 
     return docs
 
 
 @step(enable_cache=False)
-def bulk_insert_docs_to_db(docs: list[Document]):
-    coll_map_docs = defaultdict(list)
+def bulk_insert_docs_to_db(docs: list[Document]) -> Annotated[list[Document], "inserted_docs"]:
+    with instrumented_step("bulk_insert_docs_to_db"):
+        insert_docs(docs)
+        if DEDUP_ENABLED:
+            # Only stored docs may be matched as originals by later runs.
+            index_documents(docs)
 
-    for doc in docs:
-        coll_map_docs[doc.collection_name].append(doc)
-
-    for collection_name, grouped_docs in coll_map_docs.items():
-        MONGO_CLIENT.bulk_insert(collection_name,
-                                 [doc.to_mongo_dict() for doc in grouped_docs]
-                                 )
+    return docs
 
 
 @step(enable_cache=False)
 def load_feeds(feed_url: str, min_date: str) -> Annotated[list[str], "news_urls"]:
-    dispatcher = FeedCrawlerDispatcher.create_default()
+    with instrumented_step("load_feeds"):
+        dispatcher = FeedCrawlerDispatcher.create_default()
 
-    news_urls = list(itertools.chain.from_iterable(
-        dispatcher.get_crawler(feed_url).extract(feed_url, min_date=min_date)
-    ))
-    metadata = {"urls_count": len(news_urls), "found_urls": news_urls}
+        news_urls = list(itertools.chain.from_iterable(
+            dispatcher.get_crawler(feed_url).extract(feed_url, min_date=min_date)
+        ))
+        metadata = {"urls_count": len(news_urls), "found_urls": news_urls}
 
-    step_context = get_step_context()
-    step_context.add_output_metadata(output_name="news_urls", metadata=metadata)
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="news_urls", metadata=metadata)
 
     return news_urls
 
@@ -105,31 +157,53 @@ def load_feeds(feed_url: str, min_date: str) -> Annotated[list[str], "news_urls"
 @pipeline
 def insert_data_to_db_pipeline(links: list[str]):
     docs = crawl_links(links=links)
-    bulk_insert_docs_to_db(docs=docs)
+    docs = normalize_docs(docs=docs)
+    docs = deduplicate_docs(docs=docs)
+    docs = bulk_insert_docs_to_db(docs=docs)
+    chunk_docs(docs=docs)
 
 
 @pipeline
 def insert_data_to_db_pipeline_async(links: list[str]):
     docs = crawl_links_async(links=links)
-    bulk_insert_docs_to_db(docs=docs)
+    docs = normalize_docs(docs=docs)
+    docs = deduplicate_docs(docs=docs)
+    docs = bulk_insert_docs_to_db(docs=docs)
+    chunk_docs(docs=docs)
 
 
 @pipeline
 def insert_profile_data_to_db_pipeline(profile_url: str):
     links = crawl_profile(profile_url=profile_url)
     docs = crawl_links(links=links)
-    bulk_insert_docs_to_db(docs=docs)
+    docs = normalize_docs(docs=docs)
+    docs = deduplicate_docs(docs=docs)
+    docs = bulk_insert_docs_to_db(docs=docs)
+    chunk_docs(docs=docs)
 
 
 @pipeline
 def insert_profile_data_to_db_pipeline_async(profile_url: str):
     links = crawl_profile(profile_url=profile_url)
     docs = crawl_links_async(links=links)
-    bulk_insert_docs_to_db(docs=docs)
+    docs = normalize_docs(docs=docs)
+    docs = deduplicate_docs(docs=docs)
+    docs = bulk_insert_docs_to_db(docs=docs)
+    chunk_docs(docs=docs)
+
+
+@pipeline
+def insert_profiles_data_to_db_pipeline(profile_urls: list[str]):
+    # One run for any number of authors: profiles and their articles are crawled, deduplicated and
+    # inserted batch by batch inside the step instead of one pipeline run per profile.
+    ingest_profiles_to_db(profile_urls=profile_urls)
 
 
 @pipeline
 def insert_small_feed_to_db_pipeline_async(feed_url: str, min_date="1404-11-23 00:00"):
     news_urls = load_feeds(feed_url=feed_url, min_date=min_date)
     docs = crawl_links_async(links=news_urls)
-    bulk_insert_docs_to_db(docs=docs)
+    docs = normalize_docs(docs=docs)
+    docs = deduplicate_docs(docs=docs)
+    docs = bulk_insert_docs_to_db(docs=docs)
+    chunk_docs(docs=docs)
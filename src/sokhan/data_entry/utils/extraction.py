@@ -0,0 +1,99 @@
+import re
+
+import lxml.html
+from lxml.etree import ParserError
+
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "nav", "header", "footer", "aside", "form", "iframe",
+                    "svg", "button", "select", "dialog"]
+CONTENT_TAGS = {"article", "main"}
+BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre", "td", "th", "dd", "dt",
+              "figcaption"}
+BOILERPLATE_PATTERN = re.compile(
+    r"(^|[\s_-])(ads?|advert\w*|banner|breadcrumbs?|comments?|cookie\w*|footer|menu|nav\w*|popup|promo\w*|"
+    r"related|share|sidebar|social|sponsor\w*|subscribe|tags?|widget)([\s_-]|$)",
+    re.IGNORECASE
+)
+
+_PARSER = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+
+
+def meta_content(root, *selectors: str) -> str:
+    for selector in selectors:
+        for value in root.xpath(selector):
+            value = " ".join(value.split())
+            if value:
+                return value
+    return ""
+
+
+def _is_boilerplate(element) -> bool:
+    if element.tag in CONTENT_TAGS:
+        return False
+    marker = f"{element.get('class', '')} {element.get('id', '')} {element.get('role', '')}"
+    return bool(marker.strip()) and BOILERPLATE_PATTERN.search(marker) is not None
+
+
+def _remove_boilerplate(body) -> None:
+    for element in list(body.iter(*BOILERPLATE_TAGS)):
+        element.drop_tree()
+
+    for element in body.xpath(".//*[@class or @id or @role]"):
+        if element.getparent() is not None and _is_boilerplate(element):
+            element.drop_tree()
+
+
+def _main_element(body):
+    for selector in ("//article", "//main", "//*[@role='main']"):
+        candidates = body.xpath(selector)
+        if candidates:
+            return max(candidates, key=lambda e: len(e.text_content()))
+    return body
+
+
+def _paragraphs(element) -> list[str]:
+    paragraphs = []
+    for block in element.iter(*BLOCK_TAGS):
+        if any(ancestor.tag in BLOCK_TAGS for ancestor in block.iterancestors()):
+            continue
+        text = " ".join(block.text_content().split())
+        if text:
+            paragraphs.append(text)
+
+    if not paragraphs:
+        paragraphs = [line for line in (" ".join(line.split()) for line in element.text_content().splitlines()) if line]
+    return paragraphs
+
+
+def parse_html(raw_html: str):
+    """lxml root of the page, None when there is nothing to parse."""
+    try:
+        return lxml.html.document_fromstring(raw_html.encode("utf-8"), parser=_PARSER)
+    except ParserError:
+        return None
+
+
+def element_text(element) -> str:
+    """Paragraphs of `element` with the boilerplate removed (in place), blank line separated."""
+    _remove_boilerplate(element)
+    return "\n\n".join(_paragraphs(element))
+
+
+def extract_article(raw_html: str) -> dict[str, str]:
+    """Pull title, description, language and boilerplate-free text out of a generic article page."""
+    root = parse_html(raw_html)
+    if root is None:
+        return {"title": "", "description": "", "language": "", "content": ""}
+
+    title = meta_content(root, "//meta[@property='og:title']/@content", "//title/text()", "//h1//text()")
+    description = meta_content(root, "//meta[@name='description']/@content",
+                                "//meta[@property='og:description']/@content")
+    language = meta_content(root, "/html/@lang", "//meta[@http-equiv='content-language']/@content",
+                             "//meta[@property='og:locale']/@content")
+
+    body = root.find("body")
+    content = ""
+    if body is not None:
+        _remove_boilerplate(body)
+        content = "\n\n".join(_paragraphs(_main_element(body)))
+
+    return {"title": title, "description": description, "language": language, "content": content}
@@ -0,0 +1,44 @@
+import atexit
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+from sokhan.data_entry.configs import PROCESS_POOL_MIN_BATCH, PROCESS_POOL_WORKERS
+
+R = TypeVar("R")
+
+_PROCESS_POOL: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process-wide worker pool, starting it on first use."""
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS)
+        atexit.register(_PROCESS_POOL.shutdown, wait=False, cancel_futures=True)
+    return _PROCESS_POOL
+
+
+def map_in_process_pool(func: Callable[..., R], *iterables: Iterable,
+                        min_batch: int = PROCESS_POOL_MIN_BATCH) -> list[R]:
+    """`map` over the shared process pool, or in this process when the batch is too small to pay for pickling."""
+    args = [list(iterable) for iterable in iterables]
+    size = min(map(len, args)) if args else 0
+
+    if PROCESS_POOL_WORKERS <= 1 or size < min_batch:
+        return list(map(func, *args))
+
+    chunksize = max(1, size // (PROCESS_POOL_WORKERS * 4))
+    return list(get_process_pool().map(func, *args, chunksize=chunksize))
+
+
+def submit_to_process_pool(func: Callable[..., R], *args) -> Future:
+    """Submit one task to the shared process pool, running it right away when the pool is disabled."""
+    if PROCESS_POOL_WORKERS > 1:
+        return get_process_pool().submit(func, *args)
+
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
@@ -0,0 +1,16 @@
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from sokhan.data_entry.configs import HTML_PARSER
+
+
+def class_strainer(tags: list[str], classes: list[str]) -> SoupStrainer:
+    """Keep only `tags` carrying one of `classes` (and their subtrees) while parsing."""
+    # Attributes are still raw strings at strain time, so "title main" must be matched word-wise.
+    class_pattern = re.compile(r"(?:^|\s)(?:{})(?:\s|$)".format("|".join(map(re.escape, classes))))
+    return SoupStrainer(tags, class_=class_pattern)
+
+
+def make_soup(raw_html: str, parse_only: SoupStrainer | None = None, parser: str = HTML_PARSER) -> BeautifulSoup:
+    return BeautifulSoup(raw_html, parser, parse_only=parse_only)
@@ -11,6 +11,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from sokhan.utils.metrics.registry import METRICS
+
 
 class BaseSeleniumCrawler(ABC):
     def __init__(self, headless: bool = True, timeout: int = 10):
@@ -43,27 +45,31 @@ class BaseSeleniumCrawler(ABC):
 
     def load_page(self, url: str, wait_element_selector: str | None = None):
         logger.info(f"Loading: {url}")
-        self.driver.get(url)
+        with METRICS.timer("selenium_seconds", action="load"):
+            self.driver.get(url)
         if wait_element_selector:
             self.wait_for_element(wait_element_selector)
 
     def wait_for_element(self, selector: str, by: str = By.CSS_SELECTOR):
         try:
-            return WebDriverWait(self.driver, self.timeout).until(
-                EC.presence_of_element_located((by, selector))
-            )
+            with METRICS.timer("selenium_seconds", action="wait"):
+                return WebDriverWait(self.driver, self.timeout).until(
+                    EC.presence_of_element_located((by, selector))
+                )
         except TimeoutException:
             logger.error(f"Timeout waiting for element: {selector}")
             return None
 
     def click_element(self, selector: str, by: str = By.CSS_SELECTOR):
         try:
-            element = WebDriverWait(self.driver, self.timeout).until(
-                EC.element_to_be_clickable((by, selector))
-            )
+            with METRICS.timer("selenium_seconds", action="wait_clickable"):
+                element = WebDriverWait(self.driver, self.timeout).until(
+                    EC.element_to_be_clickable((by, selector))
+                )
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
             time.sleep(0.5)
-            element.click()
+            with METRICS.timer("selenium_seconds", action="click"):
+                element.click()
             logger.info(f"Clicked: {selector}")
         except Exception as e:
             logger.error(f"Click failed: {e}")
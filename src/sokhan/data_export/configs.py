@@ -0,0 +1,11 @@
+import os
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(os.path.expanduser("~"), "sokhan_exports"))
+EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "jsonl")
+EXPORT_SHARD_MAX_SIZE = int(os.getenv("EXPORT_SHARD_MAX_SIZE", 256 * 1024 * 1024))
+EXPORT_COMPRESSION_LEVEL = int(os.getenv("EXPORT_COMPRESSION_LEVEL", 9))
+EXPORT_PARQUET_ROW_GROUP_SIZE = int(os.getenv("EXPORT_PARQUET_ROW_GROUP_SIZE", 10_000))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+EXPORT_PARTITIONS = int(os.getenv("EXPORT_PARTITIONS", 4))
+EXPORT_PARTITION_BY = os.getenv("EXPORT_PARTITION_BY", "created_date")
+EXPORT_INCREMENTAL = os.getenv("EXPORT_INCREMENTAL", "true").lower() == "true"
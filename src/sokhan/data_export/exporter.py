@@ -0,0 +1,221 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+from loguru import logger
+from pydantic import ValidationError
+
+from sokhan.data_entry.base.documents import Document, DocumentChunk
+from sokhan.data_entry.configs import GIT_BLOB_BATCH_SIZE
+from sokhan.data_entry.domain.custom.documents import CustomArticleDocument
+from sokhan.data_entry.domain.git.documents import GitRepositoryDocument
+from sokhan.data_entry.domain.git.storage import GIT_BLOB_STORE
+from sokhan.data_entry.domain.tasnim.documents import TasnimNews
+from sokhan.data_entry.domain.virgool.documents import VirgoolArticleDocument
+from sokhan.data_export.configs import (EXPORT_BATCH_SIZE, EXPORT_DIR, EXPORT_FORMAT, EXPORT_INCREMENTAL,
+                                        EXPORT_PARTITION_BY, EXPORT_PARTITIONS)
+from sokhan.data_export.writers import WRITERS
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, MongoDBClient, iter_batches, overlap_watermark
+
+MANIFEST_NAME = "manifest.json"
+
+
+def document_records(docs: list[Document]) -> Iterator[list[dict]]:
+    yield [doc.model_dump(mode="json") for doc in docs]
+
+
+def repository_file_records(docs: list[GitRepositoryDocument]) -> Iterator[list[dict]]:
+    """One record per file, blobs are fetched a batch at a time so a large repo never sits in memory whole."""
+    for doc in docs:
+        paths = list(doc.path_map_blob)
+        for i in range(0, len(paths), GIT_BLOB_BATCH_SIZE):
+            batch = paths[i:i + GIT_BLOB_BATCH_SIZE]
+            contents = GIT_BLOB_STORE.get_many({doc.path_map_blob[path] for path in batch})
+            yield [
+                {
+                    "repo_id": str(doc.id),
+                    "repo_name": doc.repo_name,
+                    "repo_path": str(doc.repo_path),
+                    "commit_sha": doc.commit_sha,
+                    "path": path,
+                    "blob_sha": doc.path_map_blob[path],
+                    "content": contents[doc.path_map_blob[path]],
+                }
+                for path in batch if doc.path_map_blob[path] in contents
+            ]
+
+
+@dataclass
+class ExportSource:
+    document_class: type[Document]
+    to_records: Callable[[list[Document]], Iterator[list[dict]]] = field(default=document_records)
+
+    @property
+    def collection_name(self) -> str:
+        return self.document_class.model_construct().collection_name
+
+
+EXPORT_SOURCES = {
+    source.collection_name: source for source in (
+        ExportSource(TasnimNews),
+        ExportSource(CustomArticleDocument),
+        ExportSource(VirgoolArticleDocument),
+        ExportSource(GitRepositoryDocument, repository_file_records),
+        ExportSource(DocumentChunk),
+    )
+}
+
+
+class DatasetExporter:
+    """Streams collections out of Mongo into size-capped compressed shards listed in a manifest.
+
+    Every collection is split into range partitions (by `created_date` or `_id`) read in parallel with batched
+    cursors, so memory stays at one batch per partition. Incremental runs only export documents created since the
+    previous run recorded in the manifest.
+    """
+
+    def __init__(
+            self,
+            out_dir: str = EXPORT_DIR,
+            format: str = EXPORT_FORMAT,
+            partitions: int = EXPORT_PARTITIONS,
+            partition_by: str = EXPORT_PARTITION_BY,
+            incremental: bool = EXPORT_INCREMENTAL,
+            batch_size: int = EXPORT_BATCH_SIZE,
+            client: MongoDBClient = MONGO_CLIENT,
+    ):
+        if format not in WRITERS:
+            raise ValueError(f"Unknown export format {format}, expected one of {', '.join(WRITERS)}")
+        if partition_by not in ("created_date", "_id"):
+            raise ValueError(f"Can not partition by {partition_by}, expected created_date or _id")
+
+        self.out_dir = out_dir
+        self.format = format
+        self.partitions = max(partitions, 1)
+        self.partition_by = partition_by
+        self.incremental = incremental
+        self.batch_size = batch_size
+        self._client = client
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.out_dir, MANIFEST_NAME)
+
+    def load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {"runs": []}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def export(self, collections: list[str] | None = None) -> dict:
+        collections = collections or list(EXPORT_SOURCES)
+        unknown = set(collections) - set(EXPORT_SOURCES)
+        if unknown:
+            raise ValueError(f"Unknown collections {', '.join(sorted(unknown))}")
+
+        manifest = self.load_manifest()
+        started_at = datetime.now(timezone.utc)
+        run = {
+            "id": started_at.strftime("%Y%m%dT%H%M%S%fZ"),
+            "format": self.format,
+            "until": started_at.isoformat(),
+            "collections": {},
+        }
+
+        for name in collections:
+            since = self._watermark(manifest, name) if self.incremental else None
+            run["collections"][name] = self._export_collection(EXPORT_SOURCES[name], run["id"], since, started_at)
+
+        manifest["runs"].append(run)
+        self._save_manifest(manifest)
+        return run
+
+    def _watermark(self, manifest: dict, collection_name: str) -> datetime | None:
+        for run in reversed(manifest["runs"]):
+            if collection_name in run["collections"]:
+                return overlap_watermark(datetime.fromisoformat(run["until"]))
+        return None
+
+    def _export_collection(self, source: ExportSource, run_id: str, since: datetime | None,
+                           until: datetime) -> dict:
+        name = source.collection_name
+        filters = self._partition_filters(name, since, until)
+        logger.info(f"Exporting {name} since {since or 'the beginning'} in {len(filters)} partitions")
+
+        directory = os.path.join(self.out_dir, name)
+        with ThreadPoolExecutor(max_workers=len(filters), thread_name_prefix="exporter") as executor:
+            results = list(executor.map(
+                lambda args: self._export_partition(source, args[1], directory, f"{run_id}-p{args[0]:02d}"),
+                enumerate(filters)
+            ))
+
+        shards = [{**shard, "path": f"{name}/{shard['path']}"} for shards, _ in results for shard in shards]
+        summary = {
+            "since": since.isoformat() if since else None,
+            "records": sum(shard["records"] for shard in shards),
+            "skipped": sum(skipped for _, skipped in results),
+            "shards": shards,
+        }
+        logger.info(f"Exported {summary['records']} records of {name} to {len(shards)} shards")
+        return summary
+
+    def _partition_filters(self, collection_name: str, since: datetime | None, until: datetime) -> list[dict]:
+        """Range filters over `partition_by` holding about the same number of documents each.
+
+        Rows not rewritten by scripts/migrate_bson_types.py keep `created_date` and `_id` as strings, which no
+        range over dates or UUIDs matches. Full runs export them in a partition of their own. Incremental runs
+        need not: such rows predate the first run, and a collection's first run is a full one.
+        """
+        key = self.partition_by
+        base = {"created_date": {"$gte": since, "$lt": until}} if since else {}
+        legacy = {key: {"$type": "string"}}
+        legacy_filters = [] if since or self._client.find_one(collection_name, legacy) is None else [legacy]
+        if legacy_filters:
+            logger.warning(f"{collection_name} has rows with a string {key}, "
+                           f"run scripts/migrate_bson_types.py to store them as BSON dates and UUIDs")
+
+        # Mongo picks the boundaries server side, nothing but the bucket bounds comes back.
+        native = {key: {"$not": {"$type": "string"}}}
+        buckets = list(self._client.aggregate(collection_name, [
+            {"$match": {"$and": [base, native]} if base else native},
+            {"$bucketAuto": {"groupBy": f"${key}", "buckets": self.partitions}},
+        ]))
+        if len(buckets) < 2:
+            return [{"$and": [base, native]} if base else native, *legacy_filters]
+
+        starts = [bucket["_id"]["min"] for bucket in buckets]
+        bounds = [{"$gte": lo, "$lt": hi} for lo, hi in zip(starts, starts[1:])] + [{"$gte": starts[-1]}]
+        return [{**base, key: {**base.get(key, {}), **bound}} for bound in bounds] + legacy_filters
+
+    def _export_partition(self, source: ExportSource, filter: dict, directory: str,
+                          prefix: str) -> tuple[list[dict], int]:
+        skipped = 0
+        with WRITERS[self.format](directory, prefix) as writer:
+            cursor = self._client.find(source.collection_name, filter, batch_size=self.batch_size)
+            for rows in iter_batches(cursor, self.batch_size):
+                skipped += self._write_batch(source, writer, rows)
+        return writer.shards, skipped
+
+    @staticmethod
+    def _write_batch(source: ExportSource, writer, rows: list[dict]) -> int:
+        docs = []
+        for row in rows:
+            try:
+                docs.append(source.document_class.from_mongo_dict(row))
+            except ValidationError as e:
+                logger.warning(f"Skipping {row.get('_id')} of {source.collection_name}: {e}")
+
+        if docs:
+            for records in source.to_records(docs):
+                writer.write(records)
+        return len(rows) - len(docs)
+
+    def _save_manifest(self, manifest: dict) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,136 @@
+import json
+import os
+from abc import ABC, abstractmethod
+
+import zstandard
+
+from sokhan.data_export.configs import (EXPORT_COMPRESSION_LEVEL, EXPORT_PARQUET_ROW_GROUP_SIZE,
+                                        EXPORT_SHARD_MAX_SIZE)
+
+
+class ShardWriter(ABC):
+    """Writes records to numbered shard files, starting a new one once the current one reaches `max_size` bytes.
+
+    The size is checked after every write, so a shard overshoots the cap by at most one batch.
+    """
+    suffix: str
+
+    def __init__(self, directory: str, prefix: str, max_size: int = EXPORT_SHARD_MAX_SIZE):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_size = max_size
+        self.shards: list[dict] = []
+        self._file = None
+        self._records = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, records: list[dict]) -> None:
+        if not records:
+            return
+        if self._file is None:
+            self._open()
+
+        self._write(records)
+        self._records += len(records)
+        if self._file.tell() >= self.max_size:
+            self._close()
+
+    def close(self) -> list[dict]:
+        if self._file is not None:
+            self._close()
+        return self.shards
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self) -> None:
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.shards):05d}{self.suffix}")
+        self._file = open(path, "wb")
+        self._records = 0
+        self._start()
+
+    def _close(self) -> None:
+        self._finish()
+        self.shards.append({
+            "path": os.path.basename(self._file.name),
+            "records": self._records,
+            "size": self._file.tell(),
+        })
+        self._file.close()
+        self._file = None
+
+    def _start(self) -> None:
+        pass
+
+    @abstractmethod
+    def _write(self, records: list[dict]) -> None:
+        pass
+
+    def _finish(self) -> None:
+        pass
+
+
+class JsonlShardWriter(ShardWriter):
+    suffix = ".jsonl.zst"
+
+    def _start(self) -> None:
+        compressor = zstandard.ZstdCompressor(level=EXPORT_COMPRESSION_LEVEL)
+        self._stream = compressor.stream_writer(self._file, closefd=False)
+
+    def _write(self, records: list[dict]) -> None:
+        self._stream.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+                           .encode("utf-8"))
+
+    def _finish(self) -> None:
+        self._stream.close()
+
+
+class ParquetShardWriter(ShardWriter):
+    suffix = ".parquet"
+
+    def __init__(self, *args, **kwargs):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Parquet exports need pyarrow, install sokhan[parquet]") from e
+        super().__init__(*args, **kwargs)
+
+    def _start(self) -> None:
+        self._writer = None
+        self._buffer = []
+
+    def _write(self, records: list[dict]) -> None:
+        self._buffer.extend(records)
+        if len(self._buffer) >= EXPORT_PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._buffer:
+            return
+
+        if self._writer is None:
+            schema = pa.Table.from_pylist(self._buffer).schema
+            # Columns that are None throughout the first row group would be typed null, the exported fields are text.
+            schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                for field in schema])
+            self._writer = pq.ParquetWriter(self._file, schema, compression="zstd",
+                                            compression_level=EXPORT_COMPRESSION_LEVEL)
+        self._writer.write_table(pa.Table.from_pylist(self._buffer, schema=self._writer.schema))
+        self._buffer = []
+
+    def _finish(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+WRITERS: dict[str, type[ShardWriter]] = {
+    "jsonl": JsonlShardWriter,
+    "parquet": ParquetShardWriter,
+}
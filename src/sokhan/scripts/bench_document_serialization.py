@@ -0,0 +1,68 @@
+"""Benchmark of document construction and Mongo serialization.
+
+Usage: python -m sokhan.scripts.bench_document_serialization [count]
+"""
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import bson
+from pydantic import AnyUrl
+
+from sokhan.data_entry.base.documents import Document
+from sokhan.data_entry.domain.tasnim.documents import TasnimNews
+
+
+def legacy_to_mongo_dict(doc: Document) -> dict:
+    # The serializer before the BSON native path, kept here as the baseline.
+    data = {}
+    for key, value in doc.model_dump().items():
+        if isinstance(value, (AnyUrl, uuid.UUID)):
+            data[key] = str(value)
+        elif isinstance(value, datetime):
+            data[key] = value.isoformat()
+        else:
+            data[key] = value
+    data["_id"] = str(data.pop("id"))
+    return data
+
+
+def sample_fields(i: int) -> dict:
+    return {
+        "url": f"https://tasnimnews.ir/fa/news/1404/11/24/{i}/",
+        "title": "عنوان خبر " * 4,
+        "content": "متن خبر " * 400,
+        "shamsi_date": "1404-11-24 10:20",
+        "date": "2026-2-13 10:20",
+        "keywords": ["سیاسی", "اقتصادی"],
+    }
+
+
+def timed(name: str, func, count: int) -> tuple[dict, object]:
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    return {"case": name, "docs": count, "seconds": round(elapsed, 4), "docs_per_sec": round(count / elapsed, 1)}, result
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    fields = [sample_fields(i) for i in range(count)]
+    results = []
+
+    result, docs = timed("construct", lambda: [TasnimNews(**f) for f in fields], count)
+    results.append(result)
+
+    result, legacy = timed("serialize_legacy", lambda: [legacy_to_mongo_dict(doc) for doc in docs], count)
+    results.append(result)
+    result, native = timed("serialize_bulk", lambda: Document.to_mongo_dicts(docs), count)
+    results.append(result)
+
+    codec = bson.CodecOptions(uuid_representation=bson.binary.UuidRepresentation.STANDARD)
+    results.append(timed("bson_encode_legacy", lambda: [bson.encode(d) for d in legacy], count)[0])
+    results.append(timed("bson_encode_bulk", lambda: [bson.encode(d, codec_options=codec) for d in native], count)[0])
+
+    for result in results:
+        print(json.dumps(result))
@@ -0,0 +1,55 @@
+"""Micro-benchmark of Tasnim article parsing over stored pages.
+
+Usage: python -m sokhan.scripts.bench_tasnim_parser <dir with saved article .html files> [repeat]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+from sokhan.data_entry.domain.tasnim.crawlers import TASNIM_ARTICLE_STRAINER, TasnimArticleCrawler
+from sokhan.data_entry.utils.parallel import map_in_process_pool
+from sokhan.data_entry.utils.parsing import make_soup
+
+PARSERS = ["html.parser", "lxml"]
+
+
+def bench(name: str, func, items: list, repeat: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(items)
+    elapsed = time.perf_counter() - started
+    pages = len(items) * repeat
+    return {"case": name, "pages": pages, "seconds": round(elapsed, 4), "pages_per_sec": round(pages / elapsed, 1)}
+
+
+if __name__ == "__main__":
+    fixtures_dir = Path(sys.argv[1])
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    pages = [(path.read_text(encoding="utf-8"), f"https://tasnimnews.ir/fa/news/{path.stem}")
+             for path in sorted(fixtures_dir.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No .html fixtures found in {fixtures_dir}")
+
+    crawler = TasnimArticleCrawler()
+    results = []
+
+    for parser in PARSERS:
+        for parse_only in (None, TASNIM_ARTICLE_STRAINER):
+            name = f"{parser}{'+strainer' if parse_only else ''}"
+            results.append(bench(
+                name,
+                lambda items: [crawler._extract_from_soup(make_soup(html, parse_only=parse_only, parser=parser), url)
+                               for html, url in items],
+                pages, repeat
+            ))
+
+    results.append(bench(
+        "default+process_pool",
+        lambda items: map_in_process_pool(crawler._extract_from_html, *zip(*items)),
+        pages, repeat
+    ))
+
+    for result in results:
+        print(json.dumps(result))
@@ -0,0 +1,42 @@
+"""Add the documents created since the last run to the local full-text search index."""
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from sokhan.data_access.configs import SEARCH_INDEX_BATCH_SIZE
+from sokhan.data_access.search import SearchIndex, get_search_index
+from sokhan.data_entry.domain.custom.documents import CustomArticleDocument
+from sokhan.data_entry.domain.tasnim.documents import TasnimNews
+from sokhan.data_entry.domain.virgool.documents import VirgoolArticleDocument
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, iter_batches, overlap_watermark
+
+DOCUMENT_CLASSES = [TasnimNews, CustomArticleDocument, VirgoolArticleDocument]
+
+
+def index_batch(index: SearchIndex, document_class, collection_name: str, rows: list[dict]) -> int:
+    return index.add_many(collection_name, [document_class.from_mongo_dict(row) for row in rows])
+
+
+def build(index: SearchIndex, document_class) -> int:
+    collection_name = document_class.model_construct().collection_name
+    until = datetime.now(timezone.utc)
+    since = overlap_watermark(index.watermark(collection_name))
+
+    filter = {"created_date": {"$lt": until}}
+    if since is not None:
+        filter["created_date"]["$gte"] = since
+
+    added = 0
+    cursor = MONGO_CLIENT.find(collection_name, filter, batch_size=SEARCH_INDEX_BATCH_SIZE)
+    for rows in iter_batches(cursor, SEARCH_INDEX_BATCH_SIZE):
+        added += index_batch(index, document_class, collection_name, rows)
+
+    index.set_watermark(collection_name, until)
+    return added
+
+
+if __name__ == "__main__":
+    search_index = get_search_index()
+    for document_class in DOCUMENT_CLASSES:
+        count = build(search_index, document_class)
+        logger.info(f"Indexed {count} new documents of {document_class.__name__}")
@@ -0,0 +1,53 @@
+"""Fail when an entry module imports slower than the budget or drags in a crawler-only dependency.
+
+Each module is imported in a fresh interpreter with `-X importtime`, the best of a few runs counts.
+
+Usage: python -m sokhan.scripts.check_import_time [budget seconds] [module ...]
+"""
+import json
+import subprocess
+import sys
+
+ENTRY_MODULES = [
+    "sokhan.utils.db.mongo_client",
+    "sokhan.data_entry.crawlers",
+    "sokhan.data_entry.ingest",
+    "sokhan.data_entry.feed_watcher",
+    "sokhan.data_access.queries",
+    "sokhan.data_export.exporter",
+]
+# Only the crawlers routed to may import these.
+HEAVY_MODULES = ["selenium", "webdriver_manager", "langchain_community", "git", "bs4", "zenml"]
+DEFAULT_BUDGET = 0.5
+RUNS = 3
+
+
+def import_time(module: str) -> tuple[float, list[str]]:
+    """Cumulative import seconds of `module` and the heavy modules it imported."""
+    code = (f"import sys, json, {module}; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                            check=True)
+
+    cumulative = None
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.removeprefix("import time:").split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            cumulative = int(fields[1]) / 1e6
+    return cumulative, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET
+    modules = sys.argv[2:] or ENTRY_MODULES
+
+    failed = False
+    for module in modules:
+        runs = [import_time(module) for _ in range(RUNS)]
+        seconds = min(seconds for seconds, _ in runs)
+        heavy = runs[0][1]
+        ok = seconds <= budget and not heavy
+        failed |= not ok
+        print(json.dumps({"module": module, "seconds": round(seconds, 3), "heavy_imports": heavy, "ok": ok}))
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,37 @@
+"""Chunk stored documents chunked with an older CHUNKING_VERSION (or never), replacing their old chunks."""
+from loguru import logger
+
+from sokhan.data_entry.chunking import CHUNKING_VERSION, insert_chunks
+from sokhan.data_entry.domain.custom.documents import CustomArticleDocument
+from sokhan.data_entry.domain.git.documents import GitRepositoryDocument
+from sokhan.data_entry.domain.tasnim.documents import TasnimNews
+from sokhan.data_entry.domain.virgool.documents import VirgoolArticleDocument
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, iter_batches
+
+DOCUMENT_CLASSES = [TasnimNews, CustomArticleDocument, VirgoolArticleDocument, GitRepositoryDocument]
+BATCH_SIZE = 1000
+
+
+def rechunk(document_class) -> tuple[int, int]:
+    collection_name = document_class.model_construct().collection_name
+    cursor = MONGO_CLIENT.find(collection_name, {"chunking_version": {"$not": {"$gte": CHUNKING_VERSION}}},
+                               batch_size=BATCH_SIZE)
+
+    updated, chunks = 0, 0
+    for rows in iter_batches(cursor, BATCH_SIZE):
+        chunks += update_batch(document_class, rows)
+        updated += len(rows)
+
+    return updated, chunks
+
+
+def update_batch(document_class, rows: list[dict]) -> int:
+    # Chunks link to the stored _id, older rows keep their string UUIDs.
+    return insert_chunks([document_class.from_mongo_dict(row) for row in rows],
+                         stored_ids=[row["_id"] for row in rows])
+
+
+if __name__ == "__main__":
+    for document_class in DOCUMENT_CLASSES:
+        count, chunks = rechunk(document_class)
+        logger.info(f"Chunked {count} documents of {document_class.__name__} into {chunks} chunks")
@@ -0,0 +1,20 @@
+"""Compare two run_benchmarks reports stage by stage.
+
+Usage: python -m sokhan.scripts.compare_benchmarks <before.json> <after.json>
+"""
+import json
+import sys
+
+from sokhan.benchmarks.runner import compare
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        raise SystemExit(__doc__)
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        before = json.load(f)
+    with open(sys.argv[2], encoding="utf-8") as f:
+        after = json.load(f)
+
+    for row in compare(before, after):
+        print(json.dumps(row, ensure_ascii=False))
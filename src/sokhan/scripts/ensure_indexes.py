@@ -0,0 +1,7 @@
+"""Create the Mongo indexes the read API and batch jobs rely on, `--drop-unknown` also drops unlisted ones."""
+import sys
+
+from sokhan.data_access.indexes import ensure_indexes
+
+if __name__ == "__main__":
+    ensure_indexes(drop_unknown="--drop-unknown" in sys.argv[1:])
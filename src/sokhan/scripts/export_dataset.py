@@ -0,0 +1,16 @@
+"""Export collections to zstd JSONL (or Parquet) shards with a manifest, see sokhan.data_export.configs.
+
+Usage: python -m sokhan.scripts.export_dataset [collection ...]
+"""
+import sys
+
+from loguru import logger
+
+from sokhan.data_export.exporter import DatasetExporter
+
+if __name__ == "__main__":
+    exporter = DatasetExporter()
+    run = exporter.export(sys.argv[1:] or None)
+    for name, summary in run["collections"].items():
+        logger.info(f"{name}: {summary['records']} records in {len(summary['shards'])} shards")
+    logger.info(f"Manifest written to {exporter.manifest_path}")
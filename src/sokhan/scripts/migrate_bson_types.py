@@ -0,0 +1,82 @@
+"""Rewrite rows stored before documents were serialized to BSON native values.
+
+Older rows keep `_id` as a string UUID and datetimes as ISO strings. Mongo range queries do not cross BSON
+types, so such rows silently fall out of date filters, `by_date` pages and the exporter's partitions until
+they are rewritten: datetimes are updated in place, rows with a string `_id` are reinserted under the binary
+UUID and the old row is deleted, along with its chunks, which scripts/chunk_documents.py then rebuilds.
+Repository rows are rewritten from their manifest, so scripts/migrate_repository_blobs.py runs first.
+
+Usage: python -m sokhan.scripts.migrate_bson_types
+"""
+import uuid
+from datetime import datetime
+
+from loguru import logger
+
+from sokhan.data_entry.base.documents import Document, DocumentChunk
+from sokhan.data_entry.chunking import CHUNKS_COLLECTION
+from sokhan.data_entry.domain.custom.documents import CustomArticleDocument
+from sokhan.data_entry.domain.git.documents import GitBlobDocument, GitRepositoryDocument
+from sokhan.data_entry.domain.tasnim.documents import TasnimNews
+from sokhan.data_entry.domain.virgool.documents import VirgoolArticleDocument
+from sokhan.scripts import migrate_repository_blobs
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, iter_batches
+
+DOCUMENT_CLASSES = [TasnimNews, CustomArticleDocument, VirgoolArticleDocument, GitRepositoryDocument, GitBlobDocument,
+                    DocumentChunk]
+BATCH_SIZE = 1000
+
+
+def datetime_fields(document_class) -> list[str]:
+    return [name for name, field in document_class.model_fields.items()
+            if field.annotation is datetime or datetime in getattr(field.annotation, "__args__", ())]
+
+
+def legacy_filter(document_class) -> dict:
+    conditions = [{name: {"$type": "string"}} for name in datetime_fields(document_class)]
+    if document_class.model_fields["id"].annotation is uuid.UUID:
+        conditions.append({"_id": {"$type": "string"}})
+    if document_class is GitRepositoryDocument:
+        # Rebuilt from the model these would lose their inline files, they wait for migrate_repository_blobs.
+        return {"$or": conditions, "path_map_content": {"$exists": False}}
+    return {"$or": conditions}
+
+
+def migrate_batch(document_class, collection_name: str, rows: list[dict]) -> int:
+    fields = datetime_fields(document_class)
+    docs = [document_class.from_mongo_dict(row) for row in rows]
+    updates, replacements, old_ids = {}, [], []
+    for row, data in zip(rows, Document.to_mongo_dicts(docs)):
+        if row["_id"] == data["_id"] and type(row["_id"]) is type(data["_id"]):
+            updates[row["_id"]] = {name: data[name] for name in fields}
+        else:
+            # Chunks link to the old string _id, the parent is chunked again under the new one.
+            replacements.append({**data, "chunking_version": 0})
+            old_ids.append(row["_id"])
+
+    MONGO_CLIENT.bulk_update(collection_name, updates)
+    if replacements:
+        # Insert first, a crash in between leaves a row twice rather than not at all; reruns skip the copy.
+        MONGO_CLIENT.bulk_insert(collection_name, replacements, ignore_duplicates=True)
+        MONGO_CLIENT.delete_many(collection_name, {"_id": {"$in": old_ids}})
+        MONGO_CLIENT.delete_many(CHUNKS_COLLECTION, {"parent_id": {"$in": old_ids}})
+    return len(rows)
+
+
+def migrate(document_class) -> int:
+    collection_name = document_class.model_construct().collection_name
+    cursor = MONGO_CLIENT.find(collection_name, legacy_filter(document_class), batch_size=BATCH_SIZE)
+
+    migrated = 0
+    for rows in iter_batches(cursor, BATCH_SIZE):
+        migrated += migrate_batch(document_class, collection_name, rows)
+
+    return migrated
+
+
+if __name__ == "__main__":
+    count = migrate_repository_blobs.migrate()
+    logger.info(f"Moved the files of {count} repository rows to the blob store")
+    for document_class in DOCUMENT_CLASSES:
+        count = migrate(document_class)
+        logger.info(f"Migrated {count} rows of {document_class.__name__}")
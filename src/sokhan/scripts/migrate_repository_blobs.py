@@ -0,0 +1,64 @@
+"""Move the files of repository rows stored before blob dedup into the blob store.
+
+Older rows keep every file inline in `path_map_content`, which GitRepositoryDocument no longer reads, so they
+load with an empty manifest. Each file is stored in GIT_BLOB_STORE under its git blob sha, the row gets the
+`path_map_blob` manifest and `path_map_content` is unset. Run it before scripts/migrate_bson_types.py.
+
+Usage: python -m sokhan.scripts.migrate_repository_blobs
+"""
+import hashlib
+
+from loguru import logger
+
+from sokhan.data_entry.configs import GIT_BLOB_BATCH_SIZE
+from sokhan.data_entry.domain.git.documents import BlobSha, CodeContent, GitRepositoryDocument
+from sokhan.data_entry.domain.git.storage import GIT_BLOB_STORE
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, iter_batches
+
+LEGACY_FILTER = {"path_map_content": {"$exists": True}}
+# Legacy rows hold whole repos, keep a few in memory at a time.
+BATCH_SIZE = 10
+
+
+def blob_sha(content: CodeContent) -> BlobSha:
+    """The sha git gives the file, so migrated blobs are shared with freshly crawled ones."""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def migrate_batch(collection_name: str, rows: list[dict]) -> int:
+    id_map_fields = {}
+    for row in rows:
+        sha_map_content = {}
+        path_map_blob = {}
+        for path, content in row["path_map_content"].items():
+            sha = blob_sha(content)
+            sha_map_content[sha] = content
+            path_map_blob[path] = sha
+
+        shas = list(sha_map_content)
+        for i in range(0, len(shas), GIT_BLOB_BATCH_SIZE):
+            batch = shas[i:i + GIT_BLOB_BATCH_SIZE]
+            missing = GIT_BLOB_STORE.missing(set(batch))
+            GIT_BLOB_STORE.put_many({sha: sha_map_content[sha] for sha in batch if sha in missing})
+        id_map_fields[row["_id"]] = {"path_map_blob": path_map_blob}
+
+    # Blobs are written first, a crash in between leaves the row as it was and a rerun skips stored blobs.
+    MONGO_CLIENT.bulk_update(collection_name, id_map_fields, unset=("path_map_content",))
+    return len(rows)
+
+
+def migrate() -> int:
+    collection_name = GitRepositoryDocument.model_construct().collection_name
+    cursor = MONGO_CLIENT.find(collection_name, LEGACY_FILTER, batch_size=BATCH_SIZE)
+
+    migrated = 0
+    for rows in iter_batches(cursor, BATCH_SIZE):
+        migrated += migrate_batch(collection_name, rows)
+
+    return migrated
+
+
+if __name__ == "__main__":
+    count = migrate()
+    logger.info(f"Moved the files of {count} repository rows to the blob store")
@@ -0,0 +1,55 @@
+"""Rebuild the near-duplicate LSH index from the stored documents, e.g. after changing DEDUP_NUM_PERM/DEDUP_BANDS."""
+import os
+import sys
+
+from loguru import logger
+
+from sokhan.data_entry.configs import DEDUP_INDEX_PATH
+from sokhan.data_entry.dedup import LSHIndex, document_signatures
+from sokhan.data_entry.domain.custom.documents import CustomArticleDocument
+from sokhan.data_entry.domain.tasnim.documents import TasnimNews
+from sokhan.data_entry.domain.virgool.documents import VirgoolArticleDocument
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, iter_batches
+
+DOCUMENT_CLASSES = [TasnimNews, CustomArticleDocument, VirgoolArticleDocument]
+BATCH_SIZE = 1000
+
+
+def index_batch(index: LSHIndex, document_class, rows: list[dict]) -> int:
+    docs = [document_class.from_mongo_dict(row) for row in rows]
+    items = [(str(doc.id), signature) for doc, signature in zip(docs, document_signatures(docs))
+             if signature is not None]
+    index.add_many(items)
+    return len(items)
+
+
+def rebuild(index: LSHIndex, document_class) -> int:
+    collection_name = document_class.model_construct().collection_name
+    # Linked duplicates point at an indexed original, indexing them too would only widen the candidate lists.
+    cursor = MONGO_CLIENT.find(collection_name, {"duplicate_of": None}, batch_size=BATCH_SIZE)
+
+    indexed = 0
+    for rows in iter_batches(cursor, BATCH_SIZE):
+        indexed += index_batch(index, document_class, rows)
+
+    return indexed
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEDUP_INDEX_PATH
+    tmp_path = f"{path}.rebuild"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(tmp_path + suffix):
+            os.remove(tmp_path + suffix)
+
+    index = LSHIndex(tmp_path)
+    for document_class in DOCUMENT_CLASSES:
+        count = rebuild(index, document_class)
+        logger.info(f"Indexed {count} documents of {document_class.__name__}")
+    index.close()
+
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.replace(tmp_path, path)
+    logger.info(f"Dedup index written to {path}")
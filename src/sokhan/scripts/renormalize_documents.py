@@ -0,0 +1,42 @@
+"""Bring stored documents normalized with an older NORMALIZATION_VERSION (or never) up to the current one."""
+from loguru import logger
+
+from sokhan.data_entry.domain.custom.documents import CustomArticleDocument
+from sokhan.data_entry.domain.tasnim.documents import TasnimNews
+from sokhan.data_entry.domain.virgool.documents import VirgoolArticleDocument
+from sokhan.data_entry.normalization import normalize_documents
+from sokhan.utils.db.mongo_client import MONGO_CLIENT, iter_batches
+from sokhan.utils.persian import NORMALIZATION_VERSION
+
+DOCUMENT_CLASSES = [TasnimNews, CustomArticleDocument, VirgoolArticleDocument]
+BATCH_SIZE = 1000
+
+
+def renormalize(document_class) -> int:
+    collection_name = document_class.model_construct().collection_name
+    update_fields = (*document_class.normalized_fields, "normalization_version")
+    cursor = MONGO_CLIENT.find(collection_name, {"normalization_version": {"$not": {"$gte": NORMALIZATION_VERSION}}},
+                               batch_size=BATCH_SIZE)
+
+    updated = 0
+    for rows in iter_batches(cursor, BATCH_SIZE):
+        updated += update_batch(document_class, collection_name, update_fields, rows)
+
+    return updated
+
+
+def update_batch(document_class, collection_name: str, update_fields: tuple[str, ...], rows: list[dict]) -> int:
+    docs = normalize_documents([document_class.from_mongo_dict(row) for row in rows])
+    # Update by the stored _id, older rows keep their string UUIDs.
+    id_map_fields = {
+        row["_id"]: {name: data[name] for name in update_fields}
+        for row, data in zip(rows, document_class.to_mongo_dicts(docs))
+    }
+    MONGO_CLIENT.bulk_update(collection_name, id_map_fields)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    for document_class in DOCUMENT_CLASSES:
+        count = renormalize(document_class)
+        logger.info(f"Renormalized {count} documents of {document_class.__name__}")
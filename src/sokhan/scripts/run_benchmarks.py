@@ -0,0 +1,25 @@
+"""Offline end-to-end benchmark of the ingestion stages, see sokhan.benchmarks.configs for the knobs.
+
+Pages come from local fixture servers, repos from local bare repos and writes go to an in-memory Mongo stand-in.
+
+Usage: python -m sokhan.scripts.run_benchmarks [output.json] [stage ...]
+"""
+import json
+import sys
+
+from loguru import logger
+
+from sokhan.benchmarks.configs import BENCH_STAGES
+from sokhan.benchmarks.runner import run_benchmarks
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else None
+    report = run_benchmarks(sys.argv[2:] or BENCH_STAGES or None)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+        logger.info(f"Report written to {output}")
+    else:
+        print(text)
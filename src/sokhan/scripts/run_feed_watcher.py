@@ -0,0 +1,7 @@
+import sys
+
+from sokhan.data_entry.configs import FEED_WATCHER_FEEDS
+from sokhan.data_entry.feed_watcher import FeedWatcher
+
+if __name__ == "__main__":
+    FeedWatcher(feed_urls=sys.argv[1:] or FEED_WATCHER_FEEDS).run()
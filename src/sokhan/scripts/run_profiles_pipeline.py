@@ -0,0 +1,27 @@
+"""Onboard many authors in one pipeline run.
+
+Usage: python -m sokhan.scripts.run_profiles_pipeline <profile url | file with one url per line> ...
+"""
+import os
+import sys
+
+from sokhan.data_entry.pipelines import insert_profiles_data_to_db_pipeline
+
+
+def read_profile_urls(args: list[str]) -> list[str]:
+    urls = []
+    for arg in args:
+        if os.path.isfile(arg):
+            with open(arg, encoding="utf-8") as f:
+                urls.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+        else:
+            urls.append(arg)
+    return urls
+
+
+if __name__ == "__main__":
+    profile_urls = read_profile_urls(sys.argv[1:])
+    if not profile_urls:
+        raise SystemExit(__doc__)
+
+    insert_profiles_data_to_db_pipeline(profile_urls=profile_urls)
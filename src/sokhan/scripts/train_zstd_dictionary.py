@@ -0,0 +1,28 @@
+"""Train a zstd dictionary on stored article contents for compressing short Persian texts.
+
+Usage: python -m sokhan.scripts.train_zstd_dictionary [samples per collection]
+Then set ZSTD_DICTIONARY_ID to the printed id; documents written before keep their own dictionary id.
+"""
+import sys
+
+import zstandard
+
+from sokhan.utils.compression.codec import decompress_text, save_dictionary
+from sokhan.utils.compression.configs import ZSTD_DICTIONARY_SIZE
+from sokhan.utils.db.mongo_client import MONGO_CLIENT
+
+COLLECTIONS = ["tasnim_news", "custom_articles", "virgool_articles"]
+
+if __name__ == "__main__":
+    sample_size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    samples = []
+    for collection_name in COLLECTIONS:
+        for data in MONGO_CLIENT.sample(collection_name, sample_size, projection={"content": 1}):
+            content = decompress_text(data.get("content"))
+            if content:
+                samples.append(content.encode("utf-8"))
+
+    dictionary = zstandard.train_dictionary(ZSTD_DICTIONARY_SIZE, samples)
+    path = save_dictionary(dictionary)
+    print(f"Trained dictionary {dictionary.dict_id()} on {len(samples)} samples: {path}")
@@ -0,0 +1,93 @@
+import os
+import threading
+
+import zstandard
+from bson import Binary
+
+from sokhan.utils.compression.configs import (COMPRESSION_ENABLED, COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE,
+                                              ZSTD_DICTIONARY_DIR, ZSTD_DICTIONARY_ID)
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+DICTIONARY_SUFFIX = ".zdict"
+
+_local = threading.local()
+_dictionaries: dict[int, zstandard.ZstdCompressionDict] | None = None
+_dictionaries_lock = threading.Lock()
+
+
+def dictionary_path(dict_id: int, directory: str = ZSTD_DICTIONARY_DIR) -> str:
+    return os.path.join(directory, f"{dict_id}{DICTIONARY_SUFFIX}")
+
+
+def save_dictionary(dictionary: zstandard.ZstdCompressionDict, directory: str = ZSTD_DICTIONARY_DIR) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = dictionary_path(dictionary.dict_id(), directory)
+    with open(path, "wb") as f:
+        f.write(dictionary.as_bytes())
+    return path
+
+
+def get_dictionaries() -> dict[int, zstandard.ZstdCompressionDict]:
+    """Dictionaries found in ZSTD_DICTIONARY_DIR, by id. Frames name their dictionary so old ones stay readable."""
+    global _dictionaries
+    if _dictionaries is None:
+        with _dictionaries_lock:
+            if _dictionaries is None:
+                dictionaries = {}
+                if os.path.isdir(ZSTD_DICTIONARY_DIR):
+                    for name in os.listdir(ZSTD_DICTIONARY_DIR):
+                        if name.endswith(DICTIONARY_SUFFIX):
+                            with open(os.path.join(ZSTD_DICTIONARY_DIR, name), "rb") as f:
+                                dictionary = zstandard.ZstdCompressionDict(f.read())
+                            dictionaries[dictionary.dict_id()] = dictionary
+                _dictionaries = dictionaries
+    return _dictionaries
+
+
+def _compressor() -> zstandard.ZstdCompressor:
+    # zstandard (de)compressor objects are not thread safe, keep one per thread.
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        dictionary = get_dictionaries().get(ZSTD_DICTIONARY_ID) if ZSTD_DICTIONARY_ID else None
+        compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=dictionary, write_content_size=True)
+        _local.compressor = compressor
+    return compressor
+
+
+def _decompressor(dict_id: int) -> zstandard.ZstdDecompressor:
+    decompressors = getattr(_local, "decompressors", None)
+    if decompressors is None:
+        decompressors = _local.decompressors = {}
+
+    decompressor = decompressors.get(dict_id)
+    if decompressor is None:
+        dictionary = get_dictionaries()[dict_id] if dict_id else None
+        decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+    return decompressor
+
+
+def compress_bytes(data: bytes) -> bytes:
+    return _compressor().compress(data)
+
+
+def decompress_bytes(data: bytes) -> bytes:
+    if not data.startswith(ZSTD_MAGIC):
+        return data
+    return _decompressor(zstandard.get_frame_parameters(data).dict_id).decompress(data)
+
+
+def compress_text(text: str | None) -> str | Binary | None:
+    """Compress text worth compressing, shorter text is kept as is so it stays readable in the shell."""
+    if not COMPRESSION_ENABLED or text is None:
+        return text
+
+    data = text.encode("utf-8")
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return text
+    return Binary(compress_bytes(data))
+
+
+def decompress_text(value):
+    if isinstance(value, bytes):
+        return decompress_bytes(value).decode("utf-8")
+    return value
@@ -0,0 +1,8 @@
+import os
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "false").lower() == "true"
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 3))
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 256))
+ZSTD_DICTIONARY_DIR = os.getenv("ZSTD_DICTIONARY_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sokhan", "zstd"))
+ZSTD_DICTIONARY_ID = int(os.getenv("ZSTD_DICTIONARY_ID", 0))
+ZSTD_DICTIONARY_SIZE = int(os.getenv("ZSTD_DICTIONARY_SIZE", 110 * 1024))
@@ -5,3 +5,7 @@ FETCH_CONNECTION_TIMEOUT = int(os.getenv("FETCH_CONNECTION_TIMEOUT", 60 * 10))
 FETCH_TIMEOUT = int(os.getenv("FETCH_TIMEOUT", 60 * 60 * 4))
 FETCH_RETRY_DELAY = int(os.getenv("FETCH_RETRY_DELAY", 2))
 FETCH_RETRY_COUNT = int(os.getenv("FETCH_RETRY_COUNT", 5))
+FETCH_USER_AGENT = os.getenv(
+    "FETCH_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
@@ -28,3 +28,15 @@ class SSLException(Exception):
 
 class EmptyReplyException(Exception):
     error_code = 1010
+
+
+class HTTPStatusException(Exception):
+    error_code = 1011
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class DecodingException(Exception):
+    error_code = 1012
@@ -2,13 +2,23 @@ from io import BytesIO
 from urllib.parse import urlparse, quote, urlunparse
 from typing import Optional, Union, Dict
 import json
+import re
+import time
 from functools import wraps
 
 import pycurl
 
-from sokhan.data_entry.utils.curl.configs import *
-from sokhan.data_entry.utils.curl.exceptions import *
+from sokhan.utils.curl.configs import *
+from sokhan.utils.curl.exceptions import *
+from sokhan.utils.metrics.registry import METRICS
 
+# RFC 3986 reserved and unreserved characters, plus "%" so already encoded URLs are not encoded twice.
+URL_SAFE_CHARS = "/:@!$&'()*+,;=-._~%"
+# `charset=` of a Content-Type header, or of a `<meta charset>` / `<meta http-equiv="Content-Type">` tag.
+CHARSET_PATTERN = re.compile(rb"""charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+META_PATTERN = re.compile(rb"<meta\b[^>]*>", re.IGNORECASE)
+# Like browsers, only the start of the document is searched for a `<meta>` charset.
+META_SCAN_BYTES = 4096
 
 
 class PyCurlAgent:
@@ -24,10 +34,11 @@ class PyCurlAgent:
         return urlunparse((
             scheme,
             parsed_url.netloc,
-            quote(parsed_url.path),
-            quote(parsed_url.params),
-            quote(parsed_url.query),
-            quote(parsed_url.fragment)
+            quote(parsed_url.path, safe=URL_SAFE_CHARS),
+            quote(parsed_url.params, safe=URL_SAFE_CHARS),
+            # Delimiters stay as they are, "?page=2" must not be sent as "?page%3D2".
+            quote(parsed_url.query, safe=URL_SAFE_CHARS + "?"),
+            quote(parsed_url.fragment, safe=URL_SAFE_CHARS + "?")
         ))
 
     def _validate_inputs(self, request_type: str, post_data: dict) -> None:
@@ -165,8 +176,30 @@ class PyCurlAgent:
     def get_header(self) -> BytesIO:
         return self.header_buffer
 
+    def get_charset(self, content: bytes) -> Optional[str]:
+        """Charset named by the Content-Type header, else by a `<meta>` tag near the start of `content`."""
+        content_type = self.get_content_type()
+        match = CHARSET_PATTERN.search(content_type.encode("latin-1")) if content_type else None
+        if match is None:
+            for meta in META_PATTERN.findall(content[:META_SCAN_BYTES]):
+                match = CHARSET_PATTERN.search(meta)
+                if match is not None:
+                    break
+        return match.group(1).decode("ascii") if match is not None else None
+
     def get_decoded_content(self) -> str:
-        return self.decode_buffer(self.get_content())
+        """Content decoded with the response's charset, UTF-8 when it names none.
+
+        Raises DecodingException rather than guessing, so a page in another encoding is not stored garbled.
+        """
+        content = self.get_content().getvalue()
+        charset = self.get_charset(content) or "utf-8"
+        try:
+            return content.decode(charset)
+        except LookupError:
+            raise DecodingException(f"Unknown charset {charset!r}.")
+        except UnicodeDecodeError as e:
+            raise DecodingException(f"Content is not valid {charset}: {e}")
 
     def get_decoded_header(self) -> str:
         return self.decode_buffer(self.get_header())
@@ -228,6 +261,19 @@ class PyCurlAgent:
     def get_response_code(self):
         return self.getinfo(pycurl.RESPONSE_CODE)
 
+    def get_timings(self) -> dict[str, float]:
+        """Seconds from the start of the transfer until each phase ended, as reported by libcurl."""
+        return {
+            "dns": self.getinfo(pycurl.NAMELOOKUP_TIME),
+            "connect": self.getinfo(pycurl.CONNECT_TIME),
+            "tls": self.getinfo(pycurl.APPCONNECT_TIME),
+            "ttfb": self.getinfo(pycurl.STARTTRANSFER_TIME),
+            "total": self.getinfo(pycurl.TOTAL_TIME),
+        }
+
+    def get_downloaded_size(self) -> float:
+        return self.getinfo(pycurl.SIZE_DOWNLOAD)
+
     def close(self) -> None:
         self.pycurl_obj.close()
         self.response_buffer.close()
@@ -244,3 +290,46 @@ def handle_with_pycurl(func):
             session.close()
 
     return wrapper
+
+
+def _record_fetch_metrics(session: PyCurlAgent) -> None:
+    timings = session.get_timings()
+    for phase, seconds in timings.items():
+        # Plain http connections report no TLS handshake.
+        if phase != "tls" or seconds > 0:
+            METRICS.observe("fetch_seconds", seconds, phase=phase)
+    METRICS.observe_size("fetch_bytes", session.get_downloaded_size())
+
+
+@handle_with_pycurl
+def _fetch_text_once(url: str, session: PyCurlAgent, **options) -> str:
+    session.set_default_options("GET", url, **options)
+    session.perform()
+    _record_fetch_metrics(session)
+
+    response_code = session.get_response_code()
+    if response_code >= 400:
+        raise HTTPStatusException(f"HTTP {response_code} for {url}", status_code=response_code)
+
+    return session.get_decoded_content()
+
+
+def fetch_text(
+        url: str,
+        retry_count: int = FETCH_RETRY_COUNT,
+        retry_delay: int = FETCH_RETRY_DELAY,
+        **options
+) -> str:
+    if retry_count <= 0:
+        raise ValueError(f"retry_count must be positive, got {retry_count}")
+
+    options.setdefault("timeout", FETCH_CONNECTION_TIMEOUT)
+    options.setdefault("user_agents", FETCH_USER_AGENT)
+
+    for attempt in range(retry_count):
+        try:
+            return _fetch_text_once(url, **options)
+        except (TimeoutException, EmptyReplyException):
+            if attempt == retry_count - 1:
+                raise
+            time.sleep(retry_delay)
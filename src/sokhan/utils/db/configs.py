@@ -0,0 +1,5 @@
+import os
+
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,zlib")
+# Docs are stamped when crawled but inserted a little later, so incremental reads re-read this much of the last one.
+INCREMENTAL_OVERLAP_MINUTES = int(os.getenv("INCREMENTAL_OVERLAP_MINUTES", 60))
@@ -1,6 +1,33 @@
+import threading
 from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
 
 import pymongo
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from sokhan.utils.db.configs import INCREMENTAL_OVERLAP_MINUTES, MONGO_COMPRESSORS
+from sokhan.utils.metrics.registry import METRICS
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def overlap_watermark(watermark: datetime | None) -> datetime | None:
+    """Where an incremental read of `created_date` starts after a run that read up to `watermark`."""
+    return watermark - timedelta(minutes=INCREMENTAL_OVERLAP_MINUTES) if watermark is not None else None
+
+
+def iter_batches(cursor: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Rows of `cursor` in lists of `size`, the last one shorter, so only a batch is held at a time."""
+    rows = []
+    for row in cursor:
+        rows.append(row)
+        if len(rows) == size:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
 
 
 class MongoDBClient:
@@ -11,17 +38,104 @@ class MongoDBClient:
             username: str = "user",
             password: str = "pass",
             db_name: str = "sokhan",
+            compressors: str = MONGO_COMPRESSORS,
     ):
-        self._client = pymongo.MongoClient(f"mongodb://{username}:{password}@{host}:{port}/?authSource=admin")
-        self._db = self._client[db_name]
+        self._uri = f"mongodb://{username}:{password}@{host}:{port}/?authSource=admin"
+        self._compressors = compressors
+        self._db_name = db_name
+        self._client: pymongo.MongoClient | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def _db(self):
+        # Connected on first use, so importing a module that holds MONGO_CLIENT starts no monitor threads.
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = pymongo.MongoClient(self._uri, uuidRepresentation="standard",
+                                                       compressors=self._compressors)
+        return self._client[self._db_name]
+
+    def bulk_insert(self, collection_name: str, data: list[dict], ignore_duplicates: bool = False) -> None:
+        METRICS.observe_size("mongo_batch_size", len(data), collection=collection_name, op="insert")
+        with METRICS.timer("mongo_write_seconds", collection=collection_name, op="insert"):
+            if not ignore_duplicates:
+                self._db[collection_name].insert_many(
+                    data
+                )
+                return
+
+            try:
+                self._db[collection_name].insert_many(data, ordered=False)
+            except BulkWriteError as e:
+                if any(error["code"] != DUPLICATE_KEY_ERROR for error in e.details["writeErrors"]):
+                    raise
+
+    def find(self, collection_name: str, filter: dict, projection: dict | None = None,
+             sort: list[tuple[str, int]] | None = None, batch_size: int = 1000, limit: int = 0) -> Iterator[dict]:
+        return self._db[collection_name].find(filter, projection=projection, sort=sort, batch_size=batch_size,
+                                              limit=limit)
+
+    def bulk_update(self, collection_name: str, id_map_fields: dict, unset: tuple[str, ...] = ()) -> None:
+        if not id_map_fields:
+            return
+        METRICS.observe_size("mongo_batch_size", len(id_map_fields), collection=collection_name, op="update")
+        update = {"$unset": {name: "" for name in unset}} if unset else {}
+        with METRICS.timer("mongo_write_seconds", collection=collection_name, op="update"):
+            self._db[collection_name].bulk_write(
+                [UpdateOne({"_id": _id}, {"$set": fields, **update}) for _id, fields in id_map_fields.items()],
+                ordered=False
+            )
+
+    def delete_many(self, collection_name: str, filter: dict) -> int:
+        with METRICS.timer("mongo_write_seconds", collection=collection_name, op="delete"):
+            return self._db[collection_name].delete_many(filter).deleted_count
+
+    def sample(self, collection_name: str, size: int, projection: dict | None = None) -> list[dict]:
+        pipeline = [{"$sample": {"size": size}}]
+        if projection:
+            pipeline.append({"$project": projection})
+        return list(self._db[collection_name].aggregate(pipeline))
+
+    def aggregate(self, collection_name: str, pipeline: list[dict]) -> Iterator[dict]:
+        return self._db[collection_name].aggregate(pipeline)
+
+    def create_indexes(self, collection_name: str, indexes: list[IndexModel]) -> list[str]:
+        return self._db[collection_name].create_indexes(indexes)
+
+    def index_information(self, collection_name: str) -> dict:
+        return self._db[collection_name].index_information()
+
+    def drop_index(self, collection_name: str, name: str) -> None:
+        self._db[collection_name].drop_index(name)
+
+    def existing_ids(self, collection_name: str, ids: list) -> set:
+        cursor = self._db[collection_name].find({"_id": {"$in": ids}}, projection={"_id": 1})
+        return {data["_id"] for data in cursor}
+
+    def put_file(self, bucket_name: str, file_id, data: bytes) -> None:
+        import gridfs
+
+        bucket = gridfs.GridFSBucket(self._db, bucket_name=bucket_name)
+        try:
+            bucket.upload_from_stream_with_id(file_id, str(file_id), data)
+        except (DuplicateKeyError, gridfs.errors.FileExists):
+            pass
+
+    def get_file(self, bucket_name: str, file_id) -> bytes:
+        import gridfs
+
+        bucket = gridfs.GridFSBucket(self._db, bucket_name=bucket_name)
+        return bucket.open_download_stream(file_id).read()
 
-    def bulk_insert(self, collection_name: str, data: list[dict]) -> None:
-        self._db[collection_name].insert_many(
-            data
-        )
+    def find_one(self, collection_name: str, filter: dict, sort: list[tuple[str, int]] | None = None,
+                 projection: dict | None = None) -> dict | None:
+        return self._db[collection_name].find_one(filter, projection=projection, sort=sort)
 
     def close(self):
-        self._client.close()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
 
 MONGO_CLIENT = MongoDBClient()
@@ -1,16 +1,14 @@
 import datetime
 from urllib.parse import urlparse
 
-import jdatetime
 from pydantic import AnyUrl
 
+from sokhan.utils.jalali import to_gregorian
+
 
 def get_domain(url: AnyUrl) -> AnyUrl:
     return urlparse(url).netloc
 
 
-def from_jalali_to_gregorian(year: int, month: int, day: int) -> datetime.datetime:
-    j_date = jdatetime.date(year, month, day)
-    g_date = j_date.togregorian()
-
-    return g_date
+def from_jalali_to_gregorian(year: int, month: int, day: int) -> datetime.date:
+    return to_gregorian(year, month, day)
@@ -0,0 +1,144 @@
+import bisect
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from itertools import accumulate
+from zoneinfo import ZoneInfo
+
+import jdatetime
+
+TEHRAN_TZ = ZoneInfo("Asia/Tehran")
+
+PERSIAN_MONTHS = {
+    "فروردین": 1, "اردیبهشت": 2, "خرداد": 3,
+    "تیر": 4, "مرداد": 5, "شهریور": 6,
+    "مهر": 7, "آبان": 8, "آذر": 9,
+    "دی": 10, "بهمن": 11, "اسفند": 12
+}
+RELATIVE_UNITS = {"دقیقه": "minutes", "ساعت": "hours", "روز": "days"}
+
+# Years covered by the precomputed day table, anything outside falls back to jdatetime.
+FIRST_YEAR = 1300
+LAST_YEAR = 1500
+
+# Day of the year each month starts on, Esfand takes whatever is left of the year.
+_MONTH_OFFSETS = [0, *accumulate([31] * 6 + [30] * 5)]
+
+# "۲ ساعت پیش", "15 دقیقه پیش"
+_RELATIVE = re.compile(r"(\d+)\s*(دقیقه|ساعت|روز)\s*پیش")
+# "24 بهمن 1404 - 12:30", possibly after a weekday
+_WRITTEN = re.compile(r"(\d{1,2})\s+(\S+)\s+(\d{4})\D*?(\d{1,2}):(\d{2})")
+# "1404-11-24 12:30", the format min_date and the stored shamsi_date use
+_NUMERIC = re.compile(r"(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:\s+(\d{1,2}):(\d{2}))?")
+
+
+@lru_cache(maxsize=1)
+def _year_starts() -> list[int]:
+    """Gregorian ordinal of 1 Farvardin of every year from FIRST_YEAR to LAST_YEAR + 1."""
+    return [jdatetime.date(year, 1, 1).togregorian().toordinal() for year in range(FIRST_YEAR, LAST_YEAR + 2)]
+
+
+def month_length(year: int, month: int) -> int:
+    if month <= 6:
+        return 31
+    if month <= 11:
+        return 30
+
+    index = year - FIRST_YEAR
+    starts = _year_starts()
+    if 0 <= index < len(starts) - 1:
+        return starts[index + 1] - starts[index] - _MONTH_OFFSETS[-1]
+    return 30 if jdatetime.date(year, 1, 1).isleap() else 29
+
+
+def to_gregorian(year: int, month: int, day: int) -> date:
+    if not 1 <= month <= 12 or not 1 <= day <= month_length(year, month):
+        raise ValueError(f"Invalid Jalali date {year}-{month}-{day}")
+
+    index = year - FIRST_YEAR
+    starts = _year_starts()
+    if not 0 <= index < len(starts) - 1:
+        return jdatetime.date(year, month, day).togregorian()
+    return date.fromordinal(starts[index] + _MONTH_OFFSETS[month - 1] + day - 1)
+
+
+def to_jalali(value: date) -> tuple[int, int, int]:
+    ordinal = value.toordinal()
+    starts = _year_starts()
+    index = bisect.bisect_right(starts, ordinal) - 1
+    if not 0 <= index < len(starts) - 1:
+        j_date = jdatetime.date.fromgregorian(date=value)
+        return j_date.year, j_date.month, j_date.day
+
+    day_of_year = ordinal - starts[index]
+    month = bisect.bisect_right(_MONTH_OFFSETS, day_of_year)
+    return FIRST_YEAR + index, month, day_of_year - _MONTH_OFFSETS[month - 1] + 1
+
+
+def _jalali_datetime(year: str, month: int, day: str, hour: str | None, minute: str | None) -> datetime:
+    # int() reads Persian and Arabic-Indic digits as well.
+    gregorian = to_gregorian(int(year), month, int(day))
+    clock = time(int(hour), int(minute)) if hour is not None else time()
+    return datetime.combine(gregorian, clock, tzinfo=TEHRAN_TZ)
+
+
+@lru_cache(maxsize=8192)
+def _parse_absolute(text: str) -> datetime:
+    match = _WRITTEN.search(text)
+    if match:
+        day, month_name, year, hour, minute = match.groups()
+        if month_name not in PERSIAN_MONTHS:
+            raise ValueError(f"Unknown Jalali month {month_name!r} in {text!r}")
+        return _jalali_datetime(year, PERSIAN_MONTHS[month_name], day, hour, minute)
+
+    match = _NUMERIC.search(text)
+    if match:
+        year, month, day, hour, minute = match.groups()
+        return _jalali_datetime(year, int(month), day, hour, minute)
+
+    raise ValueError(f"Unrecognized Jalali date {text!r}")
+
+
+def parse_jalali(text: str, now: datetime | None = None) -> datetime:
+    """Parse an absolute or relative ("2 hours ago") Jalali date into a Tehran-aware datetime.
+
+    Relative dates are resolved against `now`, absolute ones are memoized.
+    """
+    text = " ".join(text.split())
+    match = _RELATIVE.search(text)
+    if match:
+        amount, unit = match.groups()
+        now = now or datetime.now(timezone.utc)
+        return (now - timedelta(**{RELATIVE_UNITS[unit]: int(amount)})).astimezone(TEHRAN_TZ)
+    return _parse_absolute(text)
+
+
+def parse_jalali_many(texts: list[str], now: datetime | None = None) -> list[datetime | None]:
+    """Parse a whole feed page against one `now`, unparsable dates come back as None."""
+    now = now or datetime.now(timezone.utc)
+    results = []
+    for text in texts:
+        try:
+            results.append(parse_jalali(text, now))
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def as_datetime(value: str | datetime) -> datetime:
+    """Jalali strings and naive datetimes are taken as Tehran time."""
+    if isinstance(value, str):
+        return parse_jalali(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=TEHRAN_TZ)
+    return value
+
+
+def format_jalali(value: datetime) -> str:
+    local = value.astimezone(TEHRAN_TZ)
+    year, month, day = to_jalali(local.date())
+    return f"{year:04d}-{month:02d}-{day:02d} {local.hour:02d}:{local.minute:02d}"
+
+
+def format_gregorian(value: datetime) -> str:
+    return value.astimezone(TEHRAN_TZ).strftime("%Y-%m-%d %H:%M")
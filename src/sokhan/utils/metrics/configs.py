@@ -0,0 +1,6 @@
+import os
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+# Unset keeps the Prometheus endpoint off, the feed watcher serves /metrics next to /health regardless.
+METRICS_PORT = int(os.environ["METRICS_PORT"]) if os.getenv("METRICS_PORT") else None
@@ -0,0 +1,139 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sokhan.utils.metrics.configs import METRICS_ENABLED
+
+# Seconds, from sub-millisecond parses up to slow page loads.
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 4, 16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to observe on every fetch, parse and write."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def state(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+def _quantile(buckets: tuple[float, ...], counts: list[int], q: float) -> float:
+    """Upper bound of the bucket holding the q-th quantile, the last finite bound for the overflow bucket."""
+    target = q * sum(counts)
+    seen = 0
+    for bound, count in zip(buckets, counts):
+        seen += count
+        if seen >= target:
+            return bound
+    return buckets[-1]
+
+
+def summarize(buckets: tuple[float, ...], counts: list[int], total: float) -> dict:
+    count = sum(counts)
+    return {
+        "count": count,
+        "sum": round(total, 6),
+        "mean": round(total / count, 6) if count else 0.0,
+        "p50": _quantile(buckets, counts, 0.5),
+        "p90": _quantile(buckets, counts, 0.9),
+        "p99": _quantile(buckets, counts, 0.99),
+    }
+
+
+class MetricsRegistry:
+    """Histograms by metric name and label set, shared by every stage of the process."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name: str, labels: Labels, buckets: tuple[float, ...]) -> Histogram:
+        series = self._histograms.get(name)
+        histogram = series.get(labels) if series is not None else None
+        if histogram is None:
+            with self._lock:
+                series = self._histograms.setdefault(name, {})
+                self._buckets.setdefault(name, buckets)
+                histogram = series.setdefault(labels, Histogram(self._buckets[name]))
+        return histogram
+
+    def observe(self, name: str, value: float, buckets: tuple[float, ...] = TIME_BUCKETS, **labels: str) -> None:
+        if self.enabled:
+            self._histogram(name, tuple(sorted(labels.items())), buckets).observe(value)
+
+    def observe_size(self, name: str, value: float, **labels: str) -> None:
+        self.observe(name, value, buckets=SIZE_BUCKETS, **labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict[str, dict[Labels, tuple[list[int], float]]]:
+        with self._lock:
+            series = {name: dict(histograms) for name, histograms in self._histograms.items()}
+        return {name: {labels: histogram.state() for labels, histogram in histograms.items()}
+                for name, histograms in series.items()}
+
+    def summary(self, since: dict | None = None) -> dict[str, dict[str, dict]]:
+        """count/sum/mean/p50/p90/p99 of every series, only counting what was observed after the `since` snapshot."""
+        since = since or {}
+        out = {}
+        for name, histograms in self.snapshot().items():
+            for labels, (counts, total) in histograms.items():
+                before_counts, before_total = since.get(name, {}).get(labels, ([0] * len(counts), 0.0))
+                counts = [now - before for now, before in zip(counts, before_counts)]
+                if not any(counts):
+                    continue
+                key = ",".join(f"{k}={v}" for k, v in labels) or "all"
+                out.setdefault(name, {})[key] = summarize(self._buckets[name], counts, total - before_total)
+        return out
+
+    def to_prometheus(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        lines = []
+        for name, histograms in sorted(self.snapshot().items()):
+            buckets = self._buckets[name]
+            lines.append(f"# TYPE sokhan_{name} histogram")
+            for labels, (counts, total) in sorted(histograms.items()):
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                cumulative = 0
+                for bound, count in zip((*buckets, "+Inf"), counts):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"sokhan_{name}_bucket{{{','.join(filter(None, (label_text, le)))}}} {cumulative}")
+                suffix = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"sokhan_{name}_sum{suffix} {total}")
+                lines.append(f"sokhan_{name}_count{suffix} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def timed_call(func, *args):
+    """Run `func` and return its result with the seconds it took, for timing work done in pool processes."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+METRICS = MetricsRegistry()
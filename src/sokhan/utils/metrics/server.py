@@ -0,0 +1,46 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loguru import logger
+
+from sokhan.utils.metrics.configs import METRICS_HOST, METRICS_PORT
+from sokhan.utils.metrics.registry import METRICS, MetricsRegistry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_server: ThreadingHTTPServer | None = None
+_server_lock = threading.Lock()
+
+
+def write_prometheus(handler: BaseHTTPRequestHandler, registry: MetricsRegistry = METRICS) -> None:
+    body = registry.to_prometheus().encode("utf-8")
+    handler.send_response(200)
+    handler.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        write_prometheus(self)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(host: str = METRICS_HOST, port: int | None = METRICS_PORT) -> ThreadingHTTPServer | None:
+    """Serve /metrics in a daemon thread once per process, a no-op while METRICS_PORT is unset."""
+    global _server
+    if port is None:
+        return None
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Metrics endpoint listening on {host}:{port}/metrics")
+    return _server
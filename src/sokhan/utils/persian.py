@@ -0,0 +1,72 @@
+import re
+
+# Bump whenever the output of `normalize` changes, stored documents below it are renormalized.
+NORMALIZATION_VERSION = 2
+
+ZWNJ = "\u200c"
+PERSIAN_LETTERS = "\u0600-\u06ff"
+
+_TRANSLATION = str.maketrans({
+    # Arabic letters to their Persian forms
+    "\u064a": "\u06cc",  # ARABIC YEH -> FARSI YEH
+    "\u0649": "\u06cc",  # ALEF MAKSURA -> FARSI YEH
+    "\u0643": "\u06a9",  # ARABIC KAF -> KEHEH
+    # Arabic-Indic digits to Persian digits
+    **{chr(0x0660 + i): chr(0x06f0 + i) for i in range(10)},
+    # Zero width space typed in place of ZWNJ, ZWJ is kept since it asks for the opposite
+    "\u200b": ZWNJ,
+    # Characters with no meaning in stored text
+    "\u00ad": None,  # SOFT HYPHEN
+    "\u0640": None,  # TATWEEL
+    "\ufeff": None,  # BOM
+    "\u200e": None,  # LRM
+    "\u200f": None,  # RLM
+    "\r": None,
+})
+
+_SPACES = re.compile("[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+_REPEATED_ZWNJ = re.compile(f"{ZWNJ}{{2,}}")
+# ZWNJ only joins two Persian letters, anywhere else (spaces, digits, line ends) it is noise.
+_STRAY_ZWNJ = re.compile(f"(?<![{PERSIAN_LETTERS}]){ZWNJ}|{ZWNJ}(?![{PERSIAN_LETTERS}])")
+_LINE_EDGES = re.compile(r" *\n *")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize(text: str) -> str:
+    text = text.translate(_TRANSLATION)
+    text = _SPACES.sub(" ", text)
+    text = _REPEATED_ZWNJ.sub(ZWNJ, text)
+    text = _STRAY_ZWNJ.sub("", text)
+    text = _LINE_EDGES.sub("\n", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip()
+
+
+def normalize_many(texts: list[str]) -> list[str]:
+    return [normalize(text) for text in texts]
+
+
+# Search tokens fold the variants people type interchangeably, stored text keeps them.
+_TOKEN_TRANSLATION = str.maketrans({
+    ZWNJ: None,
+    **{chr(code): None for code in range(0x064b, 0x0653)},  # harakat
+    "\u0670": None,  # SUPERSCRIPT ALEF
+    "\u0623": "\u0627",  # ALEF WITH HAMZA ABOVE -> ALEF
+    "\u0625": "\u0627",  # ALEF WITH HAMZA BELOW -> ALEF
+    "\u0671": "\u0627",  # ALEF WASLA -> ALEF
+    "\u0629": "\u0647",  # TEH MARBUTA -> HEH
+    "\u06c0": "\u0647",  # HEH WITH YEH ABOVE -> HEH
+    "\u0624": "\u0648",  # WAW WITH HAMZA ABOVE -> WAW
+    **{chr(0x06f0 + i): str(i) for i in range(10)},
+})
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Search tokens of `text`, ZWNJ-joined parts of a word end up in one token."""
+    return _TOKEN.findall(normalize(text).translate(_TOKEN_TRANSLATION).lower())
+
+
+def tokenize_many(texts: list[str]) -> list[str]:
+    """Space joined tokens of each text, ready for an FTS table."""
+    return [" ".join(tokenize(text)) for text in texts]
@@ -0,0 +1,10 @@
+import os
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+# "sampling" (stack samples of every thread, collapsed for flamegraphs) or "deterministic" (cProfile)
+PROFILING_MODE = os.getenv("PROFILING_MODE", "sampling")
+PROFILING_DIR = os.getenv("PROFILING_DIR", os.path.join(os.getcwd(), "profiles"))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", 0.005))
+PROFILING_TRACEMALLOC = os.getenv("PROFILING_TRACEMALLOC", "true").lower() == "true"
+PROFILING_TRACEMALLOC_FRAMES = int(os.getenv("PROFILING_TRACEMALLOC_FRAMES", 10))
+PROFILING_TOP_N = int(os.getenv("PROFILING_TOP_N", 30))
@@ -0,0 +1,189 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+
+from loguru import logger
+
+from sokhan.utils.profiling.configs import (PROFILING_DIR, PROFILING_ENABLED, PROFILING_MODE,
+                                            PROFILING_SAMPLE_INTERVAL, PROFILING_TOP_N, PROFILING_TRACEMALLOC,
+                                            PROFILING_TRACEMALLOC_FRAMES)
+
+_active = threading.local()
+# cProfile allows one enabled profiler at a time (per thread before 3.12, per process after), held by the outermost.
+_DETERMINISTIC_LOCK = threading.Lock()
+
+
+class StackSampler:
+    """Samples the stacks of every thread from a daemon thread, counting them in collapsed-stack form.
+
+    Cost is independent of how many calls the profiled code makes, so it is safe on full crawls.
+    """
+
+    def __init__(self, interval: float = PROFILING_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format, readable by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def allocation_report(snapshot: tracemalloc.Snapshot, baseline: tracemalloc.Snapshot | None,
+                      top_n: int = PROFILING_TOP_N) -> str:
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    snapshot = snapshot.filter_traces(filters)
+
+    lines = [f"Top {top_n} allocations by line"]
+    lines += [str(stat) for stat in snapshot.statistics("lineno")[:top_n]]
+    if baseline is not None:
+        lines += ["", f"Top {top_n} allocation growths by line"]
+        lines += [str(stat) for stat in snapshot.compare_to(baseline.filter_traces(filters), "lineno")[:top_n]]
+    return "\n".join(lines) + "\n"
+
+
+class Profiler:
+    """Profiles the enclosed block and writes its reports to `directory`, their paths end up in `outputs`.
+
+    Sampling mode writes collapsed stacks (`.collapsed`), deterministic mode a cProfile dump (`.pstats`) and a
+    cumulative-time report, and both a tracemalloc top-N allocation report (`.alloc.txt`).
+    """
+
+    def __init__(self, name: str, mode: str = PROFILING_MODE, directory: str = PROFILING_DIR,
+                 trace_memory: bool = PROFILING_TRACEMALLOC):
+        if mode not in ("sampling", "deterministic"):
+            raise ValueError(f"Unknown profiling mode {mode}")
+
+        self.name = name
+        self.mode = mode
+        self.directory = directory
+        self.trace_memory = trace_memory
+        self.outputs: dict[str, str] = {}
+        self._sampler: StackSampler | None = None
+        self._profile: cProfile.Profile | None = None
+        self._started_tracemalloc = False
+        self._baseline: tracemalloc.Snapshot | None = None
+
+    @staticmethod
+    def active() -> bool:
+        """Whether a profiler is running in this thread."""
+        return getattr(_active, "depth", 0) > 0
+
+    def __enter__(self):
+        _active.depth = getattr(_active, "depth", 0) + 1
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(PROFILING_TRACEMALLOC_FRAMES)
+                self._started_tracemalloc = True
+            self._baseline = tracemalloc.take_snapshot()
+
+        if self.mode == "sampling":
+            self._sampler = StackSampler()
+            self._sampler.start()
+        elif _DETERMINISTIC_LOCK.acquire(blocking=False):
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            # A second cProfile would take over (or, on 3.12+, fail to start); the outer one covers this block.
+            logger.debug(f"Not profiling {self.name}, a deterministic profile is already running")
+
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._started_at
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._profile is not None:
+            self._profile.disable()
+            _DETERMINISTIC_LOCK.release()
+        _active.depth -= 1
+
+        snapshot = tracemalloc.take_snapshot() if self.trace_memory else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        try:
+            self._write(snapshot)
+        except OSError as e:
+            logger.warning(f"Failed to write the profile of {self.name}: {e}")
+            return
+        if self.outputs:
+            logger.info(f"Profiled {self.name} ({elapsed:.2f}s): {', '.join(self.outputs.values())}")
+
+    def _write(self, snapshot: tracemalloc.Snapshot | None) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        stem = os.path.join(self.directory,
+                            f"{self.name}-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}")
+
+        if self._sampler is not None:
+            self.outputs["collapsed"] = self._save(f"{stem}.collapsed", self._sampler.collapsed())
+
+        if self._profile is not None:
+            self.outputs["pstats"] = f"{stem}.pstats"
+            self._profile.dump_stats(self.outputs["pstats"])
+            report = io.StringIO()
+            pstats.Stats(self._profile, stream=report).sort_stats("cumulative").print_stats(PROFILING_TOP_N)
+            self.outputs["report"] = self._save(f"{stem}.txt", report.getvalue())
+
+        if snapshot is not None:
+            self.outputs["allocations"] = self._save(f"{stem}.alloc.txt", allocation_report(snapshot, self._baseline))
+
+    @staticmethod
+    def _save(path: str, content: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+
+def profiled(name: str):
+    """Decorator profiling every outermost call of the function, or returning it untouched when profiling is off."""
+
+    def decorator(func):
+        if not PROFILING_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Calls nested in a profiled step or call (extract -> extract_urls) are covered by the outer profile.
+            if Profiler.active():
+                return func(*args, **kwargs)
+
+            with Profiler(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator